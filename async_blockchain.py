@@ -0,0 +1,177 @@
+"""
+Módulo de Blockchain Assíncrona
+Fachada asyncio com mineração fora do event loop
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional
+
+from block import Block
+from blockchain import Blockchain
+from transaction import Transaction
+
+
+logger = logging.getLogger('educhain.async_blockchain')
+
+
+class AsyncBlockchain:
+    """
+    Fachada asyncio para uma Blockchain.
+    
+    A Prova de Trabalho roda em um executor, então o event loop continua
+    atendendo transações e consultas de saldo durante a mineração. Todas
+    as alterações na Blockchain acontecem na thread do event loop; o
+    executor só manipula o bloco sendo minerado.
+    
+    Se restart_on_new_transactions estiver ativo, uma transação aceita
+    durante a mineração interrompe o trabalho atual e a mineração
+    recomeça com um bloco que já inclui a nova transação. Um bloco
+    recebido de outro nó que muda o topo da cadeia (accept_block,
+    reorganize) sempre reinicia o trabalho.
+    
+    Attributes:
+        blockchain: Blockchain encapsulada
+        restart_on_new_transactions: Reinicia a mineração ao chegar
+            uma nova transação
+        restarts: Quantas vezes a mineração foi reiniciada
+    """
+    
+    def __init__(self, blockchain: Optional[Blockchain] = None,
+                 executor: Optional[Executor] = None,
+                 restart_on_new_transactions: bool = True):
+        """
+        Inicializa a fachada.
+        
+        Args:
+            blockchain: Blockchain a encapsular (padrão: nova Blockchain)
+            executor: Executor da mineração (padrão: executor do loop)
+            restart_on_new_transactions: Reinicia a mineração quando
+                chega uma transação (padrão: True)
+        """
+        self.blockchain = blockchain if blockchain is not None else Blockchain()
+        self.executor = executor
+        self.restart_on_new_transactions = restart_on_new_transactions
+        self.restarts = 0
+        self._stop_event: Optional[threading.Event] = None
+        self._restart_requested = False
+        self._mining_lock = asyncio.Lock()
+    
+    @property
+    def mining_in_progress(self) -> bool:
+        """Indica se há um trabalho de mineração em andamento."""
+        return self._stop_event is not None
+    
+    def _request_restart(self) -> None:
+        """Interrompe o trabalho atual para que seja remontado."""
+        if self._stop_event is not None and self.restart_on_new_transactions:
+            self._interrupt()
+    
+    def _interrupt(self) -> None:
+        """Interrompe o trabalho atual (sempre remontado em seguida)."""
+        if self._stop_event is not None:
+            self._restart_requested = True
+            self._stop_event.set()
+    
+    async def add_transaction(self, transaction: Transaction) -> int:
+        """
+        Adiciona transação à mempool (ver Blockchain.add_transaction).
+        
+        Returns:
+            Índice do próximo bloco ou -1 se a transação foi rejeitada
+        """
+        result = self.blockchain.add_transaction(transaction)
+        if result != -1:
+            self._request_restart()
+        return result
+    
+    async def add_transactions(self, transactions: Iterable[Transaction],
+                               check_balance: bool = False) -> Dict:
+        """Adiciona um lote de transações (ver Blockchain.add_transactions)."""
+        result = self.blockchain.add_transactions(transactions, check_balance)
+        if result['accepted']:
+            self._request_restart()
+        return result
+    
+    async def accept_block(self, block: Block) -> Dict:
+        """
+        Adiciona um bloco minerado por outro nó (ver Blockchain.accept_block).
+        
+        Se o topo mudou (bloco conectado ou reorganização), a mineração
+        em andamento é interrompida e recomeça sobre o novo topo.
+        """
+        report = self.blockchain.accept_block(block)
+        if report['valid'] and report['status'] != 'side_branch':
+            self._interrupt()
+        return report
+    
+    async def reorganize(self, fork_height: int, blocks: List[Block]) -> Dict:
+        """Adota uma ramificação com mais trabalho (ver Blockchain.reorganize)."""
+        report = self.blockchain.reorganize(fork_height, blocks)
+        if report['valid']:
+            self._interrupt()
+        return report
+    
+    async def get_balance(self, address: str) -> float:
+        """Retorna o saldo de um endereço."""
+        return self.blockchain.get_balance(address)
+    
+    async def get_balances(self, addresses: Iterable[str]) -> Dict[str, float]:
+        """Retorna o saldo de vários endereços."""
+        return self.blockchain.get_balances(addresses)
+    
+    def cancel_mining(self) -> None:
+        """Interrompe o trabalho de mineração atual sem reiniciá-lo."""
+        if self._stop_event is not None:
+            self._restart_requested = False
+            self._stop_event.set()
+    
+    async def mine(self, miner_address: str,
+                   max_transactions: Optional[int] = None,
+                   max_block_bytes: Optional[int] = None) -> Optional[Block]:
+        """
+        Minera um bloco sem bloquear o event loop.
+        
+        Args:
+            miner_address: Endereço do minerador
+            max_transactions: Máximo de transações no bloco
+            max_block_bytes: Tamanho máximo das transações serializadas
+            
+        Returns:
+            Bloco minerado e adicionado à cadeia, ou None se a mineração
+            foi cancelada com cancel_mining()
+        """
+        loop = asyncio.get_running_loop()
+        
+        async with self._mining_lock:
+            while True:
+                block, selected = self.blockchain.prepare_block(
+                    miner_address, max_transactions, max_block_bytes)
+                stop_event = threading.Event()
+                self._stop_event = stop_event
+                self._restart_requested = False
+                
+                try:
+                    found = await loop.run_in_executor(
+                        self.executor, block.mine_block, self.blockchain.difficulty, stop_event)
+                except asyncio.CancelledError:
+                    # A thread de mineração precisa ser avisada explicitamente
+                    stop_event.set()
+                    raise
+                finally:
+                    self._stop_event = None
+                
+                # Um bloco encontrado sobre um topo antigo é descartado
+                if found and block.prior_hash == self.blockchain.get_last_block().hash:
+                    self.blockchain.commit_block(block, selected)
+                    logger.info("💎 Minerador %s recebeu %s moedas!",
+                                miner_address, block.data[-1]['amount'])
+                    return block
+                
+                if not self._restart_requested:
+                    return None
+                
+                self.restarts += 1
+                logger.info("🔄 Reiniciando mineração do bloco %s", block.index)
@@ -0,0 +1,258 @@
+"""
+Suíte de Benchmarks Reprodutíveis
+Mede hashing, mineração, validação, assinaturas, saldos e serialização da EduChain
+
+Uso:
+    python benchmarks.py --sizes 10 100 --repeat 7 --output bench.json
+    python benchmarks.py --compare bench_antigo.json --output bench.json
+"""
+
+import argparse
+import io
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from block import Block
+from blockchain import Blockchain, _iter_json_array
+from crypto_utils import KeyPair
+from transaction import SignatureVerifier, Transaction
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Percentil pelo método do posto mais próximo."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _measure(func: Callable[[], None], repeat: int, operations: int) -> Dict:
+    """
+    Executa func repetidas vezes e resume os tempos.
+    
+    Args:
+        func: Função medida (uma execução = uma amostra)
+        repeat: Número de amostras
+        operations: Operações realizadas por execução (para a vazão)
+        
+    Returns:
+        Dicionário com mediana, p95, mínimo (segundos por execução) e
+        vazão mediana em operações por segundo
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    median = statistics.median(samples)
+    return {
+        'median': median,
+        'p95': _percentile(samples, 95),
+        'min': min(samples),
+        'ops_per_sec': operations / median if median > 0 else 0.0,
+        'operations': operations
+    }
+
+
+def _make_transactions(rng: random.Random, count: int, addresses: List[str]) -> List[Transaction]:
+    """Gera transações determinísticas a partir do gerador semeado."""
+    return [
+        Transaction(rng.choice(addresses), rng.choice(addresses),
+                    rng.randint(1, 100), timestamp=1_700_000_000.0 + i)
+        for i in range(count)
+    ]
+
+
+def build_chain(size: int, txs_per_block: int, seed: int,
+                addresses: List[str]) -> Blockchain:
+    """
+    Constrói uma cadeia determinística sem custo de mineração.
+    
+    Usa dificuldade 0, então o tempo de construção não depende de sorte.
+    
+    Args:
+        size: Número de blocos além do gênese
+        txs_per_block: Transações por bloco
+        seed: Semente do gerador de transações
+        addresses: Endereços usados nas transações
+        
+    Returns:
+        Blockchain construída
+    """
+    rng = random.Random(seed)
+    bc = Blockchain(difficulty=0, mempool_size=max(10000, txs_per_block))
+    for _ in range(size):
+        bc.add_transactions(_make_transactions(rng, txs_per_block, addresses))
+        bc.mine_pending_transactions(rng.choice(addresses))
+    return bc
+
+
+def run_benchmarks(sizes: List[int], repeat: int = 5, seed: int = 42,
+                   txs_per_block: int = 50, hash_range: int = 50000,
+                   balance_queries: int = 10000) -> Dict:
+    """
+    Executa a suíte completa.
+    
+    Args:
+        sizes: Tamanhos de cadeia (em blocos) a medir
+        repeat: Amostras por medição (padrão: 5)
+        seed: Semente de todos os dados gerados (padrão: 42)
+        txs_per_block: Transações por bloco (padrão: 50)
+        hash_range: Nonces testados nas medições de hashing
+        balance_queries: Consultas por medição de saldo
+        
+    Returns:
+        Dicionário com 'meta' e 'results' (lista de medições)
+    """
+    rng = random.Random(seed)
+    addresses = [f"addr{i}" for i in range(200)]
+    results = []
+    
+    def record(name: str, size: Optional[int], measurement: Dict, unit: str) -> None:
+        measurement.update(name=name, chain_size=size, unit=unit)
+        results.append(measurement)
+    
+    # Hashing: create_hash completo versus busca de nonces via midstate
+    txs = [tx.to_dict() for tx in _make_transactions(rng, txs_per_block, addresses)]
+    block = Block(1, '01/01/2024 00:00:00', txs, '0' * 64)
+    create_ops = max(1, hash_range // 10)
+    record('create_hash', None,
+           _measure(lambda: [block.create_hash() for _ in range(create_ops)],
+                    repeat, create_ops), 'hashes/s')
+    
+    midstate = block.create_midstate()
+    # Prefixo impossível ('g' não é hexadecimal): percorre a faixa toda
+    record('mine_block_nonce_search', None,
+           _measure(lambda: Block.search_nonce_range(midstate, 'g', 0, hash_range),
+                    repeat, hash_range), 'hashes/s')
+    # Busca em lote com alvo 0 (também impossível): mesma faixa
+    record('mine_block_nonce_search_batch', None,
+           _measure(lambda: Block.search_nonce_batch(midstate, 0, 0, hash_range),
+                    repeat, hash_range), 'hashes/s')
+    
+    # Assinaturas: verificação sem cache (um verificador novo por amostra)
+    # e com todos os txids já no cache
+    key = KeyPair(rng.getrandbits(255).to_bytes(32, 'big'))
+    signed = []
+    for tx in _make_transactions(rng, txs_per_block, [key.address]):
+        tx.sign(key)
+        signed.append((tx.txid, tx.to_dict()))
+    record('verify_signatures', None,
+           _measure(lambda: SignatureVerifier().verify(signed), repeat, len(signed)),
+           'signatures/s')
+    cached = SignatureVerifier()
+    cached.verify(signed)
+    record('verify_signatures_cached', None,
+           _measure(lambda: cached.verify(signed), repeat, len(signed)), 'signatures/s')
+    
+    for size in sizes:
+        bc = build_chain(size, txs_per_block, seed, addresses)
+        
+        record('validate_chain_full', size,
+               _measure(lambda: bc.validate_chain(incremental=False), repeat, len(bc.chain)),
+               'blocks/s')
+        
+        query_rng = random.Random(seed)
+        queries = [query_rng.choice(addresses) for _ in range(balance_queries)]
+        record('get_balance', size,
+               _measure(lambda: [bc.get_balance(a) for a in queries], repeat, balance_queries),
+               'queries/s')
+        record('get_balances_bulk', size,
+               _measure(lambda: bc.get_balances(queries), repeat, balance_queries),
+               'queries/s')
+        
+        record('to_json', size,
+               _measure(lambda: bc.to_json(), repeat, len(bc.chain)), 'blocks/s')
+        serialized = bc.to_json()
+        record('load_json_stream', size,
+               _measure(lambda: [Block.from_dict(d)
+                                 for d in _iter_json_array(io.StringIO(serialized))],
+                        repeat, len(bc.chain)), 'blocks/s')
+        
+        record('to_bytes', size,
+               _measure(lambda: [b.to_bytes() for b in bc.chain], repeat, len(bc.chain)),
+               'blocks/s')
+        encoded = [b.to_bytes() for b in bc.chain]
+        record('from_bytes', size,
+               _measure(lambda: [Block.from_bytes(raw) for raw in encoded],
+                        repeat, len(bc.chain)), 'blocks/s')
+    
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'sizes': sizes,
+            'txs_per_block': txs_per_block,
+            'hash_range': hash_range
+        },
+        'results': results
+    }
+
+
+def compare(baseline: Dict, current: Dict) -> List[Dict]:
+    """
+    Compara duas execuções pela vazão mediana.
+    
+    Args:
+        baseline: Resultado anterior (ex: versão publicada)
+        current: Resultado atual
+        
+    Returns:
+        Lista com 'name', 'chain_size' e 'ratio' (atual / anterior;
+        abaixo de 1 indica regressão)
+    """
+    previous = {(r['name'], r['chain_size']): r for r in baseline['results']}
+    comparison = []
+    for r in current['results']:
+        old = previous.get((r['name'], r['chain_size']))
+        if old and old['ops_per_sec']:
+            comparison.append({'name': r['name'], 'chain_size': r['chain_size'],
+                               'ratio': r['ops_per_sec'] / old['ops_per_sec']})
+    return comparison
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description="Benchmarks da EduChain")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--txs-per-block', type=int, default=50)
+    parser.add_argument('--hash-range', type=int, default=50000)
+    parser.add_argument('--output', help="Arquivo JSON de saída")
+    parser.add_argument('--compare', help="Arquivo JSON de uma execução anterior")
+    args = parser.parse_args(argv)
+    
+    report = run_benchmarks(args.sizes, args.repeat, args.seed,
+                            args.txs_per_block, args.hash_range)
+    
+    print(f"{'benchmark':<26}{'blocos':>8}{'mediana (s)':>14}{'p95 (s)':>12}{'vazão':>16}")
+    for r in report['results']:
+        size = '-' if r['chain_size'] is None else r['chain_size']
+        print(f"{r['name']:<26}{size:>8}{r['median']:>14.6f}{r['p95']:>12.6f}"
+              f"{r['ops_per_sec']:>12.0f} {r['unit']}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\nComparação com a execução anterior (atual / anterior):")
+        for c in compare(baseline, report):
+            size = '-' if c['chain_size'] is None else c['chain_size']
+            print(f"{c['name']:<26}{size:>8}{c['ratio']:>10.2f}x")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Resultados salvos em '{args.output}'")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
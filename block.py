@@ -5,8 +5,50 @@ Define a estrutura de blocos da blockchain
 
 import hashlib
 import json
+import logging
 import threading
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from merkle import MerkleTree, compute_merkle_root, verify_proof
+from serialization import decode_block, encode_block, encode_hash_prefix
+from telemetry import telemetry
+
+
+logger = logging.getLogger('educhain.block')
+
+# Busca em lote: os nonces são percorridos em blocos de 10 ** 4. Dentro
+# de um bloco, o texto decimal do nonce é o da parte alta seguido de 4
+# dígitos, então a parte alta entra em um segundo midstate e os sufixos
+# vêm de uma tabela pré-calculada
+_NONCE_DIGITS = 4
+_NONCE_BATCH = 10 ** _NONCE_DIGITS
+_nonce_tables: Optional[Tuple[List[bytes], List[bytes]]] = None
+
+
+def _get_nonce_tables() -> Tuple[List[bytes], List[bytes]]:
+    """Sufixos com zeros à esquerda e nonces < _NONCE_BATCH (sob demanda)."""
+    global _nonce_tables
+    if _nonce_tables is None:
+        _nonce_tables = ([b'%0*d' % (_NONCE_DIGITS, i) for i in range(_NONCE_BATCH)],
+                         [b'%d' % i for i in range(_NONCE_BATCH)])
+    return _nonce_tables
+
+
+def target_from_difficulty(difficulty: int) -> int:
+    """
+    Converte uma dificuldade em número de zeros para um alvo numérico.
+    
+    Um hash com N zeros hexadecimais à esquerda é exatamente um hash
+    menor que 16 ** (64 - N), então os dois critérios são equivalentes.
+    
+    Args:
+        difficulty: Número de zeros hexadecimais à esquerda
+        
+    Returns:
+        Alvo: o hash (como inteiro de 256 bits) deve ser menor que ele
+    """
+    return 1 << (256 - 4 * difficulty)
 
 
 class Block:
@@ -21,16 +63,37 @@ class Block:
     - Nonce: número usado na prova de trabalho
     - Hash: identificador único do bloco
     
+    Versões de bloco:
+    - 1: o hash cobre o JSON completo dos dados (formato original)
+    - 2: o hash cobre apenas o cabeçalho, que inclui a raiz de Merkle
+      das transações; o tamanho do que é hasheado na mineração não
+      depende do número de transações e cada transação tem prova de
+      inclusão (get_proof)
+    - 3: como a versão 2, mas o cabeçalho e as folhas de Merkle usam a
+      codificação binária de serialization.py em vez de texto/JSON
+    
     Attributes:
         index: Posição do bloco na blockchain
         timestamp: Momento de criação do bloco
         data: Dados ou transações armazenadas
         prior_hash: Hash do bloco anterior
         nonce: Número usado na mineração (Prova de Trabalho)
-        hash: Hash calculado do bloco atual
+        hash: Hash calculado do bloco atual (hexadecimal)
+        hash_bytes: Hash do bloco atual como 32 bytes brutos
+        version: Versão do formato do bloco (1, 2 ou 3)
+        merkle_root: Raiz de Merkle dos dados (somente versão 2)
+        target: Alvo numérico do bloco (None: usa a dificuldade em zeros
+            da cadeia); faz parte do hash
+    
+    O bloco usa __slots__ e guarda o hash internamente como 32 bytes
+    brutos; a forma hexadecimal só é gerada ao acessar o atributo hash.
     """
     
-    def __init__(self, index: int, timestamp: str, data: Any, prior_hash: str = ''):
+    __slots__ = ('index', 'timestamp', 'data', 'prior_hash', 'nonce', '_hash',
+                 'version', 'merkle_root', '_merkle_tree', 'target')
+    
+    def __init__(self, index: int, timestamp: str, data: Any, prior_hash: str = '',
+                 version: int = 1, target: Optional[int] = None):
         """
         Inicializa um novo bloco.
         
@@ -39,47 +102,324 @@ class Block:
             timestamp: Carimbo de data/hora
             data: Dados a serem armazenados
             prior_hash: Hash do bloco anterior (padrão: string vazia)
+            version: Versão do formato do bloco (padrão: 1)
+            target: Alvo numérico (padrão: None, dificuldade da cadeia)
         """
         self.index = index
         self.timestamp = timestamp
         self.data = data
         self.prior_hash = prior_hash
         self.nonce = 0
-        self.hash = self.create_hash()
+        self.version = version
+        self.merkle_root = None
+        self._merkle_tree = None
+        self.target = target
+        if version >= 2:
+            self.update_merkle_root()
+        self._hash = self.create_digest()
     
-    def create_hash(self) -> str:
+    @property
+    def hash(self) -> str:
+        """Hash do bloco em hexadecimal (64 caracteres)."""
+        return self._hash.hex()
+    
+    @hash.setter
+    def hash(self, value: str) -> None:
+        self._hash = bytes.fromhex(value)
+    
+    @property
+    def hash_bytes(self) -> bytes:
+        """Hash do bloco como 32 bytes brutos."""
+        return self._hash
+    
+    def _items(self) -> List[Any]:
+        """Itens cobertos pela árvore de Merkle (transações ou dado único)."""
+        return self.data if isinstance(self.data, list) else [self.data]
+    
+    def compute_merkle_root(self) -> str:
         """
-        Calcula o hash SHA-256 do bloco.
+        Calcula a raiz de Merkle dos dados atuais (sem usar o cache).
         
-        O hash é calculado concatenando todos os atributos do bloco:
-        índice + hash anterior + timestamp + dados + nonce
+        Returns:
+            Raiz em hexadecimal
+        """
+        return compute_merkle_root(self._items(), self.version >= 3)
+    
+    def check_merkle_root(self) -> bool:
+        """
+        Confere a raiz de Merkle armazenada contra os dados atuais.
         
         Returns:
-            String hexadecimal de 64 caracteres representando o hash
+            True se a raiz confere e a árvore não tem pares repetidos
+            (ver MerkleTree.mutated)
+        """
+        tree = MerkleTree(self._items(), self.version >= 3)
+        return tree.root == self.merkle_root and not tree.mutated
+    
+    def update_merkle_root(self) -> str:
+        """
+        Recalcula e armazena a raiz de Merkle após alterar os dados.
+        
+        Returns:
+            Nova raiz em hexadecimal
+        """
+        self._merkle_tree = MerkleTree(self._items(), self.version >= 3)
+        self.merkle_root = self._merkle_tree.root
+        return self.merkle_root
+    
+    def get_proof(self, tx_index: int) -> List[Tuple[str, str]]:
+        """
+        Gera a prova de inclusão de uma transação do bloco.
+        
+        Args:
+            tx_index: Posição da transação em data
+            
+        Returns:
+            Prova verificável com Block.verify_proof contra merkle_root
+        """
+        if self._merkle_tree is None:
+            self._merkle_tree = MerkleTree(self._items(), self.version >= 3)
+        return self._merkle_tree.get_proof(tx_index)
+    
+    @staticmethod
+    def verify_proof(tx: Any, proof: List[Tuple[str, str]], merkle_root: str,
+                     version: int = 2) -> bool:
+        """
+        Verifica a inclusão de uma transação usando só a raiz do bloco.
+        
+        Args:
+            tx: Transação (dicionário, como armazenado em data)
+            proof: Prova gerada por get_proof
+            merkle_root: Raiz de Merkle do cabeçalho do bloco
+            version: Versão do bloco (a versão 3 usa folhas binárias)
+            
+        Returns:
+            True se a transação pertence ao bloco
         """
+        return verify_proof(tx, proof, merkle_root, version >= 3)
+    
+    def get_hash_prefix(self) -> bytes:
+        """
+        Serializa a parte do cabeçalho que não depende do nonce.
+        
+        Como o nonce é o último componente concatenado, todo o restante
+        (índice + hash anterior + timestamp + dados) pode ser serializado
+        uma única vez por sessão de mineração. Na versão 2 os dados são
+        representados apenas pela raiz de Merkle armazenada; na versão 3
+        o cabeçalho é codificado em binário (serialization.py).
+        
+        Returns:
+            Bytes do prefixo usado no cálculo do hash
+        """
+        if self.version >= 3:
+            return encode_hash_prefix(self)
+        
+        # O alvo (se houver) entra com largura fixa logo antes do nonce
+        target = '' if self.target is None else f"{self.target:064x}"
+        if self.version >= 2:
+            header = f"{self.version}{self.index}{self.prior_hash}{self.timestamp}"
+            return f"{header}{self.merkle_root}{target}".encode()
+        
         # Serializa os dados para garantir consistência
         if isinstance(self.data, (dict, list)):
             data_str = json.dumps(self.data, sort_keys=True)
         else:
             data_str = str(self.data)
         
-        # Concatena todos os componentes do bloco
-        block_string = f"{self.index}{self.prior_hash}{self.timestamp}{data_str}{self.nonce}"
+        return f"{self.index}{self.prior_hash}{self.timestamp}{data_str}{target}".encode()
+    
+    def create_midstate(self) -> 'hashlib._Hash':
+        """
+        Cria o estado intermediário (midstate) do SHA-256 para mineração.
+        
+        O objeto retornado já foi alimentado com o prefixo do bloco; para
+        testar um nonce basta copiá-lo e adicionar apenas os bytes do nonce.
+        
+        Returns:
+            Objeto hashlib.sha256 alimentado com o prefixo do bloco
+        """
+        return hashlib.sha256(self.get_hash_prefix())
+    
+    @staticmethod
+    def hash_with_midstate(midstate: 'hashlib._Hash', nonce: int) -> str:
+        """
+        Calcula o hash do bloco para um nonce a partir do midstate.
+        
+        Produz exatamente o mesmo resultado que create_hash() com o
+        mesmo nonce, mas processa somente os bytes do nonce.
+        
+        Args:
+            midstate: Estado retornado por create_midstate()
+            nonce: Nonce a ser testado
+            
+        Returns:
+            String hexadecimal de 64 caracteres representando o hash
+        """
+        h = midstate.copy()
+        h.update(str(nonce).encode())
+        return h.hexdigest()
+    
+    def create_digest(self) -> bytes:
+        """
+        Calcula o hash SHA-256 do bloco como 32 bytes brutos.
+        
+        Returns:
+            Digest SHA-256 do bloco
+        """
+        return hashlib.sha256(self.get_hash_prefix() + str(self.nonce).encode()).digest()
+    
+    def create_hash(self) -> str:
+        """
+        Calcula o hash SHA-256 do bloco.
+        
+        O hash é calculado concatenando todos os atributos do bloco:
+        índice + hash anterior + timestamp + dados + nonce
+        
+        Returns:
+            String hexadecimal de 64 caracteres representando o hash
+        """
+        # Concatena todos os componentes do bloco (nonce por último)
+        return self.create_digest().hex()
+    
+    @staticmethod
+    def search_nonce_range(midstate: 'hashlib._Hash', prefix: str,
+                           start: int, end: int,
+                           target: Optional[int] = None) -> Tuple[Optional[int], Optional[str], int]:
+        """
+        Testa todos os nonces de uma faixa a partir do midstate.
+        
+        O laço interno não faz nenhum trabalho além do hash e da
+        comparação; verificações de parada e progresso ficam entre faixas.
+        
+        Args:
+            midstate: Estado retornado por create_midstate()
+            prefix: Prefixo exigido no hash (ex: '0000')
+            start: Primeiro nonce da faixa
+            end: Fim da faixa (exclusivo)
+            target: Alvo numérico; se informado, substitui o prefixo
+            
+        Returns:
+            Tupla (nonce, hash, tentativas); nonce e hash são None se a
+            faixa não contém solução
+        """
+        if target is not None:
+            from_bytes = int.from_bytes
+            for nonce in range(start, end):
+                h = midstate.copy()
+                h.update(str(nonce).encode())
+                digest = h.digest()
+                if from_bytes(digest, 'big') < target:
+                    return nonce, digest.hex(), nonce - start + 1
+            return None, None, end - start
+        
+        hash_with_midstate = Block.hash_with_midstate
+        for nonce in range(start, end):
+            block_hash = hash_with_midstate(midstate, nonce)
+            if block_hash.startswith(prefix):
+                return nonce, block_hash, nonce - start + 1
+        return None, None, end - start
+    
+    @staticmethod
+    def search_nonce_batch(midstate: 'hashlib._Hash', target: int, start: int,
+                           end: int) -> Tuple[Optional[int], Optional[str], int]:
+        """
+        Busca em lote: mesmo resultado de search_nonce_range, com menos
+        trabalho em Python por nonce.
+        
+        Os nonces são percorridos em blocos de 10 ** 4 que compartilham
+        a parte alta do texto decimal: ela é processada uma vez por bloco
+        (segundo midstate) e os sufixos vêm de uma tabela pré-calculada,
+        sem str() nem encode() por tentativa. O critério é comparado
+        direto nos 32 bytes do digest (comparação de bytes big-endian
+        equivale à comparação numérica), sem gerar texto hexadecimal.
+        
+        Args:
+            midstate: Estado retornado por create_midstate()
+            target: Alvo numérico (para N zeros, target_from_difficulty(N))
+            start: Primeiro nonce da faixa
+            end: Fim da faixa (exclusivo)
+            
+        Returns:
+            Tupla (nonce, hash, tentativas), como search_nonce_range
+        """
+        if start >= end:
+            return None, None, 0
+        if target >> 256:
+            # Alvo acima do maior hash possível: qualquer nonce serve
+            return start, Block.hash_with_midstate(midstate, start), 1
+        
+        limit = target.to_bytes(32, 'big')
+        padded, short = _get_nonce_tables()
+        nonce = start
+        while nonce < end:
+            high, low = divmod(nonce, _NONCE_BATCH)
+            stop = min(end - high * _NONCE_BATCH, _NONCE_BATCH)
+            base = midstate.copy()
+            if high:
+                base.update(str(high).encode())
+                suffixes = padded
+            else:
+                suffixes = short
+            
+            copy = base.copy
+            for suffix in suffixes[low:stop]:
+                h = copy()
+                h.update(suffix)
+                digest = h.digest()
+                if digest < limit:
+                    found = high * _NONCE_BATCH + int(suffix)
+                    return found, digest.hex(), found - start + 1
+            nonce = high * _NONCE_BATCH + stop
+        return None, None, end - start
+    
+    @staticmethod
+    def search_nonces(midstate: 'hashlib._Hash', prefix: str, start: int, end: int,
+                      target: Optional[int] = None,
+                      batch: bool = True) -> Tuple[Optional[int], Optional[str], int]:
+        """
+        Escolhe o mecanismo de busca de uma faixa de nonces.
         
-        # Gera e retorna o hash SHA-256
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        Usa search_nonce_batch quando batch=True e o critério pode ser
+        expresso como alvo (alvo numérico ou prefixo só de zeros); caso
+        contrário, search_nonce_range.
+        
+        Returns:
+            Tupla (nonce, hash, tentativas)
+        """
+        if batch:
+            if target is not None:
+                return Block.search_nonce_batch(midstate, target, start, end)
+            if not prefix.strip('0'):
+                return Block.search_nonce_batch(midstate, target_from_difficulty(len(prefix)),
+                                                start, end)
+        return Block.search_nonce_range(midstate, prefix, start, end, target)
     
-    def mine_block(self, difficulty: int, stop_event: Optional[threading.Event] = None) -> bool:
+    def mine_block(self, difficulty: int, stop_event: Optional[threading.Event] = None,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   progress_interval: int = 10000, batch: bool = True) -> bool:
         """
         Executa a Prova de Trabalho (PoW) para minerar o bloco.
         
         A mineração consiste em encontrar um nonce que, quando incluído
         no cálculo do hash, produza um hash que comece com N zeros
-        (onde N é o nível de dificuldade).
+        (onde N é o nível de dificuldade). Se o bloco tem alvo numérico
+        (target), o hash deve ser menor que o alvo e difficulty é ignorado.
+        
+        O prefixo do bloco é serializado e processado pelo SHA-256 uma
+        única vez (midstate); cada tentativa processa apenas o nonce.
+        Os nonces são testados em faixas de progress_interval; o evento
+        de parada e o progresso só são consultados entre faixas, então
+        o progresso não custa nada dentro do laço de hash.
         
         Args:
             difficulty: Número de zeros à esquerda necessários no hash
             stop_event: Evento para interromper mineração concorrente
+            progress_callback: Chamado entre faixas com (tentativas,
+                próximo nonce); sem callback, o progresso vai para o
+                logger em nível DEBUG (se habilitado)
+            progress_interval: Tentativas por faixa (padrão: 10000)
+            batch: Usa a busca em lote (search_nonce_batch); False volta
+                ao laço de um nonce por vez (padrão: True)
             
         Returns:
             True se mineração foi concluída, False se foi interrompida
@@ -90,25 +430,48 @@ class Block:
         # Define o prefixo necessário (ex: '0000' para difficulty=4)
         prefix = '0' * difficulty
         
-        print(f"⛏️  Minerando bloco {self.index} (dificuldade: {difficulty})...")
+        if self.target is None:
+            logger.info("⛏️  Minerando bloco %s (dificuldade: %s)...", self.index, difficulty)
+        else:
+            logger.info("⛏️  Minerando bloco %s (alvo: %s...)...",
+                        self.index, f"{self.target:064x}"[:16])
+        
+        if progress_callback is None and logger.isEnabledFor(logging.DEBUG):
+            def progress_callback(attempts: int, next_nonce: int) -> None:
+                logger.debug("   Tentativa %s: nonce %s...", attempts, next_nonce)
+        
+        # Serializa o bloco uma única vez para todas as tentativas
+        start_time = time.perf_counter()
+        midstate = self.create_midstate()
+        nonce = self.nonce
         attempts = 0
         
-        # Loop até encontrar hash válido ou ser interrompido
-        while not self.hash.startswith(prefix):
-            # Verifica se deve parar (mineração concorrente)
-            if stop_event and stop_event.is_set():
-                return False
+        # Testa faixas até encontrar hash válido ou ser interrompido
+        while True:
+            found, block_hash, tried = self.search_nonces(
+                midstate, prefix, nonce, nonce + progress_interval, self.target, batch)
+            attempts += tried
+            if found is not None:
+                break
+            nonce += progress_interval
             
-            # Incrementa nonce e recalcula hash
-            self.nonce += 1
-            self.hash = self.create_hash()
-            attempts += 1
+            if progress_callback is not None:
+                progress_callback(attempts, nonce)
             
-            # Feedback a cada 10000 tentativas
-            if attempts % 10000 == 0:
-                print(f"   Tentativa {attempts}: {self.hash[:10]}...")
+            # Verifica se deve parar (mineração concorrente)
+            if stop_event is not None and stop_event.is_set():
+                self.nonce, self.hash = nonce, self.hash_with_midstate(midstate, nonce)
+                return False
         
-        print(f"✓ Bloco {self.index} minerado! Nonce: {self.nonce}, Hash: {self.hash[:16]}...")
+        self.nonce, self.hash = found, block_hash
+        elapsed = time.perf_counter() - start_time
+        telemetry.record_mining({'time': elapsed, 'workers': [{
+            'worker_id': 0,
+            'attempts': attempts,
+            'hashrate': attempts / elapsed if elapsed > 0 else 0.0
+        }]}, 'single')
+        logger.info("✓ Bloco %s minerado! Nonce: %s, Hash: %s...",
+                    self.index, self.nonce, self.hash[:16])
         
         # Sinaliza que encontrou solução (mineração concorrente)
         if stop_event:
@@ -123,7 +486,7 @@ class Block:
         Returns:
             Dicionário com todos os atributos do bloco
         """
-        return {
+        result = {
             'index': self.index,
             'timestamp': self.timestamp,
             'data': self.data,
@@ -131,6 +494,65 @@ class Block:
             'nonce': self.nonce,
             'hash': self.hash
         }
+        if self.version >= 2:
+            result['version'] = self.version
+            result['merkle_root'] = self.merkle_root
+        if self.target is not None:
+            result['target'] = f"{self.target:064x}"
+        return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Block':
+        """
+        Reconstrói um bloco a partir do dicionário de to_dict().
+        
+        Não chama __init__, portanto o hash armazenado é usado como está
+        (sem recalcular create_hash nem minerar novamente).
+        
+        Args:
+            data: Dicionário no formato de to_dict()
+            
+        Returns:
+            Bloco reconstruído
+        """
+        block = cls.__new__(cls)
+        block.index = data['index']
+        block.timestamp = data['timestamp']
+        block.data = data['data']
+        block.prior_hash = data['prior_hash']
+        block.nonce = data['nonce']
+        block.hash = data['hash']
+        block.version = data.get('version', 1)
+        block.merkle_root = data.get('merkle_root')
+        block._merkle_tree = None
+        target = data.get('target')
+        block.target = None if target is None else int(target, 16)
+        return block
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serializa o bloco no formato binário (ver serialization.py).
+        
+        Returns:
+            Bytes do bloco, bem menores que o JSON equivalente
+        """
+        return encode_block(self)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Block':
+        """
+        Reconstrói um bloco a partir de to_bytes(), sem recalcular o hash.
+        
+        Args:
+            data: Bytes gerados por to_bytes()
+            
+        Returns:
+            Bloco reconstruído
+            
+        Raises:
+            ValueError: Se o registro está truncado ou malformado
+        """
+        return cls.from_dict(decode_block(data))
     
     def __repr__(self) -> str:
         """Representação legível do bloco."""
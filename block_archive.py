@@ -0,0 +1,309 @@
+"""
+Módulo de Arquivo de Blocos Mapeado em Memória
+Implementa armazenamento de cabeçalhos via mmap com corpos carregados sob demanda
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from block import Block
+from serialization import decode_value, encode_value, is_binary
+
+
+# Registro de cabeçalho de tamanho fixo:
+# índice, nonce, timestamp, hash anterior (ASCII), hash (32 bytes brutos),
+# offset e tamanho do corpo (dados/transações) no arquivo de corpos,
+# versão do bloco e raiz de Merkle (32 bytes brutos, zeros na versão 1)
+_HEADER = struct.Struct('>QQ32s64s32sQIB32s')
+
+# Alvos numéricos ficam em '<caminho>.tgt' (32 bytes por bloco, zeros
+# para blocos sem alvo), criado só quando o primeiro alvo aparece;
+# arquivos antigos sem alvos continuam compatíveis
+_TARGET = struct.Struct('>32s')
+_NO_TARGET = bytes(32)
+
+# Descritor do slot 'data' de Block: _ArchivedBlock guarda nele os dados
+# depois de lidos do disco
+_DATA_SLOT = Block.data
+
+
+class _ArchivedBlock(Block):
+    """
+    Bloco lido de um MappedChain.
+    
+    Os campos do cabeçalho vêm do mmap; os dados só são lidos e
+    decodificados do arquivo de corpos no primeiro acesso a data. Assim,
+    consultas que usam apenas o cabeçalho (hash do topo, alvo,
+    timestamp, encadeamento) não pagam a decodificação do corpo.
+    """
+    
+    __slots__ = ('_archive', '_height', '_loaded')
+    
+    @property
+    def data(self) -> Any:
+        """Dados do bloco, lidos do arquivo no primeiro acesso."""
+        if not self._loaded:
+            _DATA_SLOT.__set__(self, self._archive._read_body(self._height, self._hash))
+            self._loaded = True
+        return _DATA_SLOT.__get__(self, Block)
+    
+    @data.setter
+    def data(self, value: Any) -> None:
+        _DATA_SLOT.__set__(self, value)
+        self._loaded = True
+    
+    def __reduce__(self):
+        # Enviado a outros processos (ou copiado) como um Block comum
+        return Block.from_dict, (self.to_dict(),)
+
+
+class MappedChain:
+    """
+    Cadeia de blocos em disco com cabeçalhos mapeados em memória.
+    
+    Os cabeçalhos (índice, timestamp, hash anterior, nonce e hash) ficam
+    em registros de tamanho fixo no arquivo '<caminho>.hdr', acessado via
+    mmap; os dados de cada bloco ficam no arquivo '<caminho>.body'
+    (formato binário de serialization.py; corpos antigos em JSON também
+    são lidos) e só são decodificados quando o atributo data de um bloco
+    é acessado: ler o hash, o alvo ou o timestamp de um bloco (por
+    exemplo, o topo da cadeia) usa apenas o cabeçalho mapeado.
+    
+    Só os blocos ficam em disco. Os índices por transação da Blockchain
+    (saldos, txids, histórico e dados de desfazer) continuam em memória
+    e são reconstruídos ao abrir o arquivo, lendo cada corpo uma vez;
+    eles crescem com o número de transações, então a economia de memória
+    em relação a uma cadeia em lista se limita aos próprios blocos.
+    
+    Implementa a interface de lista usada por Blockchain.chain (len,
+    indexação, fatias, iteração, append e pop). Os blocos retornados são
+    cópias: alterá-los não modifica o arquivo.
+    
+    Attributes:
+        path: Prefixo dos arquivos do arquivo de blocos
+    """
+    
+    def __init__(self, path: str):
+        """
+        Abre (ou cria) um arquivo de blocos mapeado.
+        
+        Args:
+            path: Prefixo dos arquivos ('.hdr' e '.body' são adicionados)
+        """
+        self.path = path
+        self._headers = open(path + '.hdr', 'a+b')
+        self._bodies = open(path + '.body', 'a+b')
+        self._targets = open(path + '.tgt', 'a+b')
+        self._map: Optional[mmap.mmap] = None
+        self._count = os.fstat(self._headers.fileno()).st_size // _HEADER.size
+        self._by_hash: Dict[bytes, int] = {}
+        
+        # Índice hash -> altura (32 bytes por bloco)
+        for height in range(self._count):
+            self._by_hash[self._unpack(height)[4]] = height
+    
+    def _remap(self) -> None:
+        """Recria o mapeamento após o arquivo de cabeçalhos crescer."""
+        if self._map is not None:
+            self._map.close()
+        self._headers.flush()
+        self._map = mmap.mmap(self._headers.fileno(), self._count * _HEADER.size,
+                              access=mmap.ACCESS_READ)
+    
+    def _unpack(self, height: int) -> tuple:
+        """Lê o registro de cabeçalho bruto de uma altura."""
+        if self._map is None or len(self._map) < (height + 1) * _HEADER.size:
+            self._remap()
+        return _HEADER.unpack_from(self._map, height * _HEADER.size)
+    
+    def _normalize(self, height: int) -> int:
+        """Converte índices negativos e valida o intervalo."""
+        if height < 0:
+            height += self._count
+        if not 0 <= height < self._count:
+            raise IndexError("Altura fora da cadeia")
+        return height
+    
+    def __len__(self) -> int:
+        """Número de blocos armazenados."""
+        return self._count
+    
+    def append(self, block: Block) -> None:
+        """
+        Grava um bloco no final do arquivo.
+        
+        Args:
+            block: Bloco minerado a ser gravado
+        """
+        body = encode_value(block.data)
+        timestamp = block.timestamp.encode()
+        prior_hash = block.prior_hash.encode()
+        if len(timestamp) > 32 or len(prior_hash) > 64:
+            raise ValueError("Timestamp ou hash anterior excedem o registro fixo")
+        
+        self._bodies.seek(0, os.SEEK_END)
+        offset = self._bodies.tell()
+        self._bodies.write(body)
+        
+        raw_hash = block.hash_bytes
+        merkle_root = bytes.fromhex(block.merkle_root) if block.version >= 2 else b''
+        self._headers.write(_HEADER.pack(block.index, block.nonce, timestamp,
+                                         prior_hash, raw_hash, offset, len(body),
+                                         block.version, merkle_root))
+        
+        targets_size = self._targets.seek(0, os.SEEK_END)
+        if block.target is not None or targets_size:
+            # Completa com "sem alvo" as alturas anteriores ao primeiro alvo
+            missing = self._count - targets_size // _TARGET.size
+            target = _NO_TARGET if block.target is None else block.target.to_bytes(32, 'big')
+            self._targets.write(_NO_TARGET * missing + _TARGET.pack(target))
+        
+        self._by_hash[raw_hash] = self._count
+        self._count += 1
+    
+    def pop(self) -> Block:
+        """
+        Remove o último bloco, truncando os arquivos (usado em
+        reorganizações da cadeia).
+        
+        Returns:
+            Bloco removido
+            
+        Raises:
+            IndexError: Se o arquivo está vazio
+        """
+        height = self._normalize(-1)
+        block = self._load(height)
+        # O corpo precisa ser lido antes de o arquivo ser truncado
+        block.data = self._read_body(height, block.hash_bytes)
+        offset = self._unpack(height)[5]
+        
+        # O mapeamento não pode cobrir a parte truncada do arquivo
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        for f, size in ((self._headers, height * _HEADER.size),
+                        (self._bodies, offset),
+                        (self._targets, height * _TARGET.size)):
+            f.flush()
+            if os.fstat(f.fileno()).st_size > size:
+                f.truncate(size)
+        
+        if self._by_hash.get(block.hash_bytes) == height:
+            del self._by_hash[block.hash_bytes]
+        self._count = height
+        return block
+    
+    def get_header(self, height: int) -> Dict:
+        """
+        Retorna o cabeçalho de um bloco sem carregar seus dados.
+        
+        Args:
+            height: Altura do bloco (aceita índices negativos)
+            
+        Returns:
+            Dicionário com index, timestamp, prior_hash, nonce e hash
+            (mais version e merkle_root para blocos versão 2 e target
+            para blocos com alvo numérico)
+        """
+        height = self._normalize(height)
+        index, nonce, timestamp, prior_hash, raw_hash, _, _, version, merkle_root = \
+            self._unpack(height)
+        header = {
+            'index': index,
+            'timestamp': timestamp.rstrip(b'\0').decode(),
+            'prior_hash': prior_hash.rstrip(b'\0').decode(),
+            'nonce': nonce,
+            'hash': raw_hash.hex()
+        }
+        if version >= 2:
+            header['version'] = version
+            header['merkle_root'] = merkle_root.hex()
+        
+        self._targets.flush()
+        self._targets.seek(height * _TARGET.size)
+        raw_target = self._targets.read(_TARGET.size)
+        if len(raw_target) == _TARGET.size and raw_target != _NO_TARGET:
+            header['target'] = raw_target.hex()
+        return header
+    
+    def _read_body(self, height: int, raw_hash: bytes) -> Any:
+        """
+        Lê e decodifica os dados de um bloco.
+        
+        Raises:
+            ValueError: Se o bloco saiu do arquivo (reorganização) depois
+                de ser carregado
+        """
+        if height >= self._count or self._unpack(height)[4] != raw_hash:
+            raise ValueError(f"Bloco {raw_hash.hex()[:16]}... não está mais no arquivo")
+        offset, length = self._unpack(height)[5:7]
+        self._bodies.flush()
+        self._bodies.seek(offset)
+        body = self._bodies.read(length)
+        return decode_value(body) if is_binary(body) else json.loads(body)
+    
+    def _load(self, height: int) -> Block:
+        """Monta o bloco a partir do cabeçalho; os dados são lidos sob demanda."""
+        block = _ArchivedBlock.from_dict(dict(self.get_header(height), data=None))
+        block._archive = self
+        block._height = height
+        block._loaded = False
+        return block
+    
+    def __getitem__(self, key: Union[int, slice]) -> Union[Block, List[Block]]:
+        """Acessa blocos por altura ou fatia (carrega os dados sob demanda)."""
+        if isinstance(key, slice):
+            return [self._load(height) for height in range(*key.indices(self._count))]
+        return self._load(self._normalize(key))
+    
+    def __iter__(self) -> Iterator[Block]:
+        """Percorre os blocos em ordem, carregando um por vez."""
+        for height in range(self._count):
+            yield self._load(height)
+    
+    def height_of(self, block_hash: str) -> Optional[int]:
+        """
+        Retorna a altura de um bloco pelo hash.
+        
+        Args:
+            block_hash: Hash hexadecimal do bloco
+            
+        Returns:
+            Altura do bloco ou None se não estiver no arquivo
+        """
+        return self._by_hash.get(bytes.fromhex(block_hash))
+    
+    def get_by_hash(self, block_hash: str) -> Optional[Block]:
+        """
+        Carrega um bloco pelo hash.
+        
+        Args:
+            block_hash: Hash hexadecimal do bloco
+            
+        Returns:
+            Bloco encontrado ou None
+        """
+        height = self.height_of(block_hash)
+        return None if height is None else self._load(height)
+    
+    def flush(self) -> None:
+        """Força a gravação em disco dos arquivos."""
+        for f in (self._bodies, self._targets, self._headers):
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def close(self) -> None:
+        """Sincroniza e fecha os arquivos."""
+        if self._headers.closed:
+            return
+        self.flush()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._headers.close()
+        self._bodies.close()
+        self._targets.close()
@@ -0,0 +1,227 @@
+"""
+Módulo de Armazenamento de Blocos
+Implementa um log de blocos em disco do tipo append-only
+"""
+
+import json
+import os
+import struct
+from typing import Dict, Iterator, Optional
+
+from block import Block
+from serialization import decode_block, is_binary
+
+
+# Cabeçalho de cada registro: tamanho do payload (uint32 big-endian)
+_LENGTH = struct.Struct('>I')
+# Entrada do índice: offset do registro no arquivo de dados (uint64)
+_OFFSET = struct.Struct('>Q')
+
+
+def _decode(payload: bytes) -> Dict:
+    """Decodifica um registro binário ou JSON para o formato de to_dict()."""
+    if is_binary(payload):
+        return decode_block(payload)
+    return json.loads(payload)
+
+
+class BlockStore:
+    """
+    Log de blocos append-only com índice de offsets.
+    
+    Os blocos são gravados no arquivo de dados como registros
+    [tamanho (4 bytes)][bloco], e o arquivo '<caminho>.idx' guarda o
+    offset de cada registro (8 bytes por bloco). O bloco é gravado no
+    formato binário de serialization.py (ou em JSON, com binary=False);
+    a leitura reconhece os dois formatos, então arquivos antigos em JSON
+    continuam legíveis. Salvar um
+    novo bloco custa apenas um append nos dois arquivos, e qualquer
+    bloco pode ser lido diretamente pela altura. Depois de uma
+    reorganização, truncate() descarta os blocos que saíram da cadeia.
+    
+    As escritas são sincronizadas com o disco (fsync) em lotes de
+    sync_every blocos, ou explicitamente com flush().
+    
+    Attributes:
+        path: Caminho do arquivo de dados
+        sync_every: Blocos gravados entre cada fsync
+        binary: Grava novos blocos no formato binário
+    """
+    
+    def __init__(self, path: str, sync_every: int = 16, binary: bool = True):
+        """
+        Abre (ou cria) um armazenamento de blocos.
+        
+        Args:
+            path: Caminho do arquivo de dados
+            sync_every: Blocos gravados entre cada fsync (padrão: 16)
+            binary: Grava no formato binário (padrão: True) ou em JSON
+        """
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.binary = binary
+        self._data = open(path, 'a+b')
+        self._index = open(path + '.idx', 'a+b')
+        self._offsets = []
+        self._unsynced = 0
+        self._load_index()
+    
+    def _load_index(self) -> None:
+        """
+        Carrega o índice de offsets e recupera gravações interrompidas.
+        
+        Registros gravados no arquivo de dados mas ausentes do índice são
+        reindexados; um registro final incompleto é descartado.
+        """
+        self._index.seek(0)
+        raw = self._index.read()
+        usable = len(raw) - len(raw) % _OFFSET.size
+        self._offsets = [off for (off,) in _OFFSET.iter_unpack(raw[:usable])]
+        
+        data_size = os.fstat(self._data.fileno()).st_size
+        indexed = len(self._offsets)
+        
+        # Descarta entradas que apontam além do fim dos dados
+        while self._offsets and self._offsets[-1] + _LENGTH.size > data_size:
+            self._offsets.pop()
+        
+        position = self._record_end(self._offsets[-1]) if self._offsets else 0
+        if position > data_size:
+            # Último registro indexado ficou incompleto
+            position = self._offsets.pop()
+        
+        # Reindexa registros completos gravados após a última entrada
+        while position + _LENGTH.size <= data_size:
+            end = self._record_end(position)
+            if end > data_size:
+                break
+            self._offsets.append(position)
+            position = end
+        
+        if position != data_size or len(self._offsets) != indexed or usable != len(raw):
+            # Reescreve os arquivos de forma consistente
+            self._data.truncate(position)
+            self._index.truncate(0)
+            self._index.write(b''.join(_OFFSET.pack(off) for off in self._offsets))
+            self.flush()
+    
+    def _record_end(self, offset: int) -> int:
+        """Retorna a posição logo após o registro que começa em offset."""
+        self._data.seek(offset)
+        (length,) = _LENGTH.unpack(self._data.read(_LENGTH.size))
+        return offset + _LENGTH.size + length
+    
+    def __len__(self) -> int:
+        """Número de blocos armazenados."""
+        return len(self._offsets)
+    
+    def append(self, block: Block) -> int:
+        """
+        Grava um bloco no final do log.
+        
+        Args:
+            block: Bloco a ser gravado
+            
+        Returns:
+            Altura (posição) do bloco no armazenamento
+        """
+        if self.binary:
+            payload = block.to_bytes()
+        else:
+            payload = json.dumps(block.to_dict(), separators=(',', ':')).encode()
+        
+        self._data.seek(0, os.SEEK_END)
+        offset = self._data.tell()
+        self._data.write(_LENGTH.pack(len(payload)) + payload)
+        self._index.write(_OFFSET.pack(offset))
+        self._offsets.append(offset)
+        
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.flush()
+        
+        return len(self._offsets) - 1
+    
+    def truncate(self, height: int) -> None:
+        """
+        Descarta os blocos a partir de uma altura.
+        
+        Os dados são cortados antes do índice: se a gravação for
+        interrompida, as entradas que sobrarem no índice apontam além do
+        fim dos dados e são descartadas por _load_index.
+        
+        Args:
+            height: Número de blocos mantidos (0 <= height <= len(store))
+            
+        Raises:
+            IndexError: Se height está fora do armazenamento
+        """
+        if not 0 <= height <= len(self._offsets):
+            raise IndexError("Altura fora do armazenamento")
+        if height == len(self._offsets):
+            return
+        
+        offset = self._offsets[height]
+        del self._offsets[height:]
+        for f in (self._data, self._index):
+            f.flush()
+        self._data.truncate(offset)
+        self._index.truncate(height * _OFFSET.size)
+        self.flush()
+    
+    def flush(self) -> None:
+        """Força a gravação em disco (fsync) dos blocos pendentes."""
+        for f in (self._data, self._index):
+            f.flush()
+            os.fsync(f.fileno())
+        self._unsynced = 0
+    
+    def read_dict(self, height: int) -> Dict:
+        """
+        Lê o dicionário de um bloco pela altura.
+        
+        Args:
+            height: Altura do bloco (aceita índices negativos)
+            
+        Returns:
+            Dicionário no formato de Block.to_dict()
+        """
+        offset = self._offsets[height]
+        self._data.flush()
+        self._data.seek(offset)
+        (length,) = _LENGTH.unpack(self._data.read(_LENGTH.size))
+        return _decode(self._data.read(length))
+    
+    def read(self, height: int) -> Block:
+        """
+        Lê um bloco pela altura, sem recalcular seu hash.
+        
+        Args:
+            height: Altura do bloco (aceita índices negativos)
+            
+        Returns:
+            Bloco reconstruído
+        """
+        return Block.from_dict(self.read_dict(height))
+    
+    def __iter__(self) -> Iterator[Block]:
+        """Percorre os blocos em ordem, lendo sequencialmente o arquivo."""
+        self._data.flush()
+        self._data.seek(0)
+        for _ in range(len(self._offsets)):
+            (length,) = _LENGTH.unpack(self._data.read(_LENGTH.size))
+            yield Block.from_dict(_decode(self._data.read(length)))
+    
+    def close(self) -> None:
+        """Sincroniza e fecha os arquivos."""
+        if not self._data.closed:
+            self.flush()
+            self._data.close()
+            self._index.close()
+    
+    def __enter__(self) -> 'BlockStore':
+        return self
+    
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
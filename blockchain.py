@@ -3,16 +3,233 @@ Módulo Blockchain Principal
 Implementa a estrutura completa da blockchain
 """
 
+import bisect
 import json
-from typing import List
+import logging
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple, Union
 from datetime import datetime
 
-from block import Block
-from transaction import Transaction
+from block import Block, target_from_difficulty
+from block_archive import MappedChain
+from block_store import BlockStore
+from mempool import Mempool
+from telemetry import Telemetry, telemetry as default_telemetry
+from transaction import SignatureVerifier, Transaction, content_id, transaction_id
+
+
+logger = logging.getLogger('educhain.blockchain')
 
 # Assumindo imports dos módulos anteriores
-# from block import Block
-# from transaction import Transaction
+# from block import Block, target_from_difficulty
+# from transaction import Transaction, transaction_id
+
+
+def _check_block_contents(block: Block) -> Tuple[bytes, bool]:
+    """
+    Recalcula o hash bruto de um bloco e confere sua raiz de Merkle.
+    
+    Função de módulo para poder ser usada pelos processos de validação.
+    
+    Returns:
+        Tupla (digest recalculado, raiz de Merkle confere com os dados)
+    """
+    merkle_ok = block.version < 2 or block.check_merkle_root()
+    return block.create_digest(), merkle_ok
+
+
+# Caracteres que mudam o estado da varredura fora e dentro de strings
+_JSON_STRUCTURE = re.compile(r'[\[\]{}"]')
+_JSON_STRING_STOP = re.compile(r'["\\]')
+
+# Fim de um número ou literal (true, false, null) dentro do array
+_JSON_SCALAR_END = re.compile(r'[\s,\]]')
+
+
+def _scan_json_value(text: str, pos: int,
+                     state: Tuple[int, bool, bool]) -> Tuple[Optional[int], Tuple[int, bool, bool]]:
+    """
+    Procura o fim de um objeto, lista ou string JSON que pode estar
+    dividido em vários pedaços.
+    
+    O estado da varredura é devolvido para continuar no pedaço seguinte,
+    de modo que cada caractere é examinado uma única vez.
+    
+    Args:
+        text: Pedaço de texto a varrer
+        pos: Posição inicial da varredura em text
+        state: (profundidade, dentro de string, escape pendente), vindo
+            do pedaço anterior ou (0, False, False) no início do valor
+        
+    Returns:
+        Tupla (posição logo após o fim do valor ou None se ele continua
+        no próximo pedaço, estado da varredura)
+    """
+    depth, in_string, escape = state
+    end = len(text)
+    
+    while pos < end:
+        if escape:
+            pos += 1
+            escape = False
+        elif in_string:
+            match = _JSON_STRING_STOP.search(text, pos)
+            if match is None:
+                break
+            pos = match.end()
+            if match.group() == '\\':
+                escape = True
+            else:
+                in_string = False
+                if depth == 0:
+                    return pos, (0, False, False)
+        else:
+            match = _JSON_STRUCTURE.search(text, pos)
+            if match is None:
+                break
+            pos = match.end()
+            token = match.group()
+            if token == '"':
+                in_string = True
+            elif token in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return pos, (0, False, False)
+    
+    return None, (depth, in_string, escape)
+
+
+def _iter_json_array(f: IO[str], chunk_size: int = 1 << 16) -> Iterator:
+    """
+    Lê um array JSON elemento por elemento, sem carregar o arquivo todo.
+    
+    Elementos que cabem no buffer são decodificados direto. Um elemento
+    que atravessa o fim do buffer é completado pedaço a pedaço: só o
+    texto novo é varrido (ver _scan_json_value) e o elemento é
+    decodificado uma única vez, quando termina. Assim o custo é linear
+    no tamanho do arquivo, mesmo com elementos maiores que chunk_size.
+    
+    Args:
+        f: Arquivo texto posicionado no início do array
+        chunk_size: Caracteres lidos por vez (padrão: 64 KiB)
+        
+    Yields:
+        Cada elemento do array já decodificado
+        
+    Raises:
+        ValueError: Se o arquivo não é um array JSON ou está truncado
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("Arquivo não contém um array JSON")
+    pos = 1
+    
+    while True:
+        # Pula espaços e separadores entre elementos (o texto já
+        # consumido é descartado a cada leitura)
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer):
+                break
+            buffer = f.read(chunk_size)
+            pos = 0
+            if not buffer:
+                raise ValueError("Array JSON truncado")
+        
+        if buffer[pos] == ']':
+            return
+        
+        start = pos
+        container = buffer[start] in '{["'
+        try:
+            element, pos = decoder.raw_decode(buffer, start)
+            # Um número ou literal só está completo se um delimitador vem
+            # logo depois: '25506.' no fim do buffer pode ser '25506.9'
+            complete = container or _JSON_SCALAR_END.match(buffer, pos) is not None
+        except json.JSONDecodeError:
+            complete = False
+        
+        if not complete:
+            parts = [buffer[start:]]
+            if container:
+                end, state = _scan_json_value(parts[0], 0, (0, False, False))
+                while end is None:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        raise ValueError("Array JSON truncado")
+                    parts.append(chunk)
+                    end, state = _scan_json_value(chunk, 0, state)
+            else:
+                while not _JSON_SCALAR_END.search(parts[-1]):
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    parts.append(chunk)
+            buffer = ''.join(parts)
+            element, pos = decoder.raw_decode(buffer)
+        
+        yield element
+
+
+# Maior alvo possível (qualquer hash de 256 bits é aceito)
+MAX_TARGET = (1 << 256) - 1
+
+# Formatos de timestamp aceitos no reajuste de dificuldade
+_TIMESTAMP_FORMATS = ('%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y')
+
+
+def _timestamp_seconds(timestamp: Any) -> Optional[float]:
+    """
+    Converte o timestamp de um bloco para segundos.
+    
+    Aceita números (time.time()), ISO 8601 e os formatos de data usados
+    pela biblioteca ('01/01/2024 10:00:00').
+    
+    Returns:
+        Segundos desde a época, ou None se o formato não é reconhecido
+    """
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return float(timestamp)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        pass
+    for fmt in _TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(timestamp, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+class _PendingTransactions(list):
+    """
+    Cópia somente leitura das transações da mempool.
+    
+    Antes pending_transactions era a própria lista de pendentes; hoje é
+    uma cópia, e alterá-la não mudaria nada. Por isso toda mutação
+    levanta TypeError em vez de ser perdida em silêncio.
+    """
+    
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError(
+            "pending_transactions é somente leitura: use add_transaction(), "
+            "add_transactions() ou os métodos de mempool"
+        )
+    
+    append = extend = insert = remove = pop = clear = _read_only
+    sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
 
 
 class Blockchain:
@@ -22,30 +239,109 @@ class Blockchain:
     Gerencia a cadeia de blocos, validação, mineração e consenso.
     
     Attributes:
-        chain: Lista de blocos na cadeia
-        difficulty: Nível de dificuldade da mineração
-        pending_transactions: Transações aguardando inclusão
-        mining_reward: Recompensa para mineradores
+        chain: Lista de blocos na cadeia (ou MappedChain, ver open_archive)
+        difficulty: Nível de dificuldade da mineração (com reajuste, é o
+            ponto de partida do alvo numérico)
+        target_block_time: Tempo desejado entre blocos em segundos (None
+            desativa o reajuste de dificuldade)
+        retarget_window: Blocos entre reajustes
+        pending_transactions: Transações aguardando inclusão (em ordem
+            de prioridade da mempool; cópia somente leitura)
+        mempool: Mempool com as transações pendentes
+        mining_reward: Recompensa para mineradores (mais as taxas)
+        block_version: Versão dos blocos minerados (ver Block)
+        telemetry: Registro de métricas (latência de validação e de
+            consultas de saldo)
+        require_signatures: Exige assinatura válida em toda transação
+            que não seja do SYSTEM (transações assinadas são sempre
+            verificadas)
+        verifier: Verificador de assinaturas com cache de txids
+        enforce_balances: Confere saldos e transações repetidas ao montar
+            e ao validar blocos
+    
+    Os saldos são mantidos em um índice incremental (endereço -> saldo)
+    atualizado a cada bloco adicionado, então get_balance é O(1).
     """
     
-    def __init__(self, difficulty: int = 4):
+    def __init__(self, difficulty: int = 4, block_version: int = 1,
+                 mempool_size: int = 10000, mempool_priority: str = 'fee',
+                 telemetry: Optional[Telemetry] = None,
+                 target_block_time: Optional[float] = None, retarget_window: int = 10,
+                 require_signatures: bool = False,
+                 signature_workers: Optional[int] = None,
+                 enforce_balances: bool = False, finality_depth: int = 100):
         """
         Inicializa blockchain com bloco gênese.
         
         Args:
             difficulty: Nível de dificuldade da mineração (padrão: 4)
+            block_version: Versão dos blocos minerados; 2 usa cabeçalho
+                com raiz de Merkle (padrão: 1)
+            mempool_size: Máximo de transações pendentes (padrão: 10000)
+            mempool_priority: Prioridade da mempool, 'fee' ou 'age'
+            telemetry: Registro de métricas (padrão: registro global,
+                desativado até telemetry.enabled = True)
+            target_block_time: Tempo desejado entre blocos em segundos;
+                ativa o reajuste de dificuldade (padrão: None, desativado)
+            retarget_window: Blocos entre reajustes (padrão: 10)
+            require_signatures: Rejeita transações sem assinatura
+                (padrão: False)
+            signature_workers: Processos usados para verificar as
+                assinaturas de blocos grandes (padrão: serial)
+            enforce_balances: Rejeita gastos acima do saldo e transações
+                já confirmadas na montagem e na validação de blocos
+                (padrão: False)
+            finality_depth: Profundidade a partir da qual um bloco é
+                final: ramificações abaixo dela são descartadas e não
+                podem mais reorganizar a cadeia (padrão: 100)
         """
+        if retarget_window < 2:
+            raise ValueError("retarget_window deve ser pelo menos 2")
+        if finality_depth < 1:
+            raise ValueError("finality_depth deve ser pelo menos 1")
+        
         self.chain: List[Block] = []
         self.difficulty = difficulty
-        self.pending_transactions: List[Transaction] = []
+        self.target_block_time = target_block_time
+        self.retarget_window = retarget_window
+        self.block_version = block_version
+        self.mempool = Mempool(max_size=mempool_size, priority=mempool_priority)
+        self.telemetry = telemetry if telemetry is not None else default_telemetry
         self.mining_reward = 100
+        self.require_signatures = require_signatures
+        self.verifier = SignatureVerifier(workers=signature_workers)
+        self.enforce_balances = enforce_balances
+        self.finality_depth = finality_depth
+        
+        # Índices atualizados a cada bloco conectado: saldo por endereço,
+        # altura por hash, local de cada transação (txid -> (altura,
+        # posição)), altura de cada conteúdo assinado (ver content_id,
+        # usado para detectar repetições), histórico por endereço (lista
+        # ordenada de (altura, posição)), trabalho acumulado e dados de
+        # desfazer (variação de saldos e txids do bloco) por altura
+        self._balances: Dict[str, float] = {}
+        self._heights: Dict[str, int] = {}
+        self._tx_index: Dict[str, Tuple[int, int]] = {}
+        self._content_index: Dict[str, int] = {}
+        self._history: Dict[str, List[Tuple[int, int]]] = {}
+        self._cumulative_work: List[int] = []
+        self._undo: List[Tuple[Dict[str, float], List[str]]] = []
+        
+        # Blocos válidos fora da cadeia principal (ramificações):
+        # hash -> (bloco, altura, trabalho acumulado); os que ficam
+        # abaixo da profundidade de finalidade são descartados
+        self._side: Dict[str, Tuple[Block, int, int]] = {}
+        
+        # Altura do último bloco já validado (validação incremental)
+        self._verified_height = 0
         
         # Cria o bloco gênese (primeiro bloco da cadeia)
         self.chain.append(self.create_genesis_block())
+        self._connect_block(self.chain[0], 0)
         
-        print("🎉 Blockchain inicializada!")
-        print(f"   Dificuldade: {self.difficulty}")
-        print(f"   Bloco Gênese: {self.chain[0].hash[:16]}...")
+        logger.info("🎉 Blockchain inicializada!")
+        logger.info("   Dificuldade: %s", self.difficulty)
+        logger.info("   Bloco Gênese: %s...", self.chain[0].hash[:16])
     
     def create_genesis_block(self) -> Block:
         """
@@ -75,54 +371,245 @@ class Blockchain:
         """
         return self.chain[-1]
     
+    @property
+    def pending_transactions(self) -> List[Transaction]:
+        """
+        Transações pendentes em ordem de prioridade.
+        
+        É uma cópia somente leitura: append, clear e afins levantam
+        TypeError. Para incluir transações use add_transaction() ou
+        add_transactions(); para removê-las, a mempool.
+        """
+        return _PendingTransactions(self.mempool)
+    
     def add_transaction(self, transaction: Transaction) -> int:
         """
-        Adiciona transação à lista de pendentes.
+        Adiciona transação à mempool.
         
         Args:
             transaction: Transação a ser adicionada
             
         Returns:
-            Índice do próximo bloco que incluirá esta transação
+            Índice do próximo bloco que incluirá esta transação, ou -1 se
+            ela foi rejeitada (remetente SYSTEM, assinatura inválida ou
+            ausente, duplicada ou mempool cheia)
         """
-        self.pending_transactions.append(transaction)
-        print(f"📝 Transação adicionada: {transaction}")
+        if self._admission_reason(transaction) is not None or not self.mempool.add(transaction):
+            logger.warning("⚠️  Transação rejeitada: %s", transaction)
+            return -1
+        logger.info("📝 Transação adicionada: %s", transaction)
         return self.get_last_block().index + 1
     
-    def mine_pending_transactions(self, miner_address: str) -> Block:
+    def add_transactions(self, transactions: Iterable[Transaction],
+                         check_balance: bool = False) -> Dict:
         """
-        Minera bloco com transações pendentes e recompensa minerador.
+        Adiciona um lote de transações à mempool.
+        
+        Aceita listas ou geradores e imprime apenas um resumo do lote.
+        As assinaturas do lote são verificadas de uma só vez (em
+        processos, se signature_workers foi configurado). Com
+        check_balance=True, cada remetente precisa ter saldo para o
+        valor mais a taxa: o saldo confirmado vem do índice de saldos, os
+        gastos já pendentes na mempool são somados em uma única passada e
+        o saldo disponível é debitado à medida que o lote é aceito.
         
         Args:
-            miner_address: Endereço do minerador (recebe recompensa)
+            transactions: Transações a adicionar
+            check_balance: Rejeita transações sem saldo suficiente
+                (padrão: False, como add_transaction)
             
         Returns:
-            Bloco minerado
+            Dicionário com 'accepted', 'rejected' e 'reasons' (contagem
+            por motivo: 'duplicate', 'mempool_full', 'invalid_amount',
+            'insufficient_funds', 'invalid_sender', 'invalid_signature',
+            'missing_signature')
         """
+        transactions = list(transactions)
+        signed = [(tx.txid, tx.to_dict()) for tx in transactions if tx.signature is not None]
+        if signed:
+            self.verifier.verify(signed)
+        
+        mempool = self.mempool
+        accepted = 0
+        reasons: Dict[str, int] = {}
+        # Variação de saldo ainda não confirmada por remetente
+        pending = mempool.pending_balance_changes() if check_balance else {}
+        
+        for tx in transactions:
+            reason = None
+            cost = tx.amount + tx.fee
+            
+            if tx in mempool:
+                reason = 'duplicate'
+            else:
+                reason = self._admission_reason(tx)
+            
+            if reason is None and check_balance:
+                if tx.amount <= 0 or tx.fee < 0:
+                    reason = 'invalid_amount'
+                elif self._balances.get(tx.sender, 0) + pending.get(tx.sender, 0) < cost:
+                    reason = 'insufficient_funds'
+            
+            if reason is None and not mempool.add(tx):
+                reason = 'mempool_full'
+            
+            if reason is None:
+                accepted += 1
+                if check_balance:
+                    pending[tx.sender] = pending.get(tx.sender, 0) - cost
+            else:
+                reasons[reason] = reasons.get(reason, 0) + 1
+        
+        rejected = sum(reasons.values())
+        logger.info("📝 Lote de transações: %s aceitas, %s rejeitadas", accepted, rejected)
+        return {'accepted': accepted, 'rejected': rejected, 'reasons': reasons}
+    
+    def _admission_reason(self, tx: Transaction) -> Optional[str]:
+        """
+        Confere remetente e assinatura de uma transação antes da mempool.
+        
+        Transações do SYSTEM só existem como recompensa criada por
+        prepare_block; vindas de fora, criariam moedas do nada.
+        
+        Returns:
+            None se aceitável, 'invalid_sender', 'invalid_signature' ou
+            'missing_signature'
+        """
+        if tx.sender == 'SYSTEM':
+            return 'invalid_sender'
+        if tx.signature is None:
+            return 'missing_signature' if self.require_signatures else None
+        return None if self.verifier.verify_transaction(tx) else 'invalid_signature'
+    
+    def prepare_block(self, miner_address: str,
+                      max_transactions: Optional[int] = None,
+                      max_block_bytes: Optional[int] = None) -> Tuple[Block, List[Transaction]]:
+        """
+        Monta (sem minerar) o próximo bloco com as transações pendentes.
+        
+        O bloco recebe as transações de maior prioridade da mempool,
+        limitadas por quantidade e tamanho, mais a recompensa do minerador.
+        Com enforce_balances, transações sem saldo (considerando as já
+        escolhidas para o bloco) ficam de fora e as já confirmadas saem
+        da mempool. Transações com remetente SYSTEM nunca entram (a única
+        é a recompensa) e também saem da mempool.
+        Nada é alterado na blockchain: o bloco pode ser minerado em outra
+        thread e depois confirmado com commit_block.
+        
+        Args:
+            miner_address: Endereço do minerador (recebe recompensa e taxas)
+            max_transactions: Máximo de transações no bloco (padrão: todas)
+            max_block_bytes: Tamanho máximo das transações serializadas
+                (padrão: sem limite)
+            
+        Returns:
+            Tupla (bloco não minerado, transações da mempool incluídas)
+        """
+        enforce = self.enforce_balances
+        if enforce:
+            running, base, _, _ = self._spending_state(len(self.chain) - 1)
+        skipped: Dict[str, List[Transaction]] = {}
+        # Conteúdos já escolhidos para o bloco: a mesma transação com
+        # outra assinatura (ou sem ela) tem outro txid
+        chosen: Set[str] = set()
+        
+        def accept(tx: Transaction) -> bool:
+            if tx.sender == 'SYSTEM':
+                failure = ('invalid_sender',)
+            elif not enforce:
+                return True
+            else:
+                key = content_id(tx.to_dict(), tx.txid)
+                if key in self._content_index or key in chosen:
+                    failure = ('duplicate_transaction',)
+                else:
+                    failure = self._spend(running, base, tx.sender, tx.receiver,
+                                          tx.amount, tx.fee)
+                    if failure is None:
+                        chosen.add(key)
+            if failure is not None:
+                skipped.setdefault(failure[0], []).append(tx)
+            return failure is None
+        
+        selected = self.mempool.select(max_transactions, max_block_bytes, accept)
+        if skipped:
+            self.mempool.remove(skipped.get('duplicate_transaction', []) +
+                                skipped.get('invalid_sender', []))
+            logger.info("⏭️  Transações fora do bloco: %s",
+                        {reason: len(txs) for reason, txs in skipped.items()})
+        
         # Cria transação de recompensa para o minerador
         reward_tx = Transaction(
             sender="SYSTEM",
             receiver=miner_address,
-            amount=self.mining_reward
+            amount=self.mining_reward + sum(tx.fee for tx in selected)
         )
-        self.pending_transactions.append(reward_tx)
         
         # Cria novo bloco com transações pendentes
         new_block = Block(
             index=len(self.chain),
             timestamp=datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-            data=[tx.to_dict() for tx in self.pending_transactions],
-            prior_hash=self.get_last_block().hash
+            data=[tx.to_dict() for tx in selected] + [reward_tx.to_dict()],
+            prior_hash=self.get_last_block().hash,
+            version=self.block_version,
+            target=self.next_target()
         )
+        return new_block, selected
+    
+    def commit_block(self, block: Block, transactions: List[Transaction]) -> None:
+        """
+        Adiciona um bloco preparado e já minerado à cadeia.
+        
+        Args:
+            block: Bloco retornado por prepare_block e minerado
+            transactions: Transações da mempool incluídas no bloco
+            
+        Raises:
+            ValueError: Se a cadeia avançou desde prepare_block
+        """
+        if block.prior_hash != self.get_last_block().hash:
+            raise ValueError("Bloco preparado não aponta para o topo atual da cadeia")
+        
+        # Adiciona à cadeia e remove transações incluídas da mempool; os
+        # txids já calculados pela mempool são reaproveitados no índice
+        txids = [tx.txid for tx in transactions]
+        if len(block.data) == len(txids) + 1:
+            txids.append(transaction_id(block.data[-1]))
+        else:
+            txids = None
+        self.chain.append(block)
+        self._connect_block(block, len(self.chain) - 1, txids)
+        self.mempool.remove(transactions)
+        self._prune_side()
+    
+    def mine_pending_transactions(self, miner_address: str,
+                                  max_transactions: Optional[int] = None,
+                                  max_block_bytes: Optional[int] = None) -> Block:
+        """
+        Minera bloco com transações pendentes e recompensa minerador.
+        
+        Equivale a prepare_block, mine_block e commit_block em sequência;
+        as transações que não couberem no bloco continuam pendentes.
+        
+        Args:
+            miner_address: Endereço do minerador (recebe recompensa e taxas)
+            max_transactions: Máximo de transações no bloco (padrão: todas)
+            max_block_bytes: Tamanho máximo das transações serializadas
+                (padrão: sem limite)
+            
+        Returns:
+            Bloco minerado
+        """
+        new_block, selected = self.prepare_block(miner_address, max_transactions,
+                                                 max_block_bytes)
         
         # Minera o bloco
         new_block.mine_block(self.difficulty)
         
-        # Adiciona à cadeia e limpa transações pendentes
-        self.chain.append(new_block)
-        self.pending_transactions = []
+        self.commit_block(new_block, selected)
         
-        print(f"💎 Minerador {miner_address} recebeu {self.mining_reward} moedas!")
+        logger.info("💎 Minerador %s recebeu %s moedas!",
+                    miner_address, new_block.data[-1]['amount'])
         
         return new_block
     
@@ -134,8 +621,312 @@ class Blockchain:
             new_block: Bloco a ser adicionado
         """
         new_block.prior_hash = self.get_last_block().hash
+        new_block.target = self.next_target()
         new_block.mine_block(self.difficulty)
         self.chain.append(new_block)
+        self._connect_block(new_block, len(self.chain) - 1)
+    
+    def validate_chain(self, incremental: bool = True,
+                       workers: Optional[int] = None) -> Dict:
+        """
+        Valida a blockchain e retorna um relatório estruturado.
+        
+        Verifica:
+        1. Hash de cada bloco está correto (e, na versão 2, se a raiz de
+           Merkle corresponde aos dados)
+        2. Cada bloco aponta corretamente para o anterior
+        3. Hash atende ao nível de dificuldade
+        4. Com enforce_balances, nenhum remetente gasta mais que o saldo
+           e nenhuma transação aparece duas vezes (uma única passada
+           com saldos acumulados, ver _spending_failure)
+        
+        No modo incremental apenas os blocos acima da última altura já
+        verificada são checados, então validar após cada novo bloco custa
+        O(1). Adulterações em blocos já verificados só são detectadas no
+        modo completo (incremental=False).
+        
+        Args:
+            incremental: Valida apenas blocos novos (padrão: True)
+            workers: Se informado (> 1), recalcula os hashes em um pool
+                com esse número de processos; o encadeamento continua
+                sendo verificado serialmente
+            
+        Returns:
+            Dicionário com 'valid', 'first_bad_index', 'reason'
+            ('invalid_merkle_root', 'mutated_merkle_tree' (transações
+            repetidas que não mudam a raiz), 'invalid_hash', 'broken_link',
+            'invalid_target', 'insufficient_difficulty',
+            'invalid_signature', 'missing_signature' e, com
+            enforce_balances, 'duplicate_transaction', 'invalid_amount',
+            'insufficient_funds' ou 'invalid_reward'), 'expected',
+            'actual' e 'checked' (blocos verificados)
+        """
+        mode = 'incremental' if incremental else 'full'
+        with self.telemetry.timer('educhain_validation_seconds', {'mode': mode}):
+            report = self._validate_blocks(incremental, workers)
+        self.telemetry.inc('educhain_validated_blocks_total', report['checked'], {'mode': mode})
+        return report
+    
+    def _validate_blocks(self, incremental: bool, workers: Optional[int]) -> Dict:
+        """Executa as verificações de validate_chain (ver documentação)."""
+        if not incremental or self._verified_height >= len(self.chain):
+            self._verified_height = 0
+        
+        # Começa após o último bloco verificado (gênese não tem prior)
+        start = self._verified_height + 1
+        blocks = self.chain[start:]
+        
+        if workers and workers > 1 and len(blocks) > 1:
+            chunksize = max(1, len(blocks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                checks = list(executor.map(_check_block_contents, blocks, chunksize=chunksize))
+        else:
+            checks = [_check_block_contents(block) for block in blocks]
+        
+        report = self._report(checked=len(blocks))
+        spending = self._spending_state(start - 1) if self.enforce_balances else None
+        
+        for offset, current_block in enumerate(blocks):
+            i = start + offset
+            failure = self._block_failure(current_block, self.chain[i - 1], i, checks[offset])
+            if failure is None and spending is not None:
+                failure = self._spending_failure(current_block, *spending)
+            if failure is None:
+                continue
+            
+            self._verified_height = i - 1
+            return self._report(i, failure, checked=offset + 1)
+        
+        self._verified_height = len(self.chain) - 1
+        return report
+    
+    @staticmethod
+    def _report(index: Optional[int] = None, failure: Optional[Tuple] = None,
+                checked: int = 0) -> Dict:
+        """Monta o relatório estruturado de validação."""
+        if failure is None:
+            return {'valid': True, 'first_bad_index': None, 'reason': None,
+                    'expected': None, 'actual': None, 'checked': checked}
+        return {'valid': False, 'first_bad_index': index, 'reason': failure[0],
+                'expected': failure[1], 'actual': failure[2], 'checked': checked}
+    
+    def _block_failure(self, block: Block, previous_block: Block, height: int,
+                       checks: Optional[Tuple[bytes, bool]] = None,
+                       branch: Optional[Dict[str, Block]] = None) -> Optional[Tuple]:
+        """
+        Verifica um bloco em relação ao seu antecessor.
+        
+        Blocos sem alvo numérico são verificados contra a dificuldade da
+        cadeia (zeros à esquerda); blocos com alvo, contra o próprio alvo,
+        que precisa ser o esperado pela regra de reajuste (ou, sem
+        reajuste, não pode ser mais fácil que a dificuldade da cadeia).
+        Por último, as mais caras, vêm as assinaturas das transações.
+        
+        Args:
+            block: Bloco a verificar
+            previous_block: Bloco ao qual ele deve estar encadeado
+            height: Altura do bloco
+            checks: Resultado já calculado de _check_block_contents
+            branch: Blocos de uma ramificação ainda fora da árvore
+                (hash -> bloco), usados para achar antecessores
+            
+        Returns:
+            None se o bloco é válido, ou tupla (motivo, esperado, obtido)
+        """
+        digest, merkle_ok = checks if checks is not None else _check_block_contents(block)
+        
+        if not merkle_ok:
+            root = block.compute_merkle_root()
+            if root == block.merkle_root:
+                return ('mutated_merkle_tree', None, root)
+            return ('invalid_merkle_root', root, block.merkle_root)
+        if block.hash_bytes != digest:
+            return ('invalid_hash', digest.hex(), block.hash)
+        if block.prior_hash != previous_block.hash:
+            return ('broken_link', previous_block.hash, block.prior_hash)
+        
+        expected_target = self._expected_target(previous_block, height - 1, branch)
+        if expected_target is not None:
+            if block.target != expected_target:
+                return ('invalid_target', f"{expected_target:064x}",
+                        None if block.target is None else f"{block.target:064x}")
+        elif block.target is not None and block.target > target_from_difficulty(self.difficulty):
+            return ('invalid_target', f"{target_from_difficulty(self.difficulty):064x}",
+                    f"{block.target:064x}")
+        
+        if block.target is None:
+            prefix = '0' * self.difficulty
+            if not block.hash.startswith(prefix):
+                return ('insufficient_difficulty', prefix, block.hash)
+        elif int.from_bytes(digest, 'big') >= block.target:
+            return ('insufficient_difficulty', f"{block.target:064x}", block.hash)
+        return self._signature_failure(block)
+    
+    def _signature_failure(self, block: Block) -> Optional[Tuple]:
+        """
+        Verifica as assinaturas das transações de um bloco.
+        
+        Transações já verificadas (na mempool ou em outra validação)
+        saem do cache; as demais são verificadas em lote.
+        
+        Returns:
+            None se válidas, ou tupla (motivo, None, txid)
+        """
+        if not isinstance(block.data, list):
+            return None
+        
+        signed = []
+        for tx in block.data:
+            if not isinstance(tx, dict) or tx.get('sender') == 'SYSTEM':
+                continue
+            if 'signature' in tx:
+                signed.append((transaction_id(tx), tx))
+            elif self.require_signatures:
+                return ('missing_signature', None, transaction_id(tx))
+        
+        if signed:
+            for (txid, _), ok in zip(signed, self.verifier.verify(signed)):
+                if not ok:
+                    return ('invalid_signature', None, txid)
+        return None
+    
+    def _balances_at(self, height: int) -> Callable[[str], float]:
+        """
+        Saldos da cadeia principal logo após o bloco height.
+        
+        Calculados com os dados de desfazer pelo lado mais curto: somando
+        as variações até height ou descontando as posteriores do índice
+        de saldos.
+        
+        Returns:
+            Função endereço -> saldo
+        """
+        balances = self._balances
+        if height >= len(self.chain) - 1:
+            return lambda address: balances.get(address, 0)
+        
+        partial: Dict[str, float] = {}
+        below = height + 1 <= len(self.chain) - height - 1
+        for deltas, _ in (self._undo[:height + 1] if below else self._undo[height + 1:]):
+            for address, delta in deltas.items():
+                partial[address] = partial.get(address, 0) + delta
+        if below:
+            return lambda address: partial.get(address, 0)
+        return lambda address: balances.get(address, 0) - partial.get(address, 0)
+    
+    def _spending_state(self, height: int) -> Tuple[Dict[str, float], Callable[[str], float],
+                                                    Set[str], int]:
+        """
+        Estado inicial de uma passada de saldos sobre os blocos após height.
+        
+        Returns:
+            Tupla (saldos já alterados na passada, saldos iniciais,
+            conteúdos vistos na passada, altura até a qual o índice de
+            conteúdos conta como já confirmado)
+        """
+        return {}, self._balances_at(height), set(), height
+    
+    @staticmethod
+    def _spend(running: Dict[str, float], base: Callable[[str], float],
+               sender: Any, receiver: Any, amount: Any, fee: Any) -> Optional[Tuple]:
+        """
+        Aplica uma transação aos saldos acumulados de uma passada.
+        
+        Transações do SYSTEM (recompensas) apenas creditam o destinatário.
+        
+        Returns:
+            None se aplicada, ou tupla (motivo, esperado, obtido)
+        """
+        if sender != 'SYSTEM':
+            if not isinstance(amount, (int, float)) or not isinstance(fee, (int, float)) \
+                    or amount <= 0 or fee < 0:
+                return ('invalid_amount', None, amount)
+            cost = amount + fee
+            balance = running[sender] if sender in running else base(sender)
+            if balance < cost:
+                return ('insufficient_funds', cost, balance)
+            running[sender] = balance - cost
+        running[receiver] = (running[receiver] if receiver in running else base(receiver)) + amount
+        return None
+    
+    def _spending_failure(self, block: Block, running: Dict[str, float],
+                          base: Callable[[str], float], seen: Set[str],
+                          known_below: int) -> Optional[Tuple]:
+        """
+        Confere saldos e repetições das transações de um bloco.
+        
+        Faz parte de uma passada única em ordem pelos blocos: os saldos
+        acumulados (running) e os conteúdos vistos (seen) continuam de um
+        bloco para o próximo, então nenhum saldo é recalculado.
+        
+        Repetições são detectadas pelo conteúdo assinado (content_id),
+        não pelo txid: reescrever ou remover a assinatura de uma
+        transação confirmada muda o txid, mas não a torna nova.
+        
+        Args:
+            block: Próximo bloco da passada
+            running: Saldos já alterados na passada (atualizado)
+            base: Saldos antes do primeiro bloco da passada
+            seen: Conteúdos (content_id) já vistos na passada (atualizado)
+            known_below: Conteúdos no índice até essa altura já estão
+                confirmados antes da passada
+            
+        Returns:
+            None se válidas, ou tupla (motivo, esperado, obtido):
+            'duplicate_transaction' (txid da transação repetida),
+            'invalid_amount' (valor recebido), 'insufficient_funds'
+            (custo e saldo disponível) ou 'invalid_reward' (recompensa
+            esperada e obtida; para uma transação do SYSTEM fora da
+            última posição, None e seu txid)
+        """
+        if not isinstance(block.data, list):
+            return None
+        
+        # No máximo uma transação do SYSTEM, na última posição, com valor
+        # igual à recompensa mais as taxas do bloco
+        last = len(block.data) - 1
+        fees = 0
+        content_index = self._content_index
+        for position, tx in enumerate(block.data):
+            if not isinstance(tx, dict):
+                continue
+            sender = tx.get('sender')
+            if sender == 'SYSTEM':
+                if position != last:
+                    return ('invalid_reward', None, transaction_id(tx))
+                reward = self.mining_reward + fees
+                if tx.get('amount') != reward:
+                    return ('invalid_reward', reward, tx.get('amount'))
+            else:
+                txid = transaction_id(tx)
+                key = content_id(tx, txid)
+                known = content_index.get(key)
+                if key in seen or (known is not None and known <= known_below):
+                    return ('duplicate_transaction', None, txid)
+                seen.add(key)
+            failure = self._spend(running, base, sender, tx.get('receiver'),
+                                  tx.get('amount', 0), tx.get('fee', 0))
+            if failure is not None:
+                return failure
+            if sender != 'SYSTEM':
+                fees += tx.get('fee', 0)
+        return None
+    
+    def _branch_spending_failure(self, fork_height: int,
+                                 blocks: List[Block]) -> Optional[Tuple[int, Tuple]]:
+        """
+        Confere saldos e repetições de uma ramificação a partir do ponto
+        de divergência.
+        
+        Returns:
+            None se válida, ou tupla (altura do bloco, falha)
+        """
+        spending = self._spending_state(fork_height)
+        for offset, block in enumerate(blocks):
+            failure = self._spending_failure(block, *spending)
+            if failure is not None:
+                return fork_height + 1 + offset, failure
+        return None
     
     def is_chain_valid(self) -> bool:
         """
@@ -149,41 +940,179 @@ class Blockchain:
         Returns:
             True se blockchain é válida, False caso contrário
         """
-        print("\n🔍 Validando blockchain...")
+        logger.info("🔍 Validando blockchain...")
         
-        # Começa do segundo bloco (índice 1), pois gênese não tem prior
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
-            
-            # Verifica 1: Hash do bloco atual está correto?
-            if current_block.hash != current_block.create_hash():
-                print(f"❌ Bloco {i}: Hash inválido!")
-                print(f"   Hash armazenado: {current_block.hash}")
-                print(f"   Hash calculado: {current_block.create_hash()}")
-                return False
-            
-            # Verifica 2: Bloco atual aponta para o anterior?
-            if current_block.prior_hash != previous_block.hash:
-                print(f"❌ Bloco {i}: Encadeamento quebrado!")
-                print(f"   Prior hash esperado: {previous_block.hash}")
-                print(f"   Prior hash atual: {current_block.prior_hash}")
-                return False
-            
-            # Verifica 3: Hash atende dificuldade?
-            prefix = '0' * self.difficulty
-            if not current_block.hash.startswith(prefix):
-                print(f"❌ Bloco {i}: Não atende dificuldade!")
-                print(f"   Esperado: hash começando com '{prefix}'")
-                print(f"   Obtido: {current_block.hash[:10]}...")
-                return False
+        report = self.validate_chain(incremental=False)
+        
+        if report['valid']:
+            logger.info("✅ Blockchain válida! Todos os blocos estão íntegros.")
+            return True
+        
+        i = report['first_bad_index']
+        if report['reason'] == 'invalid_merkle_root':
+            logger.warning("❌ Bloco %s: Raiz de Merkle não corresponde aos dados!", i)
+            logger.warning("   Raiz armazenada: %s", report['actual'])
+            logger.warning("   Raiz calculada: %s", report['expected'])
+        elif report['reason'] == 'mutated_merkle_tree':
+            logger.warning("❌ Bloco %s: Transações repetidas na árvore de Merkle!", i)
+            logger.warning("   Raiz: %s", report['actual'])
+        elif report['reason'] == 'invalid_hash':
+            logger.warning("❌ Bloco %s: Hash inválido!", i)
+            logger.warning("   Hash armazenado: %s", report['actual'])
+            logger.warning("   Hash calculado: %s", report['expected'])
+        elif report['reason'] == 'broken_link':
+            logger.warning("❌ Bloco %s: Encadeamento quebrado!", i)
+            logger.warning("   Prior hash esperado: %s", report['expected'])
+            logger.warning("   Prior hash atual: %s", report['actual'])
+        elif report['reason'] == 'invalid_target':
+            logger.warning("❌ Bloco %s: Alvo de dificuldade incorreto!", i)
+            logger.warning("   Alvo esperado: %s", report['expected'])
+            logger.warning("   Alvo do bloco: %s", report['actual'])
+        elif report['reason'] in ('invalid_signature', 'missing_signature'):
+            logger.warning("❌ Bloco %s: Transação sem assinatura válida!", i)
+            logger.warning("   Transação: %s", report['actual'])
+        elif report['reason'] == 'duplicate_transaction':
+            logger.warning("❌ Bloco %s: Transação repetida!", i)
+            logger.warning("   Transação: %s", report['actual'])
+        elif report['reason'] == 'invalid_reward':
+            logger.warning("❌ Bloco %s: Recompensa do minerador inválida!", i)
+            logger.warning("   Esperada: %s", report['expected'])
+            logger.warning("   Obtida: %s", report['actual'])
+        elif report['reason'] == 'invalid_amount':
+            logger.warning("❌ Bloco %s: Valor de transação inválido: %s", i, report['actual'])
+        elif report['reason'] == 'insufficient_funds':
+            logger.warning("❌ Bloco %s: Gasto acima do saldo!", i)
+            logger.warning("   Necessário: %s", report['expected'])
+            logger.warning("   Disponível: %s", report['actual'])
+        elif len(report['expected']) < 64:
+            logger.warning("❌ Bloco %s: Não atende dificuldade!", i)
+            logger.warning("   Esperado: hash começando com '%s'", report['expected'])
+            logger.warning("   Obtido: %s...", report['actual'][:10])
+        else:
+            logger.warning("❌ Bloco %s: Não atende dificuldade!", i)
+            logger.warning("   Esperado: hash menor que %s", report['expected'])
+            logger.warning("   Obtido: %s", report['actual'])
+        return False
+    
+    def _connect_block(self, block: Block, height: int,
+                       txids: Optional[List[str]] = None) -> None:
+        """
+        Aplica um bloco recém-adicionado aos índices da cadeia.
+        
+        No índice de saldos segue a mesma semântica da varredura
+        completa: blocos cujos dados não são listas e itens que não são
+        dicionários são ignorados, e transações do SYSTEM (recompensas)
+        apenas creditam o destinatário. O remetente paga o valor mais a
+        taxa; as taxas chegam ao minerador pela transação de recompensa.
+        
+        Cada transação entra no índice de txids (a primeira ocorrência de
+        um txid é a que vale) e no histórico do remetente e do
+        destinatário. A variação de saldos e os txids do bloco
+        são guardados como dados de desfazer, usados por
+        _disconnect_block em reorganizações.
+        
+        Args:
+            block: Bloco recém-adicionado à cadeia
+            height: Altura do bloco na cadeia
+            txids: txids já calculados das transações do bloco, na ordem
+                de block.data (opcional)
+        """
+        self._heights[block.hash] = height
+        self._cumulative_work.append(self.chain_work + self.block_work(block))
+        
+        deltas: Dict[str, float] = {}
+        block_txids: List[str] = []
+        if isinstance(block.data, list):
+            tx_index = self._tx_index
+            content_index = self._content_index
+            history = self._history
+            for position, tx in enumerate(block.data):
+                if isinstance(tx, dict):
+                    amount = tx.get('amount', 0)
+                    sender = tx.get('sender')
+                    receiver = tx.get('receiver')
+                    deltas[sender] = deltas.get(sender, 0) - amount - tx.get('fee', 0)
+                    deltas[receiver] = deltas.get(receiver, 0) + amount
+                    
+                    txid = txids[position] if txids is not None else transaction_id(tx)
+                    tx_index.setdefault(txid, (height, position))
+                    content_index.setdefault(content_id(tx, txid), height)
+                    block_txids.append(txid)
+                    
+                    posting = (height, position)
+                    history.setdefault(sender, []).append(posting)
+                    if receiver != sender:
+                        history.setdefault(receiver, []).append(posting)
+        
+        balances = self._balances
+        for address, delta in deltas.items():
+            balances[address] = balances.get(address, 0) + delta
+        self._undo.append((deltas, block_txids))
+    
+    def _disconnect_block(self) -> Block:
+        """
+        Remove o bloco do topo, revertendo os índices com os dados de
+        desfazer (sem varrer a cadeia).
+        
+        Returns:
+            Bloco removido
+        """
+        block = self.chain.pop()
+        del self._heights[block.hash]
+        self._cumulative_work.pop()
+        
+        deltas, txids = self._undo.pop()
+        height = len(self.chain)
+        balances = self._balances
+        history = self._history
+        for address, delta in deltas.items():
+            balances[address] = balances.get(address, 0) - delta
+            # As entradas do bloco removido estão no fim das listas
+            postings = history.get(address)
+            while postings and postings[-1][0] == height:
+                postings.pop()
+            if postings is not None and not postings:
+                del history[address]
+        
+        tx_index = self._tx_index
+        content_index = self._content_index
+        for txid in txids:
+            if tx_index.get(txid, (None,))[0] == height:
+                del tx_index[txid]
+        if isinstance(block.data, list):
+            for tx, txid in zip((tx for tx in block.data if isinstance(tx, dict)), txids):
+                key = content_id(tx, txid)
+                if content_index.get(key) == height:
+                    del content_index[key]
         
-        print("✅ Blockchain válida! Todos os blocos estão íntegros.")
-        return True
+        self._verified_height = min(self._verified_height, len(self.chain) - 1)
+        return block
+    
+    def rebuild_indexes(self) -> None:
+        """
+        Reconstrói todos os índices (saldos, alturas, trabalho, dados de
+        desfazer) a partir da cadeia.
+        
+        Necessário apenas quando self.chain é modificada diretamente
+        (sem passar por add_block, mine_pending_transactions etc.).
+        """
+        self._balances = {}
+        self._heights = {}
+        self._tx_index = {}
+        self._content_index = {}
+        self._history = {}
+        self._cumulative_work = []
+        self._undo = []
+        for height, block in enumerate(self.chain):
+            self._connect_block(block, height)
+    
+    def rebuild_balance_index(self) -> None:
+        """Reconstrói o índice de saldos (ver rebuild_indexes)."""
+        self.rebuild_indexes()
     
     def get_balance(self, address: str) -> float:
         """
-        Calcula saldo de um endereço analisando toda a blockchain.
+        Retorna o saldo de um endereço a partir do índice de saldos.
         
         Args:
             address: Endereço a consultar
@@ -191,18 +1120,506 @@ class Blockchain:
         Returns:
             Saldo total do endereço
         """
-        balance = 0
+        if not self.telemetry.enabled:
+            return self._balances.get(address, 0)
+        start = time.perf_counter()
+        balance = self._balances.get(address, 0)
+        self.telemetry.observe('educhain_balance_query_seconds',
+                               time.perf_counter() - start, {'kind': 'single'})
+        return balance
+    
+    def get_balances(self, addresses: Iterable[str]) -> Dict[str, float]:
+        """
+        Consulta o saldo de vários endereços de uma só vez.
         
-        for block in self.chain:
+        Args:
+            addresses: Endereços a consultar
+            
+        Returns:
+            Dicionário endereço -> saldo
+        """
+        balances = self._balances
+        with self.telemetry.timer('educhain_balance_query_seconds', {'kind': 'bulk'}):
+            return {address: balances.get(address, 0) for address in addresses}
+    
+    def get_history(self, address: str, limit: Optional[int] = None,
+                    cursor: Optional[Tuple[int, int]] = None) -> Iterator[Dict]:
+        """
+        Percorre as transações de um endereço, da mais recente para a
+        mais antiga.
+        
+        Usa o índice de histórico (sem varrer a cadeia) e produz os
+        resultados sob demanda. Para paginar, passe como cursor o
+        'cursor' do último item recebido: a próxima página começa logo
+        depois dele. O gerador não deve ser consumido durante uma
+        reorganização.
+        
+        Args:
+            address: Endereço (remetente ou destinatário)
+            limit: Máximo de itens (None = todos)
+            cursor: Posição (altura, posição) após a qual continuar
+            
+        Returns:
+            Gerador de dicionários com 'transaction' (formato de
+            to_dict), 'height', 'position', 'block_hash', 'timestamp',
+            'confirmations' e 'cursor'
+        """
+        postings = self._history.get(address, [])
+        end = len(postings) if cursor is None else bisect.bisect_left(postings, tuple(cursor))
+        stop = 0 if limit is None else max(end - limit, 0)
+        
+        chain = self.chain
+        for i in range(end - 1, stop - 1, -1):
+            height, position = postings[i]
+            block = chain[height]
+            yield {
+                'transaction': block.data[position],
+                'height': height,
+                'position': position,
+                'block_hash': block.hash,
+                'timestamp': block.timestamp,
+                'confirmations': len(chain) - height,
+                'cursor': (height, position)
+            }
+    
+    def block_target(self, block: Block) -> int:
+        """
+        Alvo numérico de um bloco (o da dificuldade da cadeia se o bloco
+        não tiver alvo próprio).
+        
+        Args:
+            block: Bloco da cadeia
+            
+        Returns:
+            Alvo: o hash do bloco deve ser menor que ele
+        """
+        if block.target is not None:
+            return block.target
+        return min(target_from_difficulty(self.difficulty), MAX_TARGET)
+    
+    def block_work(self, block: Block) -> int:
+        """
+        Trabalho esperado para minerar um bloco (tentativas em média).
+        
+        Args:
+            block: Bloco da cadeia
+            
+        Returns:
+            2 ** 256 // alvo (16 ** dificuldade para blocos sem alvo)
+        """
+        return (1 << 256) // self.block_target(block)
+    
+    def _ancestor(self, block: Block, height: int, wanted_height: int,
+                  branch: Optional[Dict[str, Block]] = None) -> Block:
+        """
+        Encontra o antecessor de um bloco em uma altura menor.
+        
+        Na cadeia principal o acesso é direto; em ramificações o caminho
+        é percorrido pelos hashes anteriores até alcançar a cadeia.
+        """
+        while height > wanted_height:
+            if self._heights.get(block.hash) == height:
+                return self.chain[wanted_height]
+            # O antecessor já está na cadeia principal (ponto de divergência)
+            if block.prior_hash in self._heights:
+                return self.chain[wanted_height]
+            previous = branch.get(block.prior_hash) if branch else None
+            block = previous if previous is not None else self._side[block.prior_hash][0]
+            height -= 1
+        return block
+    
+    def _expected_target(self, previous_block: Block, previous_height: int,
+                         branch: Optional[Dict[str, Block]] = None) -> Optional[int]:
+        """
+        Alvo exigido do bloco seguinte a previous_block.
+        
+        A cada retarget_window blocos, o alvo é multiplicado pela razão
+        entre o tempo observado para minerar a janela e o tempo desejado
+        (target_block_time por intervalo), limitada a 4x para cima ou para
+        baixo; nas demais alturas o alvo do antecessor é mantido.
+        
+        Args:
+            previous_block: Antecessor do bloco
+            previous_height: Altura do antecessor
+            branch: Ver _block_failure
+            
+        Returns:
+            Alvo esperado, ou None se o reajuste está desativado
+        """
+        if self.target_block_time is None:
+            return None
+        
+        target = min(self.block_target(previous_block), MAX_TARGET)
+        height = previous_height + 1
+        window = self.retarget_window
+        if height < window or height % window:
+            return target
+        
+        first = self._ancestor(previous_block, previous_height, height - window, branch)
+        first_time = _timestamp_seconds(first.timestamp)
+        last_time = _timestamp_seconds(previous_block.timestamp)
+        if first_time is None or last_time is None:
+            return target
+        
+        expected = self.target_block_time * (window - 1)
+        actual = min(max(last_time - first_time, expected / 4), expected * 4)
+        new_target = target * int(actual * 1000) // max(1, int(expected * 1000))
+        return max(1, min(new_target, MAX_TARGET))
+    
+    def next_target(self) -> Optional[int]:
+        """
+        Alvo do próximo bloco a ser minerado sobre o topo.
+        
+        Returns:
+            Alvo numérico, ou None se o reajuste está desativado
+        """
+        return self._expected_target(self.get_last_block(), len(self.chain) - 1)
+    
+    @property
+    def chain_work(self) -> int:
+        """Trabalho acumulado de toda a cadeia (critério de consenso)."""
+        return self._cumulative_work[-1] if self._cumulative_work else 0
+    
+    def height_of(self, block_hash: str) -> Optional[int]:
+        """
+        Retorna a altura de um bloco da cadeia pelo hash.
+        
+        Args:
+            block_hash: Hash hexadecimal do bloco
+            
+        Returns:
+            Altura do bloco ou None se ele não está na cadeia
+        """
+        return self._heights.get(block_hash)
+    
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        """
+        Retorna um bloco da cadeia pelo hash.
+        
+        Args:
+            block_hash: Hash hexadecimal do bloco
+            
+        Returns:
+            Bloco encontrado ou None
+        """
+        height = self._heights.get(block_hash)
+        if height is not None:
+            return self.chain[height]
+        entry = self._side.get(block_hash)
+        return None if entry is None else entry[0]
+    
+    def get_tips(self) -> List[Dict]:
+        """
+        Lista os topos concorrentes conhecidos (cadeia principal e
+        ramificações), do maior para o menor trabalho acumulado.
+        
+        Returns:
+            Lista de dicionários com 'hash', 'height', 'work' e 'main'
+        """
+        tip = self.get_last_block()
+        tips = [{'hash': tip.hash, 'height': len(self.chain) - 1,
+                 'work': self.chain_work, 'main': True}]
+        
+        parents = {block.prior_hash for block, _, _ in self._side.values()}
+        for block_hash, (_, height, work) in self._side.items():
+            if block_hash not in parents:
+                tips.append({'hash': block_hash, 'height': height, 'work': work, 'main': False})
+        
+        tips.sort(key=lambda t: t['work'], reverse=True)
+        return tips
+    
+    def get_locator(self) -> List[str]:
+        """
+        Gera um localizador de blocos para sincronização.
+        
+        Contém os hashes do topo para trás, com espaçamento que dobra a
+        cada passo (topo, -1, -2, -4, -8, ...), terminando no gênese. Um
+        par consegue achar o último bloco em comum com O(log n) hashes.
+        
+        Returns:
+            Lista de hashes, do mais recente ao gênese
+        """
+        locator = []
+        height = len(self.chain) - 1
+        step = 1
+        while height > 0:
+            locator.append(self.chain[height].hash)
+            if len(locator) >= 10:
+                step *= 2
+            height -= step
+        locator.append(self.chain[0].hash)
+        return locator
+    
+    def find_fork_point(self, locator: List[str]) -> Optional[int]:
+        """
+        Encontra o último bloco em comum com um localizador.
+        
+        Args:
+            locator: Localizador gerado por get_locator de outro nó
+            
+        Returns:
+            Altura do bloco em comum mais recente, ou None
+        """
+        for block_hash in locator:
+            height = self._heights.get(block_hash)
+            if height is not None:
+                return height
+        return None
+    
+    def get_headers(self, start: int, limit: int) -> List[Dict]:
+        """
+        Retorna cabeçalhos (blocos sem os dados) a partir de uma altura.
+        
+        Args:
+            start: Primeira altura
+            limit: Número máximo de cabeçalhos
+            
+        Returns:
+            Lista de dicionários no formato de to_dict(), sem 'data'
+        """
+        headers = []
+        for height in range(start, min(start + limit, len(self.chain))):
+            header = self.chain[height].to_dict()
+            del header['data']
+            headers.append(header)
+        return headers
+    
+    def _remove_confirmed(self, height: int) -> None:
+        """Remove da mempool as transações incluídas no bloco de uma altura."""
+        self.mempool.remove(self._undo[height][1])
+    
+    def locate_transaction(self, txid: str) -> Optional[Tuple[int, int]]:
+        """
+        Localiza uma transação confirmada na cadeia principal.
+        
+        Args:
+            txid: Identificador da transação (Transaction.txid)
+            
+        Returns:
+            Tupla (altura do bloco, posição em block.data) ou None
+        """
+        return self._tx_index.get(txid)
+    
+    def get_transaction(self, txid: str) -> Optional[Dict]:
+        """
+        Retorna uma transação confirmada e onde ela está.
+        
+        Args:
+            txid: Identificador da transação (Transaction.txid)
+            
+        Returns:
+            Dicionário com 'transaction' (formato de to_dict), 'height',
+            'position', 'block_hash' e 'confirmations', ou None
+        """
+        location = self._tx_index.get(txid)
+        if location is None:
+            return None
+        height, position = location
+        block = self.chain[height]
+        return {
+            'transaction': block.data[position],
+            'height': height,
+            'position': position,
+            'block_hash': block.hash,
+            'confirmations': len(self.chain) - height
+        }
+    
+    def _locate_parent(self, block: Block) -> Optional[Tuple[Block, int, int]]:
+        """Retorna (antecessor, altura, trabalho acumulado) ou None."""
+        height = self._heights.get(block.prior_hash)
+        if height is not None:
+            return self.chain[height], height, self._cumulative_work[height]
+        return self._side.get(block.prior_hash)
+    
+    def _final_height(self) -> int:
+        """Altura do bloco final mais recente (-1 se nenhum é final)."""
+        return len(self.chain) - 1 - self.finality_depth
+    
+    def _prune_side(self) -> None:
+        """
+        Descarta os blocos de ramificações que ficaram abaixo da
+        profundidade de finalidade.
+        
+        Chamado sempre que o topo avança, para que _side não cresça
+        indefinidamente em um nó que roda por muito tempo.
+        """
+        if not self._side:
+            return
+        final_height = self._final_height()
+        stale = [block_hash for block_hash, (_, height, _) in self._side.items()
+                 if height <= final_height]
+        for block_hash in stale:
+            del self._side[block_hash]
+        if stale:
+            logger.debug("🧹 %s blocos de ramificações descartados (abaixo da finalidade)",
+                         len(stale))
+    
+    def accept_block(self, block: Block) -> Dict:
+        """
+        Adiciona um bloco já minerado por outro nó.
+        
+        O bloco é validado uma única vez (hash, raiz de Merkle,
+        encadeamento com o antecessor e dificuldade) e guardado sem
+        minerar novamente. O antecessor pode ser qualquer bloco conhecido:
+        
+        - sobre o topo, o bloco é conectado à cadeia principal;
+        - sobre outro bloco, ele entra em uma ramificação; se ela passar
+          a ter mais trabalho acumulado, a cadeia é reorganizada.
+        
+        Args:
+            block: Bloco recebido
+            
+        Returns:
+            Relatório no formato de validate_chain, com 'status'
+            ('connected', 'side_branch' ou 'reorganized'). Motivos extras
+            de rejeição: 'duplicate', 'unknown_parent' e
+            'below_finality' (ramificação abaixo da profundidade de
+            finalidade). Com
+            enforce_balances, saldos de ramificações só são conferidos
+            quando elas passam a ter mais trabalho
+        """
+        if block.hash in self._heights or block.hash in self._side:
+            return dict(self._report(None, ('duplicate', None, block.hash), checked=1),
+                        status=None)
+        
+        parent = self._locate_parent(block)
+        if parent is None:
+            return dict(self._report(None, ('unknown_parent', None, block.prior_hash),
+                                     checked=1), status=None)
+        
+        previous_block, parent_height, parent_work = parent
+        height = parent_height + 1
+        if height <= self._final_height():
+            return dict(self._report(height, ('below_finality', self._final_height() + 1, height),
+                                     checked=1), status=None)
+        failure = self._block_failure(block, previous_block, height)
+        if failure is not None:
+            return dict(self._report(height, failure, checked=1), status=None)
+        
+        if height == len(self.chain) and block.prior_hash in self._heights:
+            if self.enforce_balances:
+                failure = self._spending_failure(block, *self._spending_state(parent_height))
+                if failure is not None:
+                    return dict(self._report(height, failure, checked=1), status=None)
+            self.chain.append(block)
+            self._connect_block(block, height)
+            self._remove_confirmed(height)
+            if self._verified_height == height - 1:
+                self._verified_height = height
+            self._prune_side()
+            return dict(self._report(checked=1), status='connected')
+        
+        work = parent_work + self.block_work(block)
+        if work <= self.chain_work:
+            self._side[block.hash] = (block, height, work)
+            return dict(self._report(checked=1), status='side_branch')
+        
+        # A ramificação passou a ter mais trabalho: volta pelos blocos
+        # laterais até encontrar a cadeia principal
+        branch = [block]
+        while branch[-1].prior_hash not in self._heights:
+            branch.append(self._side[branch[-1].prior_hash][0])
+        branch.reverse()
+        fork_height = self._heights[branch[0].prior_hash]
+        
+        # Saldos de ramificações só são conferidos quando elas podem
+        # virar a cadeia principal
+        if self.enforce_balances:
+            bad = self._branch_spending_failure(fork_height, branch)
+            if bad is not None:
+                return dict(self._report(bad[0], bad[1], checked=len(branch)), status=None)
+        
+        self._side[block.hash] = (block, height, work)
+        self._switch_branch(fork_height, branch)
+        return dict(self._report(checked=1), status='reorganized')
+    
+    def reorganize(self, fork_height: int, blocks: List[Block]) -> Dict:
+        """
+        Troca o trecho após fork_height por uma ramificação concorrente.
+        
+        A ramificação só é adotada se todos os blocos forem válidos e ela
+        tiver mais trabalho acumulado que o trecho atual (regra da cadeia
+        com mais trabalho). Apenas o trecho divergente é desfeito e
+        refeito (ver _switch_branch).
+        
+        Args:
+            fork_height: Altura do último bloco em comum
+            blocks: Blocos da ramificação, em ordem, após fork_height
+            
+        Returns:
+            Relatório no formato de validate_chain ('insufficient_work'
+            se a ramificação não supera a cadeia atual, 'below_finality'
+            se ela parte de um bloco já final)
+        """
+        if fork_height < self._final_height():
+            return self._report(fork_height + 1,
+                                ('below_finality', self._final_height() + 1, fork_height + 1),
+                                checked=0)
+        previous_block = self.chain[fork_height]
+        branch = {block.hash: block for block in blocks}
+        for offset, block in enumerate(blocks):
+            failure = self._block_failure(block, previous_block, fork_height + 1 + offset,
+                                          branch=branch)
+            if failure is not None:
+                return self._report(fork_height + 1 + offset, failure, checked=offset + 1)
+            previous_block = block
+        
+        old_work = self.chain_work - self._cumulative_work[fork_height]
+        new_work = sum(self.block_work(b) for b in blocks)
+        if new_work <= old_work:
+            return self._report(fork_height + 1, ('insufficient_work', old_work, new_work),
+                                checked=len(blocks))
+        
+        if self.enforce_balances:
+            bad = self._branch_spending_failure(fork_height, blocks)
+            if bad is not None:
+                return self._report(bad[0], bad[1], checked=len(blocks))
+        
+        self._switch_branch(fork_height, blocks)
+        return self._report(checked=len(blocks))
+    
+    def _switch_branch(self, fork_height: int, blocks: List[Block]) -> None:
+        """
+        Desconecta os blocos após fork_height e conecta uma ramificação
+        já validada.
+        
+        Os blocos desconectados continuam guardados como ramificação (a
+        cadeia pode voltar para eles) e suas transações voltam para a
+        mempool; as transações da nova ramificação saem dela.
+        
+        Args:
+            fork_height: Altura do último bloco em comum
+            blocks: Blocos da ramificação, em ordem, após fork_height
+        """
+        was_verified = self._verified_height >= fork_height
+        
+        disconnected = []
+        while len(self.chain) - 1 > fork_height:
+            height = len(self.chain) - 1
+            work = self.chain_work
+            block = self._disconnect_block()
+            self._side[block.hash] = (block, height, work)
+            disconnected.append(block)
+        
+        for block in blocks:
+            self._side.pop(block.hash, None)
+            self.chain.append(block)
+            self._connect_block(block, len(self.chain) - 1)
+        
+        if was_verified:
+            self._verified_height = len(self.chain) - 1
+        
+        for block in disconnected:
             if isinstance(block.data, list):
                 for tx in block.data:
-                    if isinstance(tx, dict):
-                        if tx.get('sender') == address:
-                            balance -= tx.get('amount', 0)
-                        if tx.get('receiver') == address:
-                            balance += tx.get('amount', 0)
+                    if isinstance(tx, dict) and tx.get('sender') != 'SYSTEM':
+                        self.mempool.add(Transaction.from_dict(tx))
+        for height in range(fork_height + 1, len(self.chain)):
+            self._remove_confirmed(height)
+        self._prune_side()
         
-        return balance
+        logger.info("🔀 Reorganização: %s blocos desconectados, %s conectados",
+                    len(disconnected), len(blocks))
     
     def print_chain(self) -> None:
         """Imprime representação visual da blockchain."""
@@ -254,4 +1671,162 @@ class Blockchain:
         """
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
-        print(f"💾 Blockchain salva em '{filename}'")
\ No newline at end of file
+        logger.info("💾 Blockchain salva em '%s'", filename)
+    
+    def save_to_store(self, store: BlockStore) -> int:
+        """
+        Grava no armazenamento append-only apenas os blocos novos.
+        
+        Diferente de save_to_file, o custo é proporcional aos blocos
+        adicionados desde a última gravação, não ao tamanho da cadeia.
+        Se a cadeia foi reorganizada depois da última gravação, o
+        armazenamento volta até o último bloco em comum
+        (BlockStore.truncate) e recebe a nova ramificação.
+        
+        Args:
+            store: Armazenamento de blocos de destino
+            
+        Returns:
+            Número de blocos gravados
+            
+        Raises:
+            ValueError: Se o armazenamento contém outra cadeia (nem o
+                gênese é comum)
+        """
+        stored = len(store)
+        common = min(stored, len(self.chain))
+        while common and store.read_dict(common - 1)['hash'] != self.chain[common - 1].hash:
+            common -= 1
+        if stored and not common:
+            raise ValueError("Armazenamento pertence a outra cadeia")
+        
+        if common < stored:
+            store.truncate(common)
+            logger.info("✂️  Armazenamento voltou ao bloco %s (%s blocos descartados)",
+                        common - 1, stored - common)
+        for block in self.chain[common:]:
+            store.append(block)
+        
+        return len(self.chain) - common
+    
+    def _load_chain(self, blocks: Union[List[Block], MappedChain]) -> None:
+        """
+        Substitui a cadeia por blocos já minerados e reconstrói os índices.
+        
+        Args:
+            blocks: Blocos em ordem, começando pelo gênese (lista ou
+                arquivo mapeado)
+        """
+        self.chain = blocks
+        self._side = {}
+        self.rebuild_indexes()
+        self._verified_height = 0
+    
+    @classmethod
+    def load_from_file(cls, filename: str, difficulty: int = 4,
+                       validate: bool = True,
+                       workers: Optional[int] = None, **options: Any) -> 'Blockchain':
+        """
+        Carrega uma blockchain salva com save_to_file.
+        
+        O arquivo é lido em streaming, bloco a bloco, e cada bloco é
+        reconstruído com Block.from_dict (sem recalcular o hash) e
+        ligado à cadeia e aos índices assim que é lido. Com
+        validate=False a validação é adiada: a cadeia fica marcada como
+        não verificada e o próximo validate_chain() checa todos os blocos.
+        
+        Args:
+            filename: Nome do arquivo JSON
+            difficulty: Nível de dificuldade da mineração (padrão: 4)
+            validate: Valida a cadeia durante o carregamento (padrão: True)
+            workers: Processos usados na validação (ver validate_chain)
+            options: Demais opções do construtor (target_block_time,
+                retarget_window, block_version, require_signatures,
+                enforce_balances etc.), que devem ser as mesmas da
+                cadeia salva
+            
+        Returns:
+            Blockchain carregada
+            
+        Raises:
+            ValueError: Se o arquivo é inválido ou a cadeia não é válida
+        """
+        blockchain = cls(difficulty=difficulty, **options)
+        blockchain._load_chain([])
+        chain = blockchain.chain
+        
+        # Cada bloco entra na cadeia e nos índices assim que é lido
+        with open(filename, 'r', encoding='utf-8') as f:
+            for data in _iter_json_array(f):
+                block = Block.from_dict(data)
+                chain.append(block)
+                blockchain._connect_block(block, len(chain) - 1)
+        
+        if not chain:
+            raise ValueError(f"Arquivo '{filename}' não contém blocos")
+        
+        if validate:
+            report = blockchain.validate_chain(incremental=False, workers=workers)
+            if not report['valid']:
+                raise ValueError(
+                    f"Bloco {report['first_bad_index']} inválido: {report['reason']}"
+                )
+        
+        logger.info("📂 Blockchain carregada de '%s' (%s blocos)", filename, len(chain))
+        return blockchain
+    
+    @classmethod
+    def open_archive(cls, path: str, difficulty: int = 4, **options: Any) -> 'Blockchain':
+        """
+        Abre uma blockchain cuja cadeia fica em um MappedChain em disco.
+        
+        Os cabeçalhos são acessados via mmap e os dados de um bloco só
+        são lidos quando data é acessado, então os blocos não ficam em
+        memória. Os índices por transação (saldos, txids, histórico e
+        dados de desfazer) não são persistidos: são reconstruídos ao
+        abrir, lendo cada corpo uma vez, e ficam em memória como em
+        load_from_file. Novos blocos minerados são gravados diretamente
+        no arquivo.
+        
+        Args:
+            path: Prefixo dos arquivos do arquivo de blocos
+            difficulty: Nível de dificuldade da mineração (padrão: 4)
+            options: Demais opções do construtor (target_block_time,
+                retarget_window, block_version, require_signatures,
+                enforce_balances etc.), que devem ser as mesmas da
+                cadeia salva
+            
+        Returns:
+            Blockchain usando o arquivo mapeado como cadeia
+        """
+        blockchain = cls(difficulty=difficulty, **options)
+        archive = MappedChain(path)
+        if not len(archive):
+            archive.append(blockchain.chain[0])
+        blockchain._load_chain(archive)
+        return blockchain
+    
+    @classmethod
+    def from_store(cls, store: BlockStore, difficulty: int = 4,
+                   **options: Any) -> 'Blockchain':
+        """
+        Reconstrói uma blockchain a partir do armazenamento append-only.
+        
+        Os blocos são lidos como estão, sem minerar novamente.
+        
+        Args:
+            store: Armazenamento de blocos de origem
+            difficulty: Nível de dificuldade da mineração (padrão: 4)
+            options: Demais opções do construtor (target_block_time,
+                retarget_window, block_version, require_signatures,
+                enforce_balances etc.), que devem ser as mesmas da
+                cadeia salva
+            
+        Returns:
+            Blockchain com os blocos armazenados
+        """
+        blockchain = cls(difficulty=difficulty, **options)
+        blocks = list(store)
+        if blocks:
+            blockchain._load_chain(blocks)
+        return blockchain
\ No newline at end of file
@@ -1,10 +1,314 @@
 """
 Módulo de Utilitários Criptográficos
-Implementa funções de hashing e demonstrações de segurança
+Implementa funções de hashing, assinaturas digitais e demonstrações de segurança
 """
 
 import hashlib
-from typing import Tuple
+import hmac
+import secrets
+from typing import Optional, Tuple
+
+# Ed25519 é opcional: usa o pacote cryptography se estiver instalado
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import serialization as _key_encoding
+    from cryptography.hazmat.primitives.asymmetric import ed25519 as _ed25519
+except ImportError:
+    _ed25519 = None
+
+
+# Esquemas de assinatura suportados
+ECDSA = 'ecdsa-secp256k1'
+ED25519 = 'ed25519'
+
+# Parâmetros da curva secp256k1 (y² = x³ + 7 sobre o corpo primo P)
+_P = 2**256 - 2**32 - 977
+_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+      0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8, 1)
+# Ponto no infinito em coordenadas jacobianas (Z = 0)
+_INFINITY = (0, 1, 0)
+
+
+def _point_double(point: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    """Dobra um ponto em coordenadas jacobianas (sem inversões modulares)."""
+    x, y, z = point
+    if not y or not z:
+        return _INFINITY
+    yy = y * y % _P
+    s = 4 * x * yy % _P
+    m = 3 * x * x % _P
+    nx = (m * m - 2 * s) % _P
+    ny = (m * (s - nx) - 8 * yy * yy) % _P
+    return nx, ny, 2 * y * z % _P
+
+
+def _point_add(p: Tuple[int, int, int], q: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    """Soma dois pontos em coordenadas jacobianas."""
+    if not p[2]:
+        return q
+    if not q[2]:
+        return p
+    x1, y1, z1 = p
+    x2, y2, z2 = q
+    z1z1 = z1 * z1 % _P
+    z2z2 = z2 * z2 % _P
+    u1 = x1 * z2z2 % _P
+    u2 = x2 * z1z1 % _P
+    s1 = y1 * z2 * z2z2 % _P
+    s2 = y2 * z1 * z1z1 % _P
+    if u1 == u2:
+        return _point_double(p) if s1 == s2 else _INFINITY
+    h = (u2 - u1) % _P
+    r = (s2 - s1) % _P
+    hh = h * h % _P
+    hhh = h * hh % _P
+    v = u1 * hh % _P
+    nx = (r * r - hhh - 2 * v) % _P
+    ny = (r * (v - nx) - s1 * hhh) % _P
+    return nx, ny, h * z1 * z2 % _P
+
+
+def _point_multiply(k: int, point: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    """Multiplica um ponto por um escalar (dobra e soma)."""
+    result = _INFINITY
+    for bit in bin(k)[2:]:
+        result = _point_double(result)
+        if bit == '1':
+            result = _point_add(result, point)
+    return result
+
+
+def _double_multiply(a: int, p: Tuple[int, int, int],
+                     b: int, q: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    """Calcula a·P + b·Q em uma única passada (truque de Shamir)."""
+    both = _point_add(p, q)
+    result = _INFINITY
+    for i in range(max(a.bit_length(), b.bit_length()) - 1, -1, -1):
+        result = _point_double(result)
+        bits = ((a >> i) & 1, (b >> i) & 1)
+        if bits == (1, 1):
+            result = _point_add(result, both)
+        elif bits == (1, 0):
+            result = _point_add(result, p)
+        elif bits == (0, 1):
+            result = _point_add(result, q)
+    return result
+
+
+def _to_affine(point: Tuple[int, int, int]) -> Tuple[int, int]:
+    """Converte um ponto jacobiano (não infinito) para (x, y)."""
+    x, y, z = point
+    z_inv = pow(z, _P - 2, _P)
+    z_inv2 = z_inv * z_inv % _P
+    return x * z_inv2 % _P, y * z_inv2 * z_inv % _P
+
+
+def _compress(point: Tuple[int, int, int]) -> bytes:
+    """Chave pública comprimida (33 bytes: paridade de y + x)."""
+    x, y = _to_affine(point)
+    return bytes((2 + (y & 1),)) + x.to_bytes(32, 'big')
+
+
+def _decompress(data: bytes) -> Optional[Tuple[int, int, int]]:
+    """Recupera o ponto de uma chave comprimida (None se inválida)."""
+    if len(data) != 33 or data[0] not in (2, 3):
+        return None
+    x = int.from_bytes(data[1:], 'big')
+    if x >= _P:
+        return None
+    rhs = (pow(x, 3, _P) + 7) % _P
+    y = pow(rhs, (_P + 1) // 4, _P)
+    if y * y % _P != rhs:
+        return None
+    if (y & 1) != (data[0] & 1):
+        y = _P - y
+    return x, y, 1
+
+
+def _deterministic_nonce(private_key: int, digest: bytes) -> int:
+    """Nonce k determinístico (RFC 6979 com HMAC-SHA256)."""
+    key = private_key.to_bytes(32, 'big')
+    message = (int.from_bytes(digest, 'big') % _N).to_bytes(32, 'big')
+    v = b'\x01' * 32
+    k = b'\x00' * 32
+    k = hmac.new(k, v + b'\x00' + key + message, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b'\x01' + key + message, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    while True:
+        v = hmac.new(k, v, hashlib.sha256).digest()
+        candidate = int.from_bytes(v, 'big')
+        if 1 <= candidate < _N:
+            return candidate
+        k = hmac.new(k, v + b'\x00', hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+def _ecdsa_sign(private_key: int, message: bytes) -> bytes:
+    """Assina com ECDSA/secp256k1; retorna r || s (64 bytes, s baixo)."""
+    digest = hashlib.sha256(message).digest()
+    z = int.from_bytes(digest, 'big')
+    k = _deterministic_nonce(private_key, digest)
+    r = _to_affine(_point_multiply(k, _G))[0] % _N
+    s = pow(k, _N - 2, _N) * (z + r * private_key) % _N
+    # Apenas s <= N/2 é aceito, eliminando a segunda assinatura válida
+    if s > _N // 2:
+        s = _N - s
+    return r.to_bytes(32, 'big') + s.to_bytes(32, 'big')
+
+
+def _ecdsa_verify(public_key: bytes, message: bytes, signature: bytes) -> bool:
+    """Verifica uma assinatura r || s gerada por _ecdsa_sign."""
+    point = _decompress(public_key)
+    if point is None or len(signature) != 64:
+        return False
+    r = int.from_bytes(signature[:32], 'big')
+    s = int.from_bytes(signature[32:], 'big')
+    if not (0 < r < _N and 0 < s <= _N // 2):
+        return False
+    z = int.from_bytes(hashlib.sha256(message).digest(), 'big')
+    w = pow(s, _N - 2, _N)
+    result = _double_multiply(z * w % _N, _G, r * w % _N, point)
+    if not result[2]:
+        return False
+    return _to_affine(result)[0] % _N == r
+
+
+def address_from_public_key(public_key: str) -> str:
+    """
+    Deriva o endereço associado a uma chave pública.
+    
+    Args:
+        public_key: Chave pública em hexadecimal
+        
+    Returns:
+        Primeiros 20 bytes do SHA-256 da chave, em hexadecimal
+    """
+    return hashlib.sha256(bytes.fromhex(public_key)).hexdigest()[:40]
+
+
+def verify_signature(public_key: str, message: bytes, signature: str) -> bool:
+    """
+    Verifica uma assinatura.
+    
+    O esquema é deduzido do tamanho da chave pública: 33 bytes para
+    ECDSA/secp256k1 (comprimida) e 32 bytes para Ed25519.
+    
+    Args:
+        public_key: Chave pública em hexadecimal
+        message: Mensagem assinada
+        signature: Assinatura em hexadecimal
+        
+    Chave e assinatura precisam estar na forma canônica (hexadecimal
+    minúsculo, sem espaços): bytes.fromhex aceita maiúsculas, e outra
+    grafia dos mesmos bytes daria à transação outro txid.
+    
+    Returns:
+        True se a assinatura é válida; False se inválida ou malformada
+    """
+    try:
+        key = bytes.fromhex(public_key)
+        raw = bytes.fromhex(signature)
+    except (TypeError, ValueError):
+        return False
+    if key.hex() != public_key or raw.hex() != signature:
+        return False
+    
+    if len(key) == 33:
+        return _ecdsa_verify(key, message, raw)
+    if len(key) == 32 and _ed25519 is not None:
+        try:
+            _ed25519.Ed25519PublicKey.from_public_bytes(key).verify(raw, message)
+        except (InvalidSignature, ValueError):
+            return False
+        return True
+    return False
+
+
+class KeyPair:
+    """
+    Par de chaves para assinar transações.
+    
+    ECDSA sobre secp256k1 é implementado apenas com a biblioteca padrão;
+    Ed25519 exige o pacote opcional cryptography.
+    
+    Attributes:
+        scheme: Esquema de assinatura (ECDSA ou ED25519)
+        private_key: Chave privada (32 bytes)
+        public_key: Chave pública em hexadecimal
+    """
+    
+    __slots__ = ('scheme', 'private_key', 'public_key', '_signer')
+    
+    def __init__(self, private_key: bytes, scheme: str = ECDSA):
+        """
+        Carrega um par de chaves a partir da chave privada.
+        
+        Args:
+            private_key: Chave privada (32 bytes)
+            scheme: ECDSA (padrão) ou ED25519
+            
+        Raises:
+            ValueError: Se a chave ou o esquema forem inválidos
+        """
+        if scheme == ECDSA:
+            secret = int.from_bytes(private_key, 'big')
+            if len(private_key) != 32 or not 0 < secret < _N:
+                raise ValueError("Chave privada ECDSA inválida")
+            self._signer = secret
+            public = _compress(_point_multiply(secret, _G))
+        elif scheme == ED25519:
+            if _ed25519 is None:
+                raise ValueError("Ed25519 requer o pacote 'cryptography'")
+            self._signer = _ed25519.Ed25519PrivateKey.from_private_bytes(private_key)
+            public = self._signer.public_key().public_bytes(
+                _key_encoding.Encoding.Raw, _key_encoding.PublicFormat.Raw)
+        else:
+            raise ValueError(f"Esquema de assinatura desconhecido: {scheme}")
+        
+        self.scheme = scheme
+        self.private_key = private_key
+        self.public_key = public.hex()
+    
+    @classmethod
+    def generate(cls, scheme: str = ECDSA) -> 'KeyPair':
+        """
+        Gera um novo par de chaves aleatório.
+        
+        Args:
+            scheme: ECDSA (padrão) ou ED25519
+            
+        Returns:
+            Par de chaves
+        """
+        if scheme == ECDSA:
+            secret = secrets.randbelow(_N - 1) + 1
+            return cls(secret.to_bytes(32, 'big'), scheme)
+        return cls(secrets.token_bytes(32), scheme)
+    
+    @property
+    def address(self) -> str:
+        """Endereço derivado da chave pública."""
+        return address_from_public_key(self.public_key)
+    
+    def sign(self, message: bytes) -> str:
+        """
+        Assina uma mensagem.
+        
+        Args:
+            message: Bytes a assinar
+            
+        Returns:
+            Assinatura em hexadecimal (64 bytes)
+        """
+        if self.scheme == ECDSA:
+            return _ecdsa_sign(self._signer, message).hex()
+        return self._signer.sign(message).hex()
+    
+    def __repr__(self) -> str:
+        """Representação sem a chave privada."""
+        return f"KeyPair({self.scheme}, {self.address})"
 
 
 class CryptoUtils:
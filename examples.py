@@ -2,7 +2,11 @@
 Exemplos Práticos de Uso da Biblioteca Blockchain101
 """
 
+import asyncio
+
 from blockchain import Blockchain, Block, Transaction, CryptoUtils, ConcurrentMiner
+from log_config import configure_logging
+from node import Node
 
 
 def exemplo_1_blockchain_simples():
@@ -163,43 +167,50 @@ def exemplo_5_benchmark_dificuldade():
 
 
 def exemplo_6_rede_distribuida_simulada():
-    """Exemplo 6: Simular rede distribuída com múltiplos nós."""
+    """Exemplo 6: Rede distribuída com nós reais em localhost."""
     print("\n" + "="*70)
     print("EXEMPLO 6: Rede Distribuída Simulada".center(70))
     print("="*70)
     
-    # Criar 3 "nós" (blockchains independentes)
-    no1 = Blockchain(difficulty=2)
-    no2 = Blockchain(difficulty=2)
-    no3 = Blockchain(difficulty=2)
-    
-    print("\n📡 3 nós criados na rede")
-    
-    # Adicionar bloco no nó 1
-    print("\n⛏️  Nó 1 minera bloco...")
-    no1.add_block(Block(1, '01/01/2024', 'Dados do nó 1'))
-    
-    # "Propagar" para outros nós (copiar bloco)
-    print("📤 Propagando bloco para outros nós...")
-    no2.add_block(Block(1, '01/01/2024', 'Dados do nó 1'))
-    no3.add_block(Block(1, '01/01/2024', 'Dados do nó 1'))
-    
-    # Verificar consenso
-    print("\n🔍 Verificando consenso...")
-    hash1 = no1.chain[1].hash
-    hash2 = no2.chain[1].hash
-    hash3 = no3.chain[1].hash
-    
-    if hash1 == hash2 == hash3:
-        print("✅ Consenso alcançado! Todos os nós têm o mesmo bloco")
-        print(f"   Hash: {hash1[:16]}...")
-    else:
-        print("❌ Falha no consenso!")
-    
-    print(f"\n📊 Estado da rede:")
-    print(f"   Nó 1: {len(no1.chain)} blocos")
-    print(f"   Nó 2: {len(no2.chain)} blocos")
-    print(f"   Nó 3: {len(no3.chain)} blocos")
+    async def rede():
+        # Criar 3 nós que se comunicam por TCP
+        nos = [Node(Blockchain(difficulty=2)) for _ in range(3)]
+        for no in nos:
+            await no.start()
+        
+        print("\n📡 3 nós criados na rede")
+        await nos[1].connect('127.0.0.1', nos[0].port)
+        await nos[2].connect('127.0.0.1', nos[0].port)
+        
+        # Transação enviada ao nó 3 chega ao nó 1 (que minera)
+        await nos[2].submit_transaction(Transaction("Alice", "Bob", 10))
+        await asyncio.sleep(0.1)
+        
+        # Nó 1 minera; os outros só validam o bloco recebido
+        print("\n⛏️  Nó 1 minera bloco...")
+        print("📤 Propagando bloco para outros nós...")
+        await nos[0].mine("Nó1")
+        await asyncio.sleep(0.1)
+        
+        # Verificar consenso
+        print("\n🔍 Verificando consenso...")
+        hashes = {no.blockchain.get_last_block().hash for no in nos}
+        
+        if len(hashes) == 1:
+            print("✅ Consenso alcançado! Todos os nós têm o mesmo bloco")
+            print(f"   Hash: {hashes.pop()[:16]}...")
+        else:
+            print("❌ Falha no consenso!")
+        
+        print(f"\n📊 Estado da rede:")
+        for i, no in enumerate(nos, 1):
+            print(f"   Nó {i}: {len(no.blockchain.chain)} blocos, "
+                  f"saldo de Bob = {no.blockchain.get_balance('Bob')}")
+        
+        for no in nos:
+            await no.stop()
+    
+    asyncio.run(rede())
 
 
 # Menu de exemplos
@@ -254,4 +265,5 @@ def menu_exemplos():
 
 
 if __name__ == "__main__":
+    configure_logging()
     menu_exemplos()
@@ -0,0 +1,37 @@
+"""
+Módulo de Configuração de Logs
+Direciona as mensagens da biblioteca para o terminal ou as silencia
+"""
+
+import logging
+import sys
+
+
+# Logger pai de todos os módulos da biblioteca (educhain.block, ...)
+LOGGER_NAME = 'educhain'
+
+
+def configure_logging(level: int = logging.INFO, verbose_mining: bool = False) -> None:
+    """
+    Configura a saída de logs da biblioteca.
+    
+    Sem configuração, apenas avisos e erros aparecem (modo silencioso,
+    adequado para produção). As demonstrações chamam esta função para
+    exibir as mensagens no terminal como texto simples.
+    
+    Args:
+        level: Nível mínimo exibido (padrão: logging.INFO; use
+            logging.WARNING para o modo silencioso)
+        verbose_mining: Exibe também o progresso dos laços de mineração
+            (nível DEBUG)
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.DEBUG if verbose_mining else level)
+    
+    if not any(getattr(h, '_educhain', False) for h in logger.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler._educhain = True
+        logger.addHandler(handler)
+        # Evita mensagens duplicadas se o logger raiz também estiver configurado
+        logger.propagate = False
@@ -3,6 +3,7 @@ Arquivo principal para executar a biblioteca EduChain
 """
 
 # from demos import BlockchainDemo
+from log_config import configure_logging
 
 
 from demos import BlockchainDemo
@@ -38,6 +39,7 @@ def print_menu():
 
 def main():
     """Função principal do programa."""
+    configure_logging()
     print_header()
     
     while True:
@@ -0,0 +1,177 @@
+"""
+Módulo de Mempool
+Implementa o conjunto de transações pendentes com prioridade e deduplicação
+"""
+
+import heapq
+import itertools
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from transaction import Transaction
+
+
+class Mempool:
+    """
+    Conjunto de transações aguardando inclusão em um bloco.
+    
+    As transações são indexadas pelo hash (duplicatas são rejeitadas) e
+    ordenadas por prioridade:
+    - 'fee': maior taxa primeiro; empate resolvido pela ordem de chegada
+    - 'age': ordem de chegada (FIFO)
+    
+    Quando o limite max_size é atingido, a transação de menor prioridade
+    é removida para dar lugar a uma melhor; se a nova transação não for
+    melhor que a pior existente, ela é rejeitada.
+    
+    Attributes:
+        max_size: Número máximo de transações mantidas
+        priority: Critério de prioridade ('fee' ou 'age')
+    """
+    
+    def __init__(self, max_size: int = 10000, priority: str = 'fee'):
+        """
+        Inicializa a mempool.
+        
+        Args:
+            max_size: Número máximo de transações (padrão: 10000)
+            priority: 'fee' (padrão) ou 'age'
+        """
+        if priority not in ('fee', 'age'):
+            raise ValueError("priority deve ser 'fee' ou 'age'")
+        self.max_size = max_size
+        self.priority = priority
+        # txid -> (chave de prioridade, transação, tamanho em bytes)
+        self._entries: Dict[str, Tuple[tuple, Transaction, int]] = {}
+        # Heap da pior prioridade para despejo (remoção preguiçosa)
+        self._eviction: List[Tuple[tuple, str]] = []
+        self._sequence = itertools.count()
+    
+    def _priority_key(self, tx: Transaction) -> tuple:
+        """Chave de ordenação: menor chave = maior prioridade."""
+        seq = next(self._sequence)
+        if self.priority == 'fee':
+            return (-tx.fee, seq)
+        return (seq,)
+    
+    def __len__(self) -> int:
+        """Número de transações pendentes."""
+        return len(self._entries)
+    
+    def __contains__(self, item: Union[Transaction, str]) -> bool:
+        """Verifica se uma transação (ou txid) já está na mempool."""
+        txid = item if isinstance(item, str) else item.txid
+        return txid in self._entries
+    
+    def __iter__(self) -> Iterator[Transaction]:
+        """Percorre as transações em ordem de prioridade."""
+        for _, tx, _ in sorted(self._entries.values(), key=lambda e: e[0]):
+            yield tx
+    
+    def _pop_worst(self) -> Optional[Tuple[tuple, str]]:
+        """Retorna a entrada de pior prioridade ainda presente."""
+        while self._eviction:
+            negated, txid = self._eviction[0]
+            if txid in self._entries and self._entries[txid][0] == tuple(-k for k in negated):
+                return negated, txid
+            heapq.heappop(self._eviction)
+        return None
+    
+    def add(self, tx: Transaction) -> bool:
+        """
+        Adiciona uma transação.
+        
+        Args:
+            tx: Transação a ser adicionada
+            
+        Returns:
+            True se aceita, False se duplicada ou sem espaço
+        """
+        txid = tx.txid
+        if txid in self._entries:
+            return False
+        
+        key = self._priority_key(tx)
+        
+        if len(self._entries) >= self.max_size:
+            worst = self._pop_worst()
+            if worst is None or key >= tuple(-k for k in worst[0]):
+                return False
+            heapq.heappop(self._eviction)
+            del self._entries[worst[1]]
+        
+        self._entries[txid] = (key, tx, len(tx.to_string()))
+        heapq.heappush(self._eviction, (tuple(-k for k in key), txid))
+        return True
+    
+    def remove(self, transactions: Iterable[Union[Transaction, str]]) -> None:
+        """
+        Remove transações (por exemplo, após serem incluídas em um bloco).
+        
+        Args:
+            transactions: Transações ou txids a remover
+        """
+        entries = self._entries
+        for tx in transactions:
+            entries.pop(tx if isinstance(tx, str) else tx.txid, None)
+        
+        # Evita que o heap acumule entradas removidas indefinidamente
+        if len(self._eviction) > 2 * len(self._entries) + 64:
+            self._eviction = [(tuple(-k for k in key), txid)
+                              for txid, (key, _, _) in self._entries.items()]
+            heapq.heapify(self._eviction)
+    
+    def pending_balance_changes(self) -> Dict[str, float]:
+        """
+        Soma, em uma única passada, quanto cada remetente já comprometeu.
+        
+        Returns:
+            Dicionário remetente -> variação de saldo (negativa) causada
+            pelas transações pendentes (valor + taxa)
+        """
+        changes: Dict[str, float] = {}
+        for _, tx, _ in self._entries.values():
+            changes[tx.sender] = changes.get(tx.sender, 0) - tx.amount - tx.fee
+        return changes
+    
+    def clear(self) -> None:
+        """Remove todas as transações."""
+        self._entries.clear()
+        self._eviction = []
+    
+    def select(self, max_count: Optional[int] = None,
+               max_bytes: Optional[int] = None,
+               accept: Optional[Callable[[Transaction], bool]] = None) -> List[Transaction]:
+        """
+        Escolhe as transações de maior prioridade para montar um bloco.
+        
+        Não remove as transações; use remove() após minerar o bloco.
+        
+        Args:
+            max_count: Número máximo de transações (padrão: sem limite)
+            max_bytes: Tamanho máximo somado das transações serializadas
+                (padrão: sem limite); transações que não cabem são puladas
+            accept: Filtro chamado, em ordem de prioridade, para cada
+                transação que cabe no bloco; as recusadas são puladas e
+                toda transação aceita é incluída
+            
+        Returns:
+            Transações escolhidas em ordem de prioridade
+        """
+        entries = self._entries.values()
+        if max_count is not None and max_bytes is None and accept is None:
+            ordered = heapq.nsmallest(max_count, entries, key=lambda e: e[0])
+        else:
+            ordered = sorted(entries, key=lambda e: e[0])
+        
+        selected = []
+        total = 0
+        for _, tx, size in ordered:
+            if max_count is not None and len(selected) >= max_count:
+                break
+            if max_bytes is not None and total + size > max_bytes:
+                continue
+            if accept is not None and not accept(tx):
+                continue
+            selected.append(tx)
+            total += size
+        return selected
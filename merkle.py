@@ -0,0 +1,156 @@
+"""
+Módulo de Árvore de Merkle
+Implementa raiz e provas de inclusão para as transações de um bloco
+"""
+
+import hashlib
+import json
+from typing import Any, List, Sequence, Tuple
+
+from serialization import encode_leaf
+
+
+# Prefixos de domínio: impedem que um nó interno seja apresentado como folha
+_LEAF_PREFIX = b'\x00'
+_NODE_PREFIX = b'\x01'
+
+
+def hash_leaf(item: Any, binary: bool = False) -> bytes:
+    """
+    Calcula o hash de uma folha (transação ou dado do bloco).
+    
+    Dicionários e listas são serializados com json.dumps(sort_keys=True),
+    a mesma forma canônica usada em Block.create_hash. Com binary=True
+    (blocos versão 3) a folha usa a codificação binária de
+    serialization.encode_leaf.
+    
+    Args:
+        item: Transação (dicionário) ou dado qualquer
+        binary: Usa a forma canônica binária
+        
+    Returns:
+        Digest SHA-256 de 32 bytes
+    """
+    if binary:
+        return hashlib.sha256(_LEAF_PREFIX + encode_leaf(item)).digest()
+    if isinstance(item, (dict, list)):
+        serialized = json.dumps(item, sort_keys=True)
+    else:
+        serialized = str(item)
+    return hashlib.sha256(_LEAF_PREFIX + serialized.encode()).digest()
+
+
+def _hash_node(left: bytes, right: bytes) -> bytes:
+    """Calcula o hash de um nó interno a partir dos dois filhos."""
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """
+    Árvore de Merkle binária sobre uma lista de itens.
+    
+    Cada nível é obtido combinando pares do nível anterior; quando o
+    número de nós é ímpar, o último é combinado consigo mesmo (como no
+    Bitcoin). A raiz resume todos os itens em 32 bytes e permite provar
+    a inclusão de um item com log2(n) hashes.
+    
+    Por causa dessa repetição, [a, b, c] e [a, b, c, c] têm a mesma raiz
+    (CVE-2012-2459). Como no Bitcoin, uma árvore em que algum par real
+    tem os dois nós iguais é marcada como mutated e o bloco que a usa
+    deve ser rejeitado.
+    
+    Attributes:
+        levels: Níveis da árvore, das folhas (0) até a raiz
+        mutated: Algum nível tem um par de nós iguais (fora o nó
+            repetido que completa um nível ímpar)
+    """
+    
+    def __init__(self, items: Sequence[Any], binary: bool = False):
+        """
+        Constrói a árvore.
+        
+        Args:
+            items: Itens (transações) na ordem do bloco
+            binary: Folhas na forma canônica binária (ver hash_leaf)
+        """
+        level = [hash_leaf(item, binary) for item in items]
+        if not level:
+            level = [hashlib.sha256(b'').digest()]
+        self.levels: List[List[bytes]] = [level]
+        self.mutated = False
+        
+        while len(level) > 1:
+            if not self.mutated:
+                self.mutated = any(level[i] == level[i + 1]
+                                   for i in range(0, len(level) - 1, 2))
+            if len(level) % 2:
+                level = level + [level[-1]]
+            level = [_hash_node(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+            self.levels.append(level)
+    
+    @property
+    def root(self) -> str:
+        """Raiz da árvore em hexadecimal."""
+        return self.levels[-1][0].hex()
+    
+    def get_proof(self, index: int) -> List[Tuple[str, str]]:
+        """
+        Gera a prova de inclusão de um item.
+        
+        Args:
+            index: Posição do item na lista original
+            
+        Returns:
+            Lista de (hash irmão em hexadecimal, lado do irmão:
+            'left' ou 'right'), da folha até a raiz
+        """
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError("Índice fora da árvore")
+        
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling >= len(level):
+                sibling = index
+            side = 'left' if sibling < index else 'right'
+            proof.append((level[sibling].hex(), side))
+            index //= 2
+        return proof
+
+
+def compute_merkle_root(items: Sequence[Any], binary: bool = False) -> str:
+    """
+    Calcula a raiz de Merkle de uma lista de itens.
+    
+    Args:
+        items: Itens (transações) na ordem do bloco
+        binary: Folhas na forma canônica binária (ver hash_leaf)
+        
+    Returns:
+        Raiz em hexadecimal
+    """
+    return MerkleTree(items, binary).root
+
+
+def verify_proof(item: Any, proof: List[Tuple[str, str]], root: str,
+                 binary: bool = False) -> bool:
+    """
+    Verifica se um item pertence à árvore com a raiz informada.
+    
+    Args:
+        item: Item (transação) a verificar
+        proof: Prova gerada por MerkleTree.get_proof
+        root: Raiz esperada em hexadecimal
+        binary: Folhas na forma canônica binária (ver hash_leaf)
+        
+    Returns:
+        True se a prova é válida, False caso contrário
+    """
+    current = hash_leaf(item, binary)
+    for sibling_hex, side in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        if side == 'left':
+            current = _hash_node(sibling, current)
+        else:
+            current = _hash_node(current, sibling)
+    return current.hex() == root
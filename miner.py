@@ -3,15 +3,135 @@ Módulo de Mineração Concorrente
 Implementa mineração com múltiplas threads
 """
 
+import hashlib
+import logging
+import multiprocessing
+import os
 import time
 import threading
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from block import Block
+from telemetry import telemetry
 
 # from block import Block
 
 
+logger = logging.getLogger('educhain.miner')
+
+
+class NonceScheduler:
+    """
+    Distribui o espaço de nonces em faixas disjuntas (chunks).
+    
+    Cada worker reivindica dinamicamente a próxima faixa livre
+    [início, início + chunk_size). Como o contador é único e protegido
+    por lock, nenhum nonce é testado por dois workers, e workers mais
+    rápidos simplesmente reivindicam mais faixas.
+    
+    O contador fica em memória compartilhada (multiprocessing.Value),
+    então o mesmo agendador serve para threads e para processos.
+    
+    Attributes:
+        chunk_size: Quantidade de nonces por faixa reivindicada
+    """
+    
+    def __init__(self, chunk_size: int = 10000, start: int = 0):
+        """
+        Inicializa o agendador.
+        
+        Args:
+            chunk_size: Quantidade de nonces por faixa (padrão: 10000)
+            start: Primeiro nonce a ser distribuído (padrão: 0)
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size deve ser positivo")
+        self.chunk_size = chunk_size
+        self._next = multiprocessing.Value('q', start)
+    
+    def claim(self) -> Tuple[int, int]:
+        """
+        Reivindica a próxima faixa livre de nonces.
+        
+        Returns:
+            Tupla (início, fim) com fim exclusivo
+        """
+        with self._next.get_lock():
+            start = self._next.value
+            self._next.value = start + self.chunk_size
+        return start, start + self.chunk_size
+    
+    @property
+    def claimed(self) -> int:
+        """Próximo nonce ainda não distribuído."""
+        return self._next.value
+
+
+def _worker_stats(worker_id: int, attempts: int, elapsed: float) -> Dict:
+    """Monta as estatísticas de trabalho de um worker."""
+    return {
+        'worker_id': worker_id,
+        'attempts': attempts,
+        'time': elapsed,
+        'hashrate': attempts / elapsed if elapsed > 0 else 0.0
+    }
+
+
+# Evento de parada e agendador compartilhados com os processos mineradores
+# (definidos pelo inicializador do pool em cada processo filho)
+_process_stop_event = None
+_process_scheduler = None
+
+
+def _init_process_worker(stop_event, scheduler: NonceScheduler) -> None:
+    """Inicializador do pool: guarda o estado compartilhado no processo filho."""
+    global _process_stop_event, _process_scheduler
+    _process_stop_event = stop_event
+    _process_scheduler = scheduler
+
+
+def _process_mine_worker(prefix: bytes, difficulty: int, worker_id: int,
+                         numeric_target: Optional[int] = None, batch: bool = True) -> Dict:
+    """
+    Worker de mineração executado em um processo separado.
+    
+    Reivindica faixas do agendador compartilhado até encontrar a
+    solução ou até o evento de parada ser sinalizado (verificado a
+    cada faixa, então chunk_size limita a latência de cancelamento).
+    
+    Args:
+        prefix: Prefixo serializado do bloco (Block.get_hash_prefix)
+        difficulty: Nível de dificuldade
+        worker_id: Identificador do processo
+        numeric_target: Alvo numérico do bloco (substitui difficulty)
+        batch: Usa a busca em lote (Block.search_nonce_batch)
+        
+    Returns:
+        Estatísticas do worker, com 'nonce' e 'hash' preenchidos se ele
+        encontrou a solução
+    """
+    midstate = hashlib.sha256(prefix)
+    target = '0' * difficulty
+    attempts = 0
+    start_time = time.perf_counter()
+    nonce = block_hash = None
+    
+    while not _process_stop_event.is_set():
+        start, end = _process_scheduler.claim()
+        nonce, block_hash, tried = Block.search_nonces(midstate, target, start, end,
+                                                       numeric_target, batch)
+        attempts += tried
+        if nonce is not None:
+            _process_stop_event.set()
+            break
+    
+    stats = _worker_stats(worker_id, attempts, time.perf_counter() - start_time)
+    stats['nonce'] = nonce
+    stats['hash'] = block_hash
+    return stats
+
+
 class ConcurrentMiner:
     """
     Sistema de mineração concorrente com múltiplas threads.
@@ -20,59 +140,87 @@ class ConcurrentMiner:
     """
     
     @staticmethod
-    def mine_with_threads(block: Block, difficulty: int, num_threads: int) -> Dict:
+    def _build_stats(num_workers: int, elapsed: float, winner: Dict,
+                     workers: List[Dict]) -> Dict:
+        """Monta o dicionário de estatísticas comum aos dois modos."""
+        workers = sorted(workers, key=lambda w: w['worker_id'])
+        total_attempts = sum(w['attempts'] for w in workers)
+        return {
+            'threads': num_workers,
+            'time': elapsed,
+            'winner_thread': winner['worker_id'],
+            'nonce': winner['nonce'],
+            'hash': winner['hash'],
+            'total_attempts': total_attempts,
+            'hashrate': total_attempts / elapsed if elapsed > 0 else 0.0,
+            'workers': workers
+        }
+    
+    @staticmethod
+    def mine_with_threads(block: Block, difficulty: int, num_threads: int,
+                          chunk_size: int = 10000, batch: bool = True) -> Dict:
         """
         Minera bloco usando múltiplas threads competindo.
         
+        As threads reivindicam faixas disjuntas de nonces de um
+        NonceScheduler, então nenhum nonce é testado duas vezes.
+        
         Args:
             block: Bloco a ser minerado
             difficulty: Nível de dificuldade
             num_threads: Número de threads mineradoras
+            chunk_size: Nonces por faixa reivindicada (padrão: 10000)
+            batch: Usa a busca em lote (Block.search_nonce_batch)
             
         Returns:
-            Dicionário com estatísticas da mineração
+            Dicionário com estatísticas da mineração, incluindo
+            tentativas e hashrate totais e por worker ('workers')
         """
         stop_event = threading.Event()
+        scheduler = NonceScheduler(chunk_size)
         threads = []
         start_time = time.time()
-        winner = {'thread_id': None, 'nonce': None, 'hash': None}
+        winner = {'worker_id': None, 'nonce': None, 'hash': None}
+        winner_lock = threading.Lock()
+        workers: List[Dict] = []
+        
+        # Serializa o bloco uma única vez para todas as threads
+        midstate = block.create_midstate()
+        target = '0' * difficulty
+        
+        # Progresso só é formatado se o nível DEBUG estiver habilitado
+        debug = logger.isEnabledFor(logging.DEBUG)
         
         def mine_worker(thread_id: int):
             """Worker de mineração para cada thread."""
-            # Cada thread trabalha com cópia do bloco
-            local_block = Block(
-                block.index,
-                block.timestamp,
-                block.data,
-                block.prior_hash
-            )
-            # Offset inicial diferente para cada thread
-            local_block.nonce = thread_id * 10000
-            
-            prefix = '0' * difficulty
             attempts = 0
+            worker_start = time.perf_counter()
             
             while not stop_event.is_set():
-                if local_block.hash.startswith(prefix):
-                    # Encontrou! Sinaliza outras threads
-                    stop_event.set()
-                    winner['thread_id'] = thread_id
-                    winner['nonce'] = local_block.nonce
-                    winner['hash'] = local_block.hash
-                    print(f"🏆 Thread {thread_id} venceu! Nonce: {local_block.nonce}")
-                    break
+                start, end = scheduler.claim()
+                nonce, block_hash, tried = Block.search_nonces(midstate, target, start, end,
+                                                               block.target, batch)
+                attempts += tried
                 
-                local_block.nonce += num_threads  # Incrementa por num_threads
-                local_block.hash = local_block.create_hash()
-                attempts += 1
+                if nonce is not None:
+                    with winner_lock:
+                        if winner['nonce'] is None:
+                            # Encontrou! Sinaliza outras threads
+                            stop_event.set()
+                            winner.update(worker_id=thread_id, nonce=nonce, hash=block_hash)
+                            logger.info("🏆 Thread %s venceu! Nonce: %s", thread_id, nonce)
+                    break
                 
-                # Feedback periódico
-                if attempts % 5000 == 0 and not stop_event.is_set():
-                    print(f"   Thread {thread_id}: {attempts} tentativas...")
+                # Feedback periódico (uma vez por faixa)
+                if debug and not stop_event.is_set():
+                    logger.debug("   Thread %s: %s tentativas...", thread_id, attempts)
+            
+            workers.append(_worker_stats(thread_id, attempts,
+                                         time.perf_counter() - worker_start))
         
         # Inicia threads
-        print(f"\n⛏️  Iniciando mineração concorrente com {num_threads} threads...")
-        print(f"   Dificuldade: {difficulty} (hash deve começar com {'0'*difficulty})")
+        logger.info("⛏️  Iniciando mineração concorrente com %s threads...", num_threads)
+        logger.info("   Dificuldade: %s (hash deve começar com %s)", difficulty, '0' * difficulty)
         
         for i in range(num_threads):
             t = threading.Thread(target=mine_worker, args=(i,))
@@ -85,18 +233,77 @@ class ConcurrentMiner:
         
         elapsed = time.time() - start_time
         
-        print(f"\n✅ Mineração concluída em {elapsed:.2f} segundos")
+        logger.info("✅ Mineração concluída em %.2f segundos", elapsed)
         
-        return {
-            'threads': num_threads,
-            'time': elapsed,
-            'winner_thread': winner['thread_id'],
-            'nonce': winner['nonce'],
-            'hash': winner['hash']
-        }
+        stats = ConcurrentMiner._build_stats(num_threads, elapsed, winner, workers)
+        telemetry.record_mining(stats, 'threads')
+        return stats
     
     @staticmethod
-    def benchmark_mining(block: Block, difficulty: int, max_threads: int = 8) -> List[Dict]:
+    def mine_with_processes(block: Block, difficulty: int,
+                            num_processes: Optional[int] = None,
+                            chunk_size: int = 10000, batch: bool = True) -> Dict:
+        """
+        Minera bloco usando múltiplos processos (escapa do GIL).
+        
+        O cálculo de hash em Python puro mantém o GIL, então threads não
+        escalam. Aqui cada núcleo roda um processo que reivindica faixas
+        disjuntas de nonces de um NonceScheduler compartilhado; assim que
+        um processo encontra a solução, todos os demais são interrompidos.
+        
+        Args:
+            block: Bloco a ser minerado
+            difficulty: Nível de dificuldade
+            num_processes: Número de processos (padrão: núcleos da máquina)
+            chunk_size: Nonces por faixa reivindicada (padrão: 10000)
+            batch: Usa a busca em lote (Block.search_nonce_batch)
+            
+        Returns:
+            Dicionário com estatísticas da mineração (mesmo formato de
+            mine_with_threads)
+        """
+        if num_processes is None:
+            num_processes = os.cpu_count() or 1
+        
+        prefix = block.get_hash_prefix()
+        ctx = multiprocessing.get_context()
+        stop_event = ctx.Event()
+        scheduler = NonceScheduler(chunk_size)
+        winner = {'worker_id': None, 'nonce': None, 'hash': None}
+        
+        logger.info("⛏️  Iniciando mineração com %s processos...", num_processes)
+        logger.info("   Dificuldade: %s (hash deve começar com %s)", difficulty, '0' * difficulty)
+        
+        start_time = time.time()
+        
+        with ProcessPoolExecutor(max_workers=num_processes, mp_context=ctx,
+                                 initializer=_init_process_worker,
+                                 initargs=(stop_event, scheduler)) as executor:
+            futures = [
+                executor.submit(_process_mine_worker, prefix, difficulty, i, block.target, batch)
+                for i in range(num_processes)
+            ]
+            
+            # Todos terminam logo após o primeiro encontrar a solução
+            workers = [future.result() for future in futures]
+        
+        elapsed = time.time() - start_time
+        
+        for stats in workers:
+            nonce, block_hash = stats.pop('nonce'), stats.pop('hash')
+            if nonce is not None and winner['nonce'] is None:
+                winner = {'worker_id': stats['worker_id'], 'nonce': nonce, 'hash': block_hash}
+        
+        logger.info("🏆 Processo %s venceu! Nonce: %s", winner['worker_id'], winner['nonce'])
+        logger.info("✅ Mineração concluída em %.2f segundos", elapsed)
+        
+        stats = ConcurrentMiner._build_stats(num_processes, elapsed, winner, workers)
+        telemetry.record_mining(stats, 'processes')
+        return stats
+    
+    @staticmethod
+    def benchmark_mining(block: Block, difficulty: int, max_threads: int = 8,
+                         use_processes: bool = False) -> List[Dict]:
         """
         Realiza benchmark de mineração com diferentes números de threads.
         
@@ -104,6 +311,7 @@ class ConcurrentMiner:
             block: Bloco a ser minerado
             difficulty: Nível de dificuldade
             max_threads: Número máximo de threads para testar
+            use_processes: Usa mine_with_processes em vez de threads
             
         Returns:
             Lista de resultados do benchmark
@@ -111,25 +319,28 @@ class ConcurrentMiner:
         results = []
         thread_counts = [1, 2, 4, max_threads]
         
-        print("\n" + "="*70)
-        print("BENCHMARK DE MINERAÇÃO".center(70))
-        print("="*70)
+        logger.info("=" * 70)
+        logger.info("BENCHMARK DE MINERAÇÃO".center(70))
+        logger.info("=" * 70)
+        
+        mine = (ConcurrentMiner.mine_with_processes if use_processes
+                else ConcurrentMiner.mine_with_threads)
         
         for num_threads in thread_counts:
-            result = ConcurrentMiner.mine_with_threads(block, difficulty, num_threads)
+            result = mine(block, difficulty, num_threads)
             results.append(result)
-            print(f"\n📊 Resultado: {num_threads} thread(s) = {result['time']:.2f}s")
+            logger.info("📊 Resultado: %s thread(s) = %.2fs", num_threads, result['time'])
         
         # Análise dos resultados
-        print("\n" + "="*70)
-        print("ANÁLISE DE DESEMPENHO".center(70))
-        print("="*70)
+        logger.info("=" * 70)
+        logger.info("ANÁLISE DE DESEMPENHO".center(70))
+        logger.info("=" * 70)
         
         baseline = results[0]['time']
         for r in results:
             speedup = baseline / r['time']
             efficiency = (speedup / r['threads']) * 100
-            print(f"{r['threads']} thread(s): {r['time']:.2f}s | "
-                  f"Speedup: {speedup:.2f}x | Eficiência: {efficiency:.1f}%")
+            logger.info("%s thread(s): %.2fs | Speedup: %.2fx | Eficiência: %.1f%%",
+                        r['threads'], r['time'], speedup, efficiency)
         
         return results
\ No newline at end of file
@@ -0,0 +1,498 @@
+"""
+Módulo de Rede P2P
+Nós que trocam blocos e transações por TCP (asyncio streams)
+"""
+
+import asyncio
+import base64
+import itertools
+import json
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from async_blockchain import AsyncBlockchain
+from block import Block
+from blockchain import Blockchain
+from transaction import Transaction
+
+
+logger = logging.getLogger('educhain.node')
+
+# Tamanho máximo de uma mensagem (uma linha JSON)
+MAX_MESSAGE_BYTES = 1 << 24
+
+
+# Erros que uma mensagem malformada de um par pode causar ao ser lida
+_MALFORMED = (KeyError, TypeError, ValueError, IndexError)
+
+
+def _pack(data: bytes) -> str:
+    """Codifica bytes (bloco ou transação binários) para uma mensagem JSON."""
+    return base64.b64encode(data).decode()
+
+
+def _unpack(text: str) -> bytes:
+    """Inverso de _pack."""
+    return base64.b64decode(text)
+
+
+class Peer:
+    """
+    Conexão com outro nó.
+    
+    As mensagens são objetos JSON, um por linha. Requisições levam um
+    campo 'id' e a resposta correspondente traz 'reply_to' com o mesmo
+    valor; anúncios (blocos e transações novos) não têm resposta. Blocos
+    e transações viajam no formato binário de serialization.py (em
+    base64 dentro do JSON).
+    
+    Attributes:
+        address: Endereço (host, porta) do outro lado da conexão
+        height: Altura da cadeia anunciada pelo par
+        work: Trabalho acumulado anunciado pelo par
+    """
+    
+    def __init__(self, node: 'Node', reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        """
+        Inicializa a conexão.
+        
+        Args:
+            node: Nó local que trata as mensagens recebidas
+            reader: Stream de leitura
+            writer: Stream de escrita
+        """
+        self.node = node
+        self.reader = reader
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+        self.height = 0
+        self.work = 0
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Começa a ler mensagens em segundo plano."""
+        self._task = asyncio.ensure_future(self._read_loop())
+    
+    async def send(self, message: Dict) -> None:
+        """
+        Envia uma mensagem.
+        
+        Args:
+            message: Objeto serializável em JSON
+        """
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        await self.writer.drain()
+    
+    async def request(self, message: Dict, timeout: float = 30.0) -> Dict:
+        """
+        Envia uma requisição e aguarda a resposta.
+        
+        Várias requisições podem estar em andamento ao mesmo tempo
+        (pipelining); cada resposta é associada pelo 'id'.
+        
+        Args:
+            message: Requisição (o campo 'id' é preenchido aqui)
+            timeout: Tempo máximo de espera em segundos
+            
+        Returns:
+            Mensagem de resposta
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self.send(dict(message, id=request_id))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def reply(self, request: Dict, message: Dict) -> None:
+        """Responde a uma requisição recebida."""
+        await self.send(dict(message, reply_to=request['id']))
+    
+    async def _read_loop(self) -> None:
+        """Lê mensagens até a conexão ser encerrada."""
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                
+                future = self._pending.get(message.get('reply_to'))
+                if future is not None:
+                    if not future.done():
+                        future.set_result(message)
+                    continue
+                
+                # Tratado em outra tarefa: o tratamento pode fazer novas
+                # requisições, cujas respostas chegam por este laço
+                self.node._spawn(self.node._handle(self, message))
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.warning("⚠️  Conexão com %s encerrada: %s", self.address, e)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("conexão encerrada"))
+            self.node._forget(self)
+            self.writer.close()
+    
+    async def close(self) -> None:
+        """Encerra a conexão."""
+        self.writer.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    def __repr__(self) -> str:
+        """Representação legível do par."""
+        return f"Peer({self.address}, height={self.height})"
+
+
+class Node:
+    """
+    Nó da rede P2P.
+    
+    Propagação: um bloco minerado é anunciado aos pares, que o validam
+    uma única vez e o adicionam sem minerar novamente
+    (Blockchain.accept_block). Transações novas também são repassadas.
+    
+    Sincronização (header-first): o nó envia um localizador de blocos
+    (Blockchain.get_locator), recebe os cabeçalhos a partir do último
+    bloco em comum, confere encadeamento e dificuldade e só então baixa
+    os corpos em lotes, com várias requisições em andamento ao mesmo
+    tempo. A cadeia com mais trabalho acumulado vence; se ela divergir
+    da local, o trecho após o bloco em comum é substituído
+    (Blockchain.reorganize).
+    
+    Attributes:
+        chain: Fachada assíncrona da blockchain local
+        host: Endereço de escuta
+        port: Porta de escuta (definida em start() se 0)
+        peers: Conexões ativas
+    """
+    
+    def __init__(self, blockchain: Optional[Blockchain] = None,
+                 host: str = '127.0.0.1', port: int = 0,
+                 headers_batch: int = 500, blocks_batch: int = 50,
+                 pipeline: int = 4):
+        """
+        Inicializa o nó.
+        
+        Args:
+            blockchain: Blockchain local (padrão: nova Blockchain)
+            host: Endereço de escuta (padrão: localhost)
+            port: Porta de escuta (padrão: 0, escolhida pelo sistema)
+            headers_batch: Cabeçalhos por mensagem 'headers'
+            blocks_batch: Blocos por requisição 'get_blocks'
+            pipeline: Requisições 'get_blocks' simultâneas
+        """
+        self.chain = AsyncBlockchain(blockchain)
+        self.host = host
+        self.port = port
+        self.headers_batch = headers_batch
+        self.blocks_batch = blocks_batch
+        self.pipeline = pipeline
+        self.peers: List[Peer] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._sync_lock = asyncio.Lock()
+    
+    @property
+    def blockchain(self) -> Blockchain:
+        """Blockchain local."""
+        return self.chain.blockchain
+    
+    async def start(self) -> None:
+        """Começa a aceitar conexões."""
+        self._server = await asyncio.start_server(
+            self._on_connection, self.host, self.port, limit=MAX_MESSAGE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("📡 Nó escutando em %s:%s", self.host, self.port)
+    
+    async def stop(self) -> None:
+        """Encerra o servidor, as conexões e as tarefas pendentes."""
+        self.chain.cancel_mining()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for peer in list(self.peers):
+            await peer.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    async def connect(self, host: str, port: int) -> Peer:
+        """
+        Conecta a outro nó e sincroniza se ele tiver mais trabalho.
+        
+        Args:
+            host: Endereço do outro nó
+            port: Porta do outro nó
+            
+        Returns:
+            Conexão estabelecida
+        """
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_MESSAGE_BYTES)
+        peer = Peer(self, reader, writer)
+        peer.start()
+        self.peers.append(peer)
+        
+        reply = await peer.request(self._hello())
+        self._update_peer(peer, reply)
+        if peer.work > self.blockchain.chain_work:
+            await self.sync(peer)
+        return peer
+    
+    async def _on_connection(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> None:
+        """Registra uma conexão recebida."""
+        peer = Peer(self, reader, writer)
+        self.peers.append(peer)
+        peer.start()
+    
+    def _spawn(self, coroutine) -> None:
+        """Executa uma corrotina em segundo plano, guardando a tarefa."""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    def _forget(self, peer: Peer) -> None:
+        """Remove uma conexão encerrada."""
+        if peer in self.peers:
+            self.peers.remove(peer)
+    
+    def _hello(self) -> Dict:
+        """Mensagem com o estado da cadeia local."""
+        blockchain = self.blockchain
+        return {'type': 'hello', 'height': len(blockchain.chain) - 1,
+                'work': blockchain.chain_work, 'tip': blockchain.get_last_block().hash}
+    
+    @staticmethod
+    def _update_peer(peer: Peer, message: Dict) -> None:
+        """Atualiza o estado conhecido de um par."""
+        peer.height = message['height']
+        peer.work = message['work']
+    
+    async def _broadcast(self, message: Dict, exclude: Optional[Peer] = None) -> None:
+        """Envia uma mensagem a todos os pares (exceto exclude)."""
+        for peer in list(self.peers):
+            if peer is exclude:
+                continue
+            try:
+                await peer.send(message)
+            except ConnectionError:
+                self._forget(peer)
+    
+    async def _handle(self, peer: Peer, message: Dict) -> None:
+        """Trata uma mensagem recebida de um par."""
+        kind = message.get('type')
+        blockchain = self.blockchain
+        
+        if kind == 'hello':
+            self._update_peer(peer, message)
+            await peer.reply(message, self._hello())
+            if peer.work > blockchain.chain_work:
+                await self.sync(peer)
+        
+        elif kind == 'get_headers':
+            fork_height = blockchain.find_fork_point(message['locator'])
+            if fork_height is None:
+                fork_height = 0
+            limit = min(message.get('limit', self.headers_batch), self.headers_batch)
+            await peer.reply(message, {
+                'type': 'headers', 'fork_height': fork_height,
+                'headers': blockchain.get_headers(fork_height + 1, limit)})
+        
+        elif kind == 'get_blocks':
+            blocks = []
+            for block_hash in message['hashes']:
+                block = blockchain.get_block_by_hash(block_hash)
+                if block is not None:
+                    blocks.append(_pack(block.to_bytes()))
+            await peer.reply(message, {'type': 'blocks', 'blocks': blocks})
+        
+        elif kind == 'block':
+            try:
+                block = Block.from_bytes(_unpack(message['block']))
+            except _MALFORMED as e:
+                logger.warning("⚠️  Bloco malformado recebido de %s: %s", peer.address, e)
+                return
+            await self._on_block(peer, block, message)
+        
+        elif kind == 'tx':
+            try:
+                transaction = Transaction.from_bytes(_unpack(message['tx']))
+            except _MALFORMED as e:
+                logger.warning("⚠️  Transação malformada recebida de %s: %s", peer.address, e)
+                return
+            if await self.chain.add_transaction(transaction) != -1:
+                await self._broadcast(message, exclude=peer)
+    
+    async def _on_block(self, peer: Peer, block: Block, message: Dict) -> None:
+        """Trata o anúncio de um bloco novo."""
+        report = await self.chain.accept_block(block)
+        if report['valid']:
+            logger.info("📥 Bloco %s recebido de %s (%s)",
+                        block.index, peer.address, report['status'])
+            await self._broadcast(message, exclude=peer)
+        elif report['reason'] == 'unknown_parent':
+            # Faltam antecessores: o par pode ter uma cadeia com mais
+            # trabalho
+            await self.sync(peer)
+        elif report['reason'] != 'duplicate':
+            logger.warning("⚠️  Bloco %s rejeitado: %s", block.index, report['reason'])
+    
+    async def sync(self, peer: Peer) -> bool:
+        """
+        Sincroniza com um par (header-first, ver documentação da classe).
+        
+        Args:
+            peer: Par com a cadeia candidata
+            
+        Returns:
+            True se a cadeia local mudou
+        """
+        async with self._sync_lock:
+            try:
+                fork_height, headers = await self._download_headers(peer)
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                logger.warning("⚠️  Falha ao baixar cabeçalhos de %s: %s", peer.address, e)
+                return False
+            if not headers:
+                return False
+            
+            blockchain = self.blockchain
+            new_work = sum(blockchain.block_work(header) for header in headers)
+            old_work = sum(blockchain.block_work(b) for b in blockchain.chain[fork_height + 1:])
+            if new_work <= old_work:
+                return False
+            
+            extends_tip = fork_height == len(blockchain.chain) - 1
+            batches = self._download_blocks(peer, headers)
+            blocks = []
+            try:
+                for batch in batches:
+                    for block in await batch:
+                        if not extends_tip:
+                            blocks.append(block)
+                            continue
+                        report = await self.chain.accept_block(block)
+                        if not report['valid']:
+                            logger.warning("⚠️  Sincronização interrompida no bloco %s: %s",
+                                           report['first_bad_index'], report['reason'])
+                            return fork_height < len(blockchain.chain) - 1
+            except (ConnectionError, asyncio.TimeoutError) + _MALFORMED as e:
+                logger.warning("⚠️  Falha ao baixar blocos de %s: %s", peer.address, e)
+                return fork_height < len(blockchain.chain) - 1
+            finally:
+                for batch in batches:
+                    batch.cancel()
+            
+            if not extends_tip:
+                report = await self.chain.reorganize(fork_height, blocks)
+                if not report['valid']:
+                    logger.warning("⚠️  Ramificação rejeitada no bloco %s: %s",
+                                   report['first_bad_index'], report['reason'])
+                    return False
+            
+            logger.info("🔗 Sincronizado com %s: altura %s",
+                        peer.address, len(blockchain.chain) - 1)
+            return True
+    
+    async def _download_headers(self, peer: Peer) -> Tuple[int, List[Block]]:
+        """
+        Baixa e confere os cabeçalhos após o último bloco em comum.
+        
+        Tudo o que vem do par é conferido antes de ser usado: uma altura
+        de bloco em comum fora da cadeia local ou cabeçalhos malformados
+        encerram o download como cabeçalhos inválidos.
+        
+        Returns:
+            Tupla (altura do bloco em comum, cabeçalhos como blocos sem
+            dados); lista vazia se os cabeçalhos forem inválidos
+        """
+        blockchain = self.blockchain
+        locator = blockchain.get_locator()
+        fork_height = None
+        previous_hash = None
+        headers: List[Block] = []
+        
+        while True:
+            reply = await peer.request({'type': 'get_headers', 'locator': locator,
+                                        'limit': self.headers_batch})
+            try:
+                if fork_height is None:
+                    fork_height = reply['fork_height']
+                    if type(fork_height) is not int or not 0 <= fork_height < len(blockchain.chain):
+                        raise ValueError(f"bloco em comum fora da cadeia: {fork_height!r}")
+                    previous_hash = blockchain.chain[fork_height].hash
+                
+                batch = [Block.from_dict(dict(header, data=None)) for header in reply['headers']]
+                for header in batch:
+                    if (header.prior_hash != previous_hash or
+                            int.from_bytes(header.hash_bytes, 'big') >= blockchain.block_target(header)):
+                        raise ValueError("encadeamento ou dificuldade")
+                    previous_hash = header.hash
+            except _MALFORMED as e:
+                logger.warning("⚠️  Cabeçalho inválido recebido de %s: %s", peer.address, e)
+                return 0, []
+            headers.extend(batch)
+            
+            if len(batch) < self.headers_batch:
+                return fork_height, headers
+            locator = [previous_hash]
+    
+    def _download_blocks(self, peer: Peer, headers: List[Block]) -> List[asyncio.Future]:
+        """
+        Baixa os corpos dos blocos em lotes, com até self.pipeline
+        requisições em andamento.
+        
+        Returns:
+            Tarefas (uma por lote, em ordem) que resultam em listas de
+            blocos conferidos contra os cabeçalhos
+        """
+        semaphore = asyncio.Semaphore(self.pipeline)
+        
+        async def fetch(batch: List[Block]) -> List[Block]:
+            async with semaphore:
+                reply = await peer.request({'type': 'get_blocks',
+                                            'hashes': [header.hash for header in batch]})
+            blocks = [Block.from_bytes(_unpack(raw)) for raw in reply['blocks']]
+            if [block.hash for block in blocks] != [header.hash for header in batch]:
+                raise ValueError(f"Par {peer.address} enviou blocos diferentes dos cabeçalhos")
+            return blocks
+        
+        size = self.blocks_batch
+        return [asyncio.ensure_future(fetch(headers[i:i + size]))
+                for i in range(0, len(headers), size)]
+    
+    async def submit_transaction(self, transaction: Transaction) -> int:
+        """
+        Adiciona uma transação local e a repassa aos pares.
+        
+        Returns:
+            Índice do próximo bloco ou -1 se a transação foi rejeitada
+        """
+        result = await self.chain.add_transaction(transaction)
+        if result != -1:
+            await self._broadcast({'type': 'tx', 'tx': _pack(transaction.to_bytes())})
+        return result
+    
+    async def mine(self, miner_address: str, **kwargs) -> Optional[Block]:
+        """
+        Minera um bloco (ver AsyncBlockchain.mine) e o anuncia aos pares.
+        
+        Returns:
+            Bloco minerado ou None se a mineração foi cancelada
+        """
+        block = await self.chain.mine(miner_address, **kwargs)
+        if block is not None:
+            await self._broadcast({'type': 'block', 'block': _pack(block.to_bytes())})
+        return block
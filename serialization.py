@@ -0,0 +1,414 @@
+"""
+Módulo de Serialização Binária
+Formato compacto e versionado para blocos e transações
+"""
+
+import struct
+from typing import Any, Dict, Tuple
+
+
+# Todo registro binário começa com MAGIC + versão do formato. O byte
+# 0xEC nunca inicia um documento JSON, então leitores distinguem
+# registros binários de registros JSON antigos pelo primeiro byte.
+MAGIC = b'\xec'
+FORMAT_VERSION = 2
+# Versão 1: blocos sem alvo numérico (ainda legível)
+_READABLE_VERSIONS = (1, 2)
+
+# Cabeçalho fixo do bloco: magic, versão do formato, versão do bloco,
+# índice, nonce e hash (32 bytes brutos)
+_BLOCK_HEADER = struct.Struct('>cBBQQ32s')
+_PREFIX_HEADER = struct.Struct('>BQ')
+
+# Tags dos valores (dados do bloco, campos de transações)
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT, _TX, _HEX32 = range(10)
+_DOUBLE = struct.Struct('>d')
+
+# Transações no formato de Transaction.to_dict() usam uma tag própria:
+# as chaves ficam implícitas. Remetente e destinatário precisam ser
+# strings; os demais campos são valores codificados normalmente
+TX_KEYS = ('sender', 'receiver', 'amount', 'timestamp', 'fee')
+_TX_KEY_SET = frozenset(TX_KEYS)
+
+
+def encode_varint(value: int) -> bytes:
+    """
+    Codifica um inteiro não negativo em LEB128 (7 bits por byte).
+    
+    Args:
+        value: Inteiro >= 0
+        
+    Returns:
+        1 byte para valores < 128, mais bytes conforme necessário
+    """
+    if value < 0x80:
+        return bytes((value,))
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Decodifica um varint LEB128.
+    
+    Args:
+        data: Buffer
+        pos: Posição inicial
+        
+    Returns:
+        Tupla (valor, posição após o varint)
+    """
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _encode_str(value: str, out: bytearray) -> None:
+    """Acrescenta uma string (tamanho em varint + UTF-8) ao buffer."""
+    raw = value.encode()
+    out += encode_varint(len(raw))
+    out += raw
+
+
+def _encode_value(value: Any, out: bytearray, canonical: bool = False) -> None:
+    """
+    Acrescenta um valor JSON (com tipos preservados) ao buffer.
+    
+    Com canonical=True (entrada de hashes) o resultado não depende da
+    ordem das chaves: dicionários são gravados com as chaves ordenadas,
+    como o json.dumps(sort_keys=True) das versões anteriores, e a tag de
+    transação é escolhida pelo conjunto de chaves. Sem ele (registros em
+    disco e na rede) a ordem das chaves é preservada.
+    """
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        out += encode_varint(value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        if len(value) == 64:
+            try:
+                raw = bytes.fromhex(value)
+            except ValueError:
+                raw = None
+            if raw is not None and raw.hex() == value:
+                out.append(_HEX32)
+                out += raw
+                return
+        out.append(_STR)
+        _encode_str(value, out)
+    elif isinstance(value, dict):
+        if (tuple(value) == TX_KEYS or canonical and value.keys() == _TX_KEY_SET) \
+                and type(value['sender']) is str and type(value['receiver']) is str:
+            _encode_tx(value, out, canonical)
+            return
+        out.append(_DICT)
+        out += encode_varint(len(value))
+        for key, item in (sorted(value.items()) if canonical else value.items()):
+            _encode_str(key, out)
+            _encode_value(item, out, canonical)
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        out += encode_varint(len(value))
+        for item in value:
+            _encode_value(item, out, canonical)
+    else:
+        raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def _encode_tx(tx: Dict, out: bytearray, canonical: bool = False) -> None:
+    """
+    Acrescenta uma transação (chaves TX_KEYS) ao buffer.
+    
+    Caminho rápido do caso mais comum: nomes curtos e valores int ou
+    float são codificados sem chamadas recursivas.
+    """
+    sender = tx['sender'].encode()
+    receiver = tx['receiver'].encode()
+    if len(sender) < 0x80 and len(receiver) < 0x80:
+        out.append(_TX)
+        out.append(len(sender))
+        out += sender
+        out.append(len(receiver))
+        out += receiver
+    else:
+        out.append(_TX)
+        out += encode_varint(len(sender))
+        out += sender
+        out += encode_varint(len(receiver))
+        out += receiver
+    
+    for field in (tx['amount'], tx['timestamp'], tx['fee']):
+        kind = type(field)
+        if kind is float:
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(field)
+        elif kind is int and 0 <= field < 0x40:
+            out.append(_INT)
+            out.append(field << 1)
+        else:
+            _encode_value(field, out, canonical)
+
+
+def _decode_str(data: bytes, pos: int) -> Tuple[str, int]:
+    """Decodifica uma string; retorna (string, nova posição)."""
+    length, pos = decode_varint(data, pos)
+    end = pos + length
+    return data[pos:end].decode(), end
+
+
+def _decode_tx(data: bytes, pos: int) -> Tuple[Dict, int]:
+    """Decodifica uma transação (após a tag); retorna (dicionário, posição)."""
+    length = data[pos]
+    if length < 0x80:
+        pos += 1
+        end = pos + length
+        sender = data[pos:end].decode()
+    else:
+        sender, end = _decode_str(data, pos)
+    length = data[end]
+    if length < 0x80:
+        pos = end + 1
+        end = pos + length
+        receiver = data[pos:end].decode()
+    else:
+        receiver, end = _decode_str(data, end)
+    
+    pos = end
+    fields = []
+    for _ in range(3):
+        tag = data[pos]
+        if tag == _FLOAT:
+            fields.append(_DOUBLE.unpack_from(data, pos + 1)[0])
+            pos += 9
+        elif tag == _INT and data[pos + 1] < 0x80:
+            raw = data[pos + 1]
+            fields.append(raw >> 1 if not raw & 1 else -((raw + 1) >> 1))
+            pos += 2
+        else:
+            value, pos = _decode_value(data, pos)
+            fields.append(value)
+    
+    return {'sender': sender, 'receiver': receiver, 'amount': fields[0],
+            'timestamp': fields[1], 'fee': fields[2]}, pos
+
+
+def _decode_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    """Decodifica um valor a partir de pos; retorna (valor, nova posição)."""
+    tag = data[pos]
+    pos += 1
+    if tag == _TX:
+        return _decode_tx(data, pos)
+    if tag == _INT:
+        raw, pos = decode_varint(data, pos)
+        return (raw >> 1) if not raw & 1 else -((raw + 1) >> 1), pos
+    if tag == _STR:
+        return _decode_str(data, pos)
+    if tag == _HEX32:
+        return data[pos:pos + 32].hex(), pos + 32
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+    if tag == _LIST:
+        count, pos = decode_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == _DICT:
+        count, pos = decode_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _decode_str(data, pos)
+            result[key], pos = _decode_value(data, pos)
+        return result, pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    raise ValueError(f"Tag desconhecida: {tag}")
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Codifica um valor JSON (dados de bloco, transação) em binário.
+    
+    Inteiros e floats mantêm o tipo (um valor 10 volta como int e 10.0
+    volta como float), hashes hexadecimais de 64 caracteres ocupam 32
+    bytes e transações no formato de Transaction.to_dict() não repetem
+    os nomes dos campos.
+    
+    Args:
+        value: None, bool, int, float, str, list ou dict
+        
+    Returns:
+        MAGIC + versão do formato + valor codificado
+    """
+    out = bytearray(MAGIC)
+    out.append(FORMAT_VERSION)
+    _encode_value(value, out)
+    return bytes(out)
+
+
+def decode_value(data: bytes) -> Any:
+    """
+    Decodifica um valor gerado por encode_value.
+    
+    Args:
+        data: Bytes codificados
+        
+    Returns:
+        Valor igual ao original (como json.loads(json.dumps(valor)))
+        
+    Raises:
+        ValueError: Se o registro está truncado ou malformado
+    """
+    _check_format(data)
+    try:
+        value, pos = _decode_value(data, 2)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Registro binário truncado ou malformado: {e}") from e
+    if pos != len(data):
+        raise ValueError("Bytes extras após o valor")
+    return value
+
+
+def is_binary(data: bytes) -> bool:
+    """Indica se um registro está no formato binário (e não em JSON)."""
+    return data[:1] == MAGIC
+
+
+def _check_format(data: bytes) -> None:
+    """Confere MAGIC e versão do formato de um registro."""
+    if not is_binary(data):
+        raise ValueError("Registro não está no formato binário")
+    if len(data) < 2:
+        raise ValueError("Registro binário truncado")
+    if data[1] not in _READABLE_VERSIONS:
+        raise ValueError(f"Versão de formato não suportada: {data[1]}")
+
+
+def encode_block(block: Any) -> bytes:
+    """
+    Codifica um bloco em binário.
+    
+    Layout: cabeçalho fixo (_BLOCK_HEADER) seguido de hash anterior,
+    raiz de Merkle (None na versão 1), alvo (None se o bloco não tem
+    alvo numérico), timestamp e dados como valores codificados. Hashes
+    e alvos hexadecimais ocupam 32 bytes brutos.
+    
+    Args:
+        block: Bloco (qualquer objeto com os atributos de Block)
+        
+    Returns:
+        Bytes do bloco
+    """
+    out = bytearray(_BLOCK_HEADER.pack(MAGIC, FORMAT_VERSION, block.version,
+                                       block.index, block.nonce, block.hash_bytes))
+    _encode_value(block.prior_hash, out)
+    _encode_value(block.merkle_root, out)
+    _encode_value(None if block.target is None else f"{block.target:064x}", out)
+    _encode_value(block.timestamp, out)
+    _encode_value(block.data, out)
+    return bytes(out)
+
+
+def decode_block(data: bytes) -> Dict:
+    """
+    Decodifica um bloco gerado por encode_block.
+    
+    Args:
+        data: Bytes do bloco
+        
+    Returns:
+        Dicionário no formato de Block.to_dict()
+        
+    Raises:
+        ValueError: Se o registro está truncado ou malformado
+    """
+    _check_format(data)
+    try:
+        _, format_version, version, index, nonce, raw_hash = _BLOCK_HEADER.unpack_from(data)
+        prior_hash, pos = _decode_value(data, _BLOCK_HEADER.size)
+        merkle_root, pos = _decode_value(data, pos)
+        target = None
+        if format_version >= 2:
+            target, pos = _decode_value(data, pos)
+        timestamp, pos = _decode_value(data, pos)
+        body, pos = _decode_value(data, pos)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Registro binário truncado ou malformado: {e}") from e
+    if pos != len(data):
+        raise ValueError("Bytes extras após o bloco")
+    
+    result = {'index': index, 'timestamp': timestamp, 'data': body,
+              'prior_hash': prior_hash, 'nonce': nonce, 'hash': raw_hash.hex()}
+    if version >= 2:
+        result['version'] = version
+        result['merkle_root'] = merkle_root
+    if target is not None:
+        result['target'] = target
+    return result
+
+
+def encode_hash_prefix(block: Any) -> bytes:
+    """
+    Prefixo binário do hash de blocos versão 3 (tudo menos o nonce).
+    
+    Versão e índice em tamanho fixo, seguidos de hash anterior, raiz de
+    Merkle, timestamp e alvo (se houver) codificados. O nonce continua sendo o último
+    componente do hash, então o midstate funciona como antes.
+    
+    Args:
+        block: Bloco (qualquer objeto com os atributos de Block)
+        
+    Returns:
+        Bytes do prefixo
+    """
+    out = bytearray(_PREFIX_HEADER.pack(block.version, block.index))
+    _encode_value(block.prior_hash, out)
+    _encode_value(block.merkle_root, out)
+    _encode_value(block.timestamp, out)
+    if block.target is not None:
+        _encode_value(f"{block.target:064x}", out)
+    return bytes(out)
+
+
+def encode_leaf(item: Any) -> bytes:
+    """
+    Forma canônica binária de uma folha de Merkle (blocos versão 3).
+    
+    Dicionários iguais têm a mesma forma, qualquer que seja a ordem das
+    chaves (ver _encode_value com canonical=True).
+    
+    Args:
+        item: Transação (dicionário) ou dado qualquer
+        
+    Returns:
+        Valor codificado, sem MAGIC e versão do formato
+    """
+    out = bytearray()
+    _encode_value(item, out, canonical=True)
+    return bytes(out)
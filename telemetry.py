@@ -0,0 +1,247 @@
+"""
+Módulo de Telemetria
+Coleta métricas de mineração, validação e consultas de saldo
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Limites padrão dos histogramas de latência (segundos)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5,
+                   1.0, 5.0, 10.0, 30.0, 60.0)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, object]]) -> _Labels:
+    """Normaliza rótulos em uma tupla ordenada (usada como chave)."""
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: _Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    """Formata rótulos no padrão Prometheus: {k="v",...}."""
+    items = labels + extra
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+class Histogram:
+    """
+    Histograma cumulativo com limites fixos.
+    
+    Attributes:
+        buckets: Limites superiores dos intervalos
+        counts: Observações por intervalo (o último é +Inf)
+        total: Soma das observações
+        count: Número de observações
+    """
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        """Registra uma observação."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+    
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Retorna pares (limite, contagem acumulada), terminando em +Inf."""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            result.append(('+Inf' if bound == float('inf') else repr(bound), running))
+        return result
+
+
+class Telemetry:
+    """
+    Registro de métricas em memória, seguro para múltiplas threads.
+    
+    Suporta contadores, medidores (gauges) e histogramas, todos com
+    rótulos opcionais. As métricas podem ser lidas como dicionário
+    (snapshot) ou exportadas no formato de texto do Prometheus.
+    
+    Attributes:
+        enabled: Se False, todas as operações de registro são ignoradas
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[_Labels, float]] = {}
+        self._gauges: Dict[str, Dict[_Labels, float]] = {}
+        self._histograms: Dict[str, Dict[_Labels, Histogram]] = {}
+    
+    def inc(self, name: str, value: float = 1, labels: Optional[Dict] = None) -> None:
+        """Incrementa um contador."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+    
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict] = None) -> None:
+        """Define o valor atual de um medidor."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+    
+    def observe(self, name: str, value: float, labels: Optional[Dict] = None,
+                buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Registra uma observação em um histograma."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+    
+    @contextmanager
+    def timer(self, name: str, labels: Optional[Dict] = None) -> Iterator[None]:
+        """Mede a duração do bloco 'with' em um histograma (segundos)."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+    
+    def record_mining(self, stats: Dict, backend: str) -> None:
+        """
+        Registra as estatísticas retornadas pelo ConcurrentMiner.
+        
+        Args:
+            stats: Dicionário de mine_with_threads/mine_with_processes
+            backend: 'threads' ou 'processes'
+        """
+        if not self.enabled:
+            return
+        self.observe('educhain_mining_time_to_solution_seconds', stats['time'],
+                     {'backend': backend})
+        for worker in stats.get('workers', []):
+            labels = {'backend': backend, 'worker': worker['worker_id']}
+            self.inc('educhain_mining_attempts_total', worker['attempts'], labels)
+            self.set_gauge('educhain_mining_hashrate', worker['hashrate'], labels)
+    
+    def reset(self) -> None:
+        """Descarta todas as métricas registradas."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+    
+    def snapshot(self) -> Dict:
+        """
+        Retorna uma cópia das métricas atuais.
+        
+        Returns:
+            Dicionário com 'counters', 'gauges' e 'histograms'; cada
+            métrica mapeia a string de rótulos para o valor (histogramas
+            trazem 'count', 'sum' e 'buckets')
+        """
+        with self._lock:
+            return {
+                'counters': {name: {_format_labels(k): v for k, v in series.items()}
+                             for name, series in self._counters.items()},
+                'gauges': {name: {_format_labels(k): v for k, v in series.items()}
+                           for name, series in self._gauges.items()},
+                'histograms': {
+                    name: {_format_labels(k): {'count': h.count, 'sum': h.total,
+                                               'buckets': dict(h.cumulative())}
+                           for k, h in series.items()}
+                    for name, series in self._histograms.items()
+                }
+            }
+    
+    def to_prometheus(self) -> str:
+        """
+        Exporta as métricas no formato de texto do Prometheus.
+        
+        Returns:
+            Texto pronto para ser servido em /metrics
+        """
+        lines = []
+        with self._lock:
+            for kind, metrics in (('counter', self._counters), ('gauge', self._gauges)):
+                for name, series in sorted(metrics.items()):
+                    lines.append(f'# TYPE {name} {kind}')
+                    for labels, value in sorted(series.items()):
+                        lines.append(f'{name}{_format_labels(labels)} {value}')
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f'# TYPE {name} histogram')
+                for labels, hist in sorted(series.items()):
+                    for bound, count in hist.cumulative():
+                        lines.append(f'{name}_bucket{_format_labels(labels, (("le", bound),))} {count}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {hist.total}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {hist.count}')
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path: str) -> None:
+        """
+        Grava as métricas em um arquivo (ex: para o textfile collector).
+        
+        O arquivo é escrito em um temporário e renomeado, então leitores
+        nunca veem um arquivo pela metade.
+        
+        Args:
+            path: Caminho do arquivo .prom
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+    
+    def serve_prometheus(self, port: int = 9100, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Serve as métricas via HTTP em uma thread de fundo.
+        
+        Args:
+            port: Porta TCP (0 escolhe uma porta livre)
+            host: Endereço de escuta (padrão: apenas localhost)
+            
+        Returns:
+            Servidor em execução (use shutdown() para encerrar)
+        """
+        registry = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Registro padrão usado pela biblioteca. Começa desativado para que
+# consultas frequentes (como get_balance) não paguem trava, relógio e
+# histograma; ative com telemetry.enabled = True
+telemetry = Telemetry(enabled=False)
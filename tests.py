@@ -3,10 +3,27 @@ Testes Unitários para EduChain
 Arquivo de exemplo para testes (pode ser expandido com pytest)
 """
 
-from block import Block
-from blockchain import Blockchain
-from crypto_utils import CryptoUtils
-from transaction import Transaction
+import asyncio
+import io
+import json
+import os
+import pickle
+import tempfile
+from types import SimpleNamespace
+
+from async_blockchain import AsyncBlockchain
+from benchmarks import compare, run_benchmarks
+from block import Block, target_from_difficulty
+from block_archive import MappedChain
+from block_store import BlockStore
+from blockchain import Blockchain, _iter_json_array
+from crypto_utils import CryptoUtils, KeyPair
+from log_config import configure_logging
+from mempool import Mempool
+from node import Node, _pack
+from telemetry import Telemetry, telemetry
+from miner import ConcurrentMiner, NonceScheduler
+from transaction import SignatureVerifier, Transaction
 
 
 def test_crypto_utils():
@@ -54,6 +71,127 @@ def test_block():
     print("✅ Mineração funcional")
 
 
+def test_midstate_hashing():
+    """Testa que o hash via midstate é idêntico ao create_hash."""
+    print("\n🧪 Testando hashing com midstate...")
+    
+    dados = [Transaction("Alice", "Bob", 50, timestamp=1.0).to_dict()]
+    bloco = Block(1, '01/01/2024', dados, 'abc')
+    midstate = bloco.create_midstate()
+    
+    for nonce in (0, 1, 9, 10, 12345):
+        bloco.nonce = nonce
+        assert Block.hash_with_midstate(midstate, nonce) == bloco.create_hash(), \
+            "Hash via midstate deve ser idêntico"
+    print("✅ Midstate equivalente a create_hash")
+    
+    bloco.nonce = 0
+    bloco.hash = bloco.create_hash()
+    bloco.mine_block(2)
+    assert bloco.hash == bloco.create_hash(), "Hash minerado deve ser válido"
+    print("✅ Mineração com midstate")
+
+
+def test_process_mining():
+    """Testa mineração com múltiplos processos."""
+    print("\n🧪 Testando mineração com processos...")
+    
+    bloco = Block(1, '01/01/2024', 'mineração com processos')
+    result = ConcurrentMiner.mine_with_processes(bloco, 2, num_processes=2)
+    
+    assert result['threads'] == 2, "Deve reportar número de processos"
+    assert result['hash'].startswith('00'), "Hash deve atender dificuldade"
+    bloco.nonce = result['nonce']
+    assert bloco.create_hash() == result['hash'], "Nonce vencedor deve ser válido"
+    print("✅ Mineração com processos")
+
+
+def test_nonce_scheduler():
+    """Testa distribuição disjunta de nonces e contabilidade de trabalho."""
+    print("\n🧪 Testando agendador de nonces...")
+    
+    scheduler = NonceScheduler(chunk_size=100)
+    ranges = [scheduler.claim() for _ in range(5)]
+    assert ranges == [(i * 100, (i + 1) * 100) for i in range(5)], \
+        "Faixas devem ser contíguas e disjuntas"
+    print("✅ Faixas disjuntas")
+    
+    bloco = Block(1, '01/01/2024', 'agendador')
+    result = ConcurrentMiner.mine_with_threads(bloco, 3, 4, chunk_size=500)
+    assert len(result['workers']) == 4, "Deve haver estatística por worker"
+    assert result['total_attempts'] == sum(w['attempts'] for w in result['workers'])
+    assert result['total_attempts'] >= result['nonce'] + 1 - 4 * 500, \
+        "Tentativas devem cobrir o espaço até a solução"
+    bloco.nonce = result['nonce']
+    assert bloco.create_hash() == result['hash'], "Nonce vencedor deve ser válido"
+    print("✅ Contabilidade de tentativas por worker")
+
+
+def test_compact_representation():
+    """Testa representações compactas de Block e Transaction."""
+    print("\n🧪 Testando representação compacta...")
+    
+    bloco = Block(1, '01/01/2024', 'dados')
+    assert not hasattr(bloco, '__dict__'), "Block deve usar __slots__"
+    assert len(bloco.hash_bytes) == 32, "Hash interno deve ter 32 bytes"
+    assert bloco.hash == bloco.hash_bytes.hex() == bloco.create_hash()
+    assert Block.from_dict(bloco.to_dict()).to_dict() == bloco.to_dict()
+    print("✅ Block compacto")
+    
+    tx = Transaction("Alice", "Bob", 50, timestamp=1.0)
+    assert tx.to_dict() == {'sender': "Alice", 'receiver': "Bob",
+                            'amount': 50, 'timestamp': 1.0, 'fee': 0}
+    assert tx == Transaction("Alice", "Bob", 50, timestamp=1.0)
+    print("✅ Transaction compacta")
+
+
+def test_merkle_tree():
+    """Testa árvore de Merkle, provas e blocos versão 2."""
+    print("\n🧪 Testando árvore de Merkle...")
+    
+    txs = [Transaction("Alice", "Bob", i, timestamp=float(i)).to_dict() for i in range(5)]
+    bloco = Block(1, '01/01/2024', txs, 'abc', version=2)
+    for i, tx in enumerate(txs):
+        assert Block.verify_proof(tx, bloco.get_proof(i), bloco.merkle_root), \
+            "Prova de inclusão deve ser válida"
+    assert not Block.verify_proof(txs[0], bloco.get_proof(1), bloco.merkle_root)
+    print("✅ Provas de inclusão")
+    
+    prefixo = bloco.get_hash_prefix()
+    bloco_grande = Block(1, '01/01/2024', txs * 50, 'abc', version=2)
+    assert len(bloco_grande.get_hash_prefix()) == len(prefixo), \
+        "Cabeçalho não deve crescer com as transações"
+    print("✅ Cabeçalho de tamanho fixo")
+    
+    bc = Blockchain(difficulty=1, block_version=2)
+    bc.add_transaction(Transaction("Alice", "Bob", 50))
+    bc.mine_pending_transactions("Miner1")
+    assert bc.validate_chain(incremental=False)['valid'], "Cadeia versão 2 válida"
+    restored = Block.from_dict(bc.chain[1].to_dict())
+    assert restored.merkle_root == bc.chain[1].merkle_root
+    bc.chain[1].data[0]['amount'] = 5000
+    report = bc.validate_chain(incremental=False)
+    assert report['reason'] == 'invalid_merkle_root', "Deve detectar adulteração"
+    
+    # Repetir a última transação de um nível ímpar não muda a raiz
+    # (CVE-2012-2459); o bloco mutado é rejeitado
+    for versao in (2, 3):
+        origem = Blockchain(difficulty=1, block_version=versao)
+        origem.add_transaction(Transaction("Alice", "Bob", 1, timestamp=1.0))
+        origem.add_transaction(Transaction("Alice", "Carol", 2, timestamp=2.0))
+        original = origem.mine_pending_transactions("Miner1")
+        mutado = Block.from_dict(dict(original.to_dict(),
+                                      data=original.data + [original.data[-1]]))
+        assert mutado.compute_merkle_root() == original.merkle_root
+        assert mutado.create_digest() == original.hash_bytes, "Mesmo hash do original"
+        
+        destino = Blockchain(difficulty=1, block_version=versao)
+        assert destino.accept_block(mutado)['reason'] == 'mutated_merkle_tree'
+        assert destino.accept_block(original)['status'] == 'connected'
+        assert destino.get_balance("Miner1") == 100
+    print("✅ Validação de blocos versão 2")
+
+
 def test_blockchain():
     """Testa funcionalidades da blockchain."""
     print("\n🧪 Testando Blockchain...")
@@ -78,6 +216,174 @@ def test_blockchain():
     print("✅ Detecção de adulteração")
 
 
+def test_validation_report():
+    """Testa validação incremental, paralela e relatório estruturado."""
+    print("\n🧪 Testando validação incremental...")
+    
+    bc = Blockchain(difficulty=1)
+    for i in range(1, 5):
+        bc.add_block(Block(i, '01/01/2024', f'dados {i}'))
+    
+    report = bc.validate_chain()
+    assert report['valid'] and report['checked'] == 4, "Deve validar 4 blocos"
+    bc.add_block(Block(5, '01/01/2024', 'dados 5'))
+    report = bc.validate_chain()
+    assert report['valid'] and report['checked'] == 1, "Deve validar apenas o novo bloco"
+    print("✅ Validação incremental")
+    
+    bc.chain[3].data = 'adulterado'
+    assert bc.validate_chain()['valid'], "Incremental não revisita blocos verificados"
+    report = bc.validate_chain(incremental=False, workers=2)
+    assert not report['valid'], "Validação completa deve detectar adulteração"
+    assert report['first_bad_index'] == 3 and report['reason'] == 'invalid_hash'
+    print("✅ Validação completa em paralelo")
+    
+    bc.chain[3].data = 'dados 3'
+    bc.chain[4].prior_hash = 'x'
+    report = bc.validate_chain(incremental=False)
+    assert report['first_bad_index'] == 4 and report['reason'] == 'invalid_hash', \
+        "prior_hash faz parte do hash"
+    print("✅ Relatório estruturado")
+
+
+def test_block_store():
+    """Testa o armazenamento append-only de blocos."""
+    print("\n🧪 Testando armazenamento de blocos...")
+    
+    bc = Blockchain(difficulty=1)
+    bc.add_transaction(Transaction("Alice", "Bob", 50))
+    bc.mine_pending_transactions("Miner1")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'chain.dat')
+        with BlockStore(path, sync_every=2) as store:
+            assert bc.save_to_store(store) == 2, "Deve gravar gênese e bloco 1"
+            bc.add_block(Block(2, '01/01/2024', 'dados'))
+            assert bc.save_to_store(store) == 1, "Deve gravar apenas o bloco novo"
+        print("✅ Gravação incremental")
+        
+        # Simula gravação interrompida no meio de um registro
+        with open(path, 'ab') as f:
+            f.write(b'\x00\x00\x01')
+        
+        with BlockStore(path) as store:
+            assert len(store) == 3, "Registro incompleto deve ser descartado"
+            assert store.read(2).hash == bc.chain[2].hash, "Leitura por altura"
+            loaded = Blockchain.from_store(store, difficulty=1)
+        
+        assert [b.hash for b in loaded.chain] == [b.hash for b in bc.chain]
+        assert loaded.get_balance("Bob") == 50, "Índices devem ser reconstruídos"
+        assert loaded.validate_chain()['valid'], "Cadeia carregada deve ser válida"
+        print("✅ Reabertura e reconstrução")
+
+
+def test_load_from_file():
+    """Testa o carregamento em streaming de arquivos JSON."""
+    print("\n🧪 Testando carregamento de arquivo...")
+    
+    bc = Blockchain(difficulty=1)
+    for i in range(3):
+        bc.add_transaction(Transaction("Alice", "Bob", 10 + i))
+        bc.mine_pending_transactions("Miner1")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'chain.json')
+        bc.save_to_file(path)
+        
+        # Buffer pequeno força a leitura de blocos em vários pedaços
+        with open(path, encoding='utf-8') as f:
+            dicts = list(_iter_json_array(f, chunk_size=7))
+        assert dicts == [b.to_dict() for b in bc.chain], "Streaming deve ser fiel"
+        
+        # Elementos maiores que o buffer, com escapes e colchetes em strings
+        texto = '[123456, "a\\"]{", {"k": [1, {"x": "]\\\\"}]}, true, null, -2.5e3]'
+        esperado = json.loads(texto)
+        for chunk_size in range(1, 12):
+            elementos = list(_iter_json_array(io.StringIO(texto), chunk_size=chunk_size))
+            assert elementos == esperado, f"Pedaços de {chunk_size} caracteres"
+        # Número cortado logo após um prefixo válido ('25506.')
+        for texto in ('[25506.90257394217]', '[1, 25506.90257394217, true]', '[12e3]'):
+            for chunk_size in range(1, len(texto) + 1):
+                elementos = list(_iter_json_array(io.StringIO(texto), chunk_size=chunk_size))
+                assert elementos == json.loads(texto), (texto, chunk_size)
+        try:
+            list(_iter_json_array(io.StringIO('[{"a": [1, 2'), chunk_size=3))
+            assert False, "Array truncado deveria falhar"
+        except ValueError:
+            pass
+        
+        loaded = Blockchain.load_from_file(path, difficulty=1)
+        assert loaded.to_json() == bc.to_json(), "Cadeia carregada deve ser idêntica"
+        assert loaded.get_balance("Bob") == 33, "Saldos devem ser reconstruídos"
+        print("✅ Carregamento em streaming")
+        
+        deferred = Blockchain.load_from_file(path, difficulty=1, validate=False)
+        assert deferred.validate_chain()['checked'] == 3, "Validação adiada"
+        print("✅ Validação adiada")
+
+
+def test_mapped_archive():
+    """Testa o arquivo de blocos mapeado em memória."""
+    print("\n🧪 Testando arquivo mapeado...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive')
+        bc = Blockchain.open_archive(path, difficulty=1)
+        bc.block_version = 2
+        bc.add_transaction(Transaction("Alice", "Bob", 50))
+        bc.mine_pending_transactions("Miner1")
+        bc.add_block(Block(2, '01/01/2024', 'dados'))
+        assert isinstance(bc.chain, MappedChain), "Cadeia deve estar em disco"
+        assert bc.validate_chain(incremental=False)['valid'], "Cadeia mapeada válida"
+        hashes = [b.hash for b in bc.chain]
+        bc.chain.close()
+        
+        reopened = Blockchain.open_archive(path, difficulty=1)
+        archive = reopened.chain
+        assert len(archive) == 3 and [b.hash for b in archive] == hashes
+        assert archive.get_header(-1)['hash'] == hashes[2], "Cabeçalho por altura"
+        assert archive.get_by_hash(hashes[1]).data[0]['receiver'] == "Bob", \
+            "Corpo carregado sob demanda por hash"
+        assert reopened.get_balance("Miner1") == 100, "Saldos reconstruídos"
+        assert archive.get_header(1)['merkle_root'] == archive[1].compute_merkle_root()
+        
+        # Campos do cabeçalho não leem o corpo do bloco
+        topo = reopened.get_last_block()
+        assert topo.hash == hashes[2] and topo.prior_hash == hashes[1] and not topo._loaded
+        assert topo.data == 'dados' and topo._loaded
+        assert pickle.loads(pickle.dumps(topo)).to_dict() == topo.to_dict()
+        assert reopened.validate_chain(incremental=False, workers=2)['valid']
+        archive.close()
+        
+        # Reorganização em uma cadeia mapeada trunca os arquivos
+        path = os.path.join(tmp, 'reorg')
+        bc = Blockchain.open_archive(path, difficulty=1)
+        for _ in range(2):
+            bc.add_transaction(Transaction("Alice", "Bob", 5))
+            bc.mine_pending_transactions("Miner1")
+        rival = Blockchain(difficulty=1)
+        for _ in range(3):
+            rival.mine_pending_transactions("Miner2")
+        antigo = bc.get_last_block()
+        for bloco in rival.chain[1:]:
+            bc.accept_block(bloco)
+        try:
+            antigo.data
+            assert False, "Bloco que saiu do arquivo não pode ler outro corpo"
+        except ValueError:
+            pass
+        hashes = [b.hash for b in rival.chain]
+        assert [b.hash for b in bc.chain] == hashes
+        assert bc.validate_chain(incremental=False)['valid']
+        bc.chain.close()
+        
+        reopened = Blockchain.open_archive(path, difficulty=1)
+        assert [b.hash for b in reopened.chain] == hashes
+        assert reopened.get_balance("Miner2") == 300 and reopened.get_balance("Miner1") == 0
+        reopened.chain.close()
+    print("✅ Acesso por altura e por hash")
+
+
 def test_transactions():
     """Testa sistema de transações."""
     print("\n🧪 Testando Transações...")
@@ -100,6 +406,805 @@ def test_transactions():
     print("✅ Sistema de saldos")
 
 
+def test_balance_index():
+    """Testa o índice incremental de saldos."""
+    print("\n🧪 Testando índice de saldos...")
+    
+    bc = Blockchain(difficulty=1)
+    bc.add_transaction(Transaction("Alice", "Bob", 50))
+    bc.add_transaction(Transaction("Bob", "Carol", 20))
+    bc.mine_pending_transactions("Miner1")
+    bc.add_transaction(Transaction("Carol", "Alice", 5))
+    bc.mine_pending_transactions("Miner1")
+    
+    esperado = {"Alice": -45, "Bob": 30, "Carol": 15, "Miner1": 200, "Dave": 0}
+    assert bc.get_balances(esperado) == esperado, "Saldos em lote incorretos"
+    print("✅ Consulta em lote")
+    
+    bc.rebuild_balance_index()
+    assert bc.get_balances(esperado) == esperado, "Reconstrução deve ser consistente"
+    assert bc.get_balance("SYSTEM") == -200, "SYSTEM segue a semântica da varredura"
+    print("✅ Reconstrução do índice")
+
+
+def test_mempool():
+    """Testa prioridade, deduplicação e limite da mempool."""
+    print("\n🧪 Testando mempool...")
+    
+    pool = Mempool(max_size=3)
+    barata = Transaction("Alice", "Bob", 1, timestamp=1.0, fee=0.1)
+    media = Transaction("Alice", "Bob", 2, timestamp=2.0, fee=0.5)
+    cara = Transaction("Alice", "Bob", 3, timestamp=3.0, fee=2)
+    assert pool.add(barata) and pool.add(media) and pool.add(cara)
+    assert not pool.add(Transaction("Alice", "Bob", 1, timestamp=1.0, fee=0.1)), \
+        "Duplicata deve ser rejeitada"
+    print("✅ Deduplicação por hash")
+    
+    assert not pool.add(Transaction("Carol", "Dave", 9, timestamp=4.0, fee=0)), \
+        "Transação pior que todas deve ser rejeitada com a mempool cheia"
+    assert pool.add(Transaction("Carol", "Dave", 9, timestamp=5.0, fee=1))
+    assert barata not in pool and len(pool) == 3, "Pior transação deve ser despejada"
+    print("✅ Limite com despejo")
+    
+    assert [tx.fee for tx in pool.select(max_count=2)] == [2, 1], "Ordem por taxa"
+    print("✅ Ordenação por prioridade")
+    
+    bc = Blockchain(difficulty=1)
+    bc.add_transaction(Transaction("Alice", "Bob", 10, fee=1))
+    bc.add_transaction(Transaction("Alice", "Carol", 10, fee=3))
+    bc.add_transaction(Transaction("Alice", "Dave", 10, fee=2))
+    bloco = bc.mine_pending_transactions("Miner1", max_transactions=2)
+    assert [tx['receiver'] for tx in bloco.data] == ["Carol", "Dave", "Miner1"]
+    assert len(bc.pending_transactions) == 1, "Transação excedente fica pendente"
+    for mutate in (lambda p: p.append(Transaction("Alice", "Eve", 1)),
+                   lambda p: p.clear(), lambda p: p.__setitem__(0, None)):
+        try:
+            mutate(bc.pending_transactions)
+            assert False, "Alterar pending_transactions deveria falhar"
+        except TypeError:
+            pass
+    assert len(bc.pending_transactions) == 1, "Mempool não foi alterada"
+    assert bc.get_balance("Miner1") == 105 and bc.get_balance("Alice") == -25, \
+        "Taxas vão para o minerador"
+    print("✅ Montagem de bloco limitada")
+
+
+def test_bulk_ingestion():
+    """Testa ingestão de transações em lote."""
+    print("\n🧪 Testando ingestão em lote...")
+    
+    bc = Blockchain(difficulty=1)
+    bc.mine_pending_transactions("Alice")
+    duplicada = Transaction("Alice", "Bob", 10, timestamp=1.0)
+    bc.add_transaction(duplicada)
+    
+    lote = (Transaction("Alice", "Bob", 30, timestamp=float(i)) for i in range(2, 6))
+    result = bc.add_transactions(lote, check_balance=True)
+    assert result['accepted'] == 3 and result['reasons'] == {'insufficient_funds': 1}, \
+        "Saldo pendente deve ser considerado ao longo do lote"
+    print("✅ Verificação de saldo em lote")
+    
+    result = bc.add_transactions([duplicada, Transaction("Bob", "Carol", 5)])
+    assert result == {'accepted': 1, 'rejected': 1, 'reasons': {'duplicate': 1}}
+    print("✅ Contagem de aceitas e rejeitadas")
+
+
+def test_quiet_mining():
+    """Testa progresso via callback e modo silencioso."""
+    print("\n🧪 Testando progresso de mineração...")
+    
+    chamadas = []
+    bloco = Block(1, '01/01/2024', 'progresso')
+    bloco.mine_block(4, progress_callback=lambda tentativas, nonce: chamadas.append(tentativas),
+                     progress_interval=100)
+    assert bloco.hash.startswith('0000') and bloco.hash == bloco.create_hash()
+    assert chamadas == [100 * (i + 1) for i in range(len(chamadas))], \
+        "Callback deve ser chamado a cada faixa"
+    assert len(chamadas) == bloco.nonce // 100, "Uma chamada por faixa completa"
+    print("✅ Callback de progresso")
+
+
+def test_telemetry():
+    """Testa coleta e exportação de métricas."""
+    print("\n🧪 Testando telemetria...")
+    
+    registro = Telemetry()
+    bc = Blockchain(difficulty=1, telemetry=registro)
+    bc.add_block(Block(1, '01/01/2024', 'dados'))
+    bc.validate_chain(incremental=False)
+    bc.get_balance("Alice")
+    bc.get_balances(["Alice", "Bob"])
+    
+    snapshot = registro.snapshot()
+    assert snapshot['histograms']['educhain_validation_seconds']['{mode="full"}']['count'] == 1
+    consultas = snapshot['histograms']['educhain_balance_query_seconds']
+    assert consultas['{kind="single"}']['count'] == 1 and consultas['{kind="bulk"}']['count'] == 1
+    print("✅ Latência de validação e de saldos")
+    
+    # O registro global começa desativado
+    assert not telemetry.enabled and not Blockchain(difficulty=1).telemetry.enabled
+    telemetry.enabled = True
+    telemetry.reset()
+    bloco = Block(1, '01/01/2024', 'telemetria')
+    try:
+        stats = ConcurrentMiner.mine_with_threads(bloco, 2, 2, chunk_size=50)
+    finally:
+        telemetry.enabled = False
+    atual = telemetry.snapshot()
+    total = sum(v for k, v in atual['counters']['educhain_mining_attempts_total'].items()
+                if 'threads' in k)
+    assert total == stats['total_attempts'], "Tentativas por worker registradas"
+    
+    texto = telemetry.to_prometheus()
+    assert '# TYPE educhain_mining_hashrate gauge' in texto
+    assert 'educhain_mining_time_to_solution_seconds_bucket{backend="threads",le="+Inf"} 1' in texto
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, 'metrics.prom')
+        telemetry.write_prometheus(caminho)
+        with open(caminho, encoding='utf-8') as f:
+            assert f.read() == texto, "Arquivo deve conter a exportação"
+    print("✅ Exportação Prometheus")
+
+
+def test_benchmark_suite():
+    """Testa a suíte de benchmarks com parâmetros mínimos."""
+    print("\n🧪 Testando suíte de benchmarks...")
+    
+    report = run_benchmarks([2], repeat=3, txs_per_block=3, hash_range=100,
+                            balance_queries=10)
+    nomes = {r['name'] for r in report['results']}
+    assert {'create_hash', 'mine_block_nonce_search', 'validate_chain_full',
+            'get_balance', 'to_json', 'load_json_stream'} <= nomes
+    for r in report['results']:
+        assert r['min'] <= r['median'] <= r['p95'], "Estatísticas coerentes"
+    assert json.loads(json.dumps(report)) == report, "Relatório serializável"
+    assert all(c['ratio'] == 1 for c in compare(report, report))
+    print("✅ Relatório de benchmarks")
+
+
+def test_async_blockchain():
+    """Testa a fachada asyncio com reinício da mineração."""
+    print("\n🧪 Testando blockchain assíncrona...")
+    
+    async def cenario():
+        node = AsyncBlockchain(Blockchain(difficulty=7))
+        await node.add_transaction(Transaction("Alice", "Bob", 10))
+        
+        mining = asyncio.ensure_future(node.mine("Miner1"))
+        while not node.mining_in_progress:
+            await asyncio.sleep(0.001)
+        
+        # Consultas continuam respondendo durante a mineração
+        assert await node.get_balance("Bob") == 0
+        
+        # Nova transação reinicia o trabalho (com dificuldade menor)
+        node.blockchain.difficulty = 1
+        await node.add_transaction(Transaction("Bob", "Carol", 5))
+        block = await mining
+        
+        assert node.restarts == 1, "Mineração deve ter sido reiniciada"
+        assert [tx['receiver'] for tx in block.data] == ["Bob", "Carol", "Miner1"]
+        assert await node.get_balance("Carol") == 5
+        
+        node.blockchain.difficulty = 7
+        mining = asyncio.ensure_future(node.mine("Miner1"))
+        while not node.mining_in_progress:
+            await asyncio.sleep(0.001)
+        node.cancel_mining()
+        assert await mining is None, "Mineração cancelada não gera bloco"
+        assert len(node.blockchain.chain) == 2
+    
+    asyncio.run(cenario())
+    print("✅ Mineração sem bloquear o event loop")
+
+
+def test_fork_handling():
+    """Testa ramificações concorrentes e reorganização com desfazer."""
+    print("\n🧪 Testando ramificações e reorganização...")
+    
+    principal = Blockchain(difficulty=1)
+    for i in range(3):
+        principal.add_transaction(Transaction("Alice", "Bob", 10 + i))
+        principal.mine_pending_transactions("Miner1")
+    
+    # Outra cadeia compartilha o bloco 1 e diverge a partir dele
+    rival = Blockchain(difficulty=1)
+    assert rival.accept_block(principal.chain[1])['status'] == 'connected'
+    for i in range(3):
+        rival.add_transaction(Transaction("Carol", "Dave", 1 + i))
+        rival.mine_pending_transactions("Miner2")
+    
+    tmp = tempfile.TemporaryDirectory()
+    store = BlockStore(os.path.join(tmp.name, 'principal.dat'))
+    assert principal.save_to_store(store) == 4
+    
+    assert principal.accept_block(rival.chain[2])['status'] == 'side_branch'
+    assert principal.accept_block(rival.chain[3])['status'] == 'side_branch'
+    assert principal.accept_block(rival.chain[2])['reason'] == 'duplicate'
+    assert principal.accept_block(rival.chain[4])['status'] == 'reorganized'
+    
+    # O armazenamento volta ao bloco 1 e recebe a nova ramificação
+    assert principal.save_to_store(store) == 3
+    assert [b.hash for b in store] == [b.hash for b in principal.chain]
+    store.close()
+    with BlockStore(store.path) as reaberto:
+        assert Blockchain.from_store(reaberto, difficulty=1).validate_chain()['valid']
+    tmp.cleanup()
+    
+    assert principal.get_last_block().hash == rival.get_last_block().hash
+    enderecos = ["Alice", "Bob", "Carol", "Dave", "Miner1", "Miner2", "SYSTEM"]
+    assert principal.get_balances(enderecos) == rival.get_balances(enderecos)
+    assert principal.is_chain_valid()
+    # Transações dos blocos 2 e 3 descartados voltam para a mempool
+    assert len(principal.mempool) == 2
+    
+    # O ramo antigo continua conhecido como topo concorrente
+    tips = principal.get_tips()
+    assert [t['height'] for t in tips] == [4, 3] and tips[0]['main']
+    
+    # Índices desfeitos/refeitos batem com uma reconstrução completa
+    saldos = principal.get_balances(enderecos)
+    principal.rebuild_indexes()
+    assert principal.get_balances(enderecos) == saldos
+    
+    orfao = Block(9, "x", [], "f" * 64)
+    assert principal.accept_block(orfao)['reason'] == 'unknown_parent'
+    print("✅ Reorganização desfaz apenas o trecho divergente")
+    
+    # Ramificações abaixo da profundidade de finalidade são descartadas
+    antigo3 = principal.get_block_by_hash(tips[1]['hash'])
+    antigo2 = principal.get_block_by_hash(antigo3.prior_hash)
+    final = Blockchain(difficulty=1, finality_depth=2)
+    for bloco in rival.chain[1:3]:
+        assert final.accept_block(bloco)['status'] == 'connected'
+    assert final.accept_block(antigo2)['status'] == 'side_branch'
+    assert final.accept_block(rival.chain[3])['status'] == 'connected'
+    assert len(final.get_tips()) == 2, "Ramificação ainda dentro da finalidade"
+    assert final.accept_block(rival.chain[4])['status'] == 'connected'
+    assert len(final.get_tips()) == 1 and final.get_block_by_hash(antigo2.hash) is None
+    assert final.accept_block(antigo3)['reason'] == 'unknown_parent'
+    assert final.accept_block(antigo2)['reason'] == 'below_finality'
+    assert final.reorganize(1, [antigo2, antigo3])['reason'] == 'below_finality'
+    print("✅ Ramificações antigas descartadas (finalidade)")
+
+
+def test_binary_serialization():
+    """Testa o formato binário contra a forma JSON."""
+    print("\n🧪 Testando serialização binária...")
+    
+    txs = [Transaction("Alice", "Bob", 10, 1700000000.5, fee=1).to_dict(),
+           Transaction("Bob", "Ção", 2.25, 1700000001.0).to_dict(),
+           {"memo": "livre", "valores": [-3, 2 ** 70, None, True, 0.1], "hash": "ab" * 32}]
+    for version in (1, 2, 3):
+        bloco = Block(5, "01/01/2024 10:00", txs, "cd" * 32, version=version)
+        bloco.mine_block(1)
+        raw = bloco.to_bytes()
+        copia = Block.from_bytes(raw)
+        
+        # Igual ao que um round-trip por JSON produziria, com tipos preservados
+        assert copia.to_dict() == json.loads(json.dumps(bloco.to_dict()))
+        assert type(copia.data[0]['amount']) is int and type(copia.data[1]['amount']) is float
+        assert copia.create_digest() == bloco.hash_bytes
+        assert len(raw) < len(json.dumps(bloco.to_dict()))
+    
+    tx = Transaction("Alice", "Bob", 7, fee=0.5)
+    assert Transaction.from_bytes(tx.to_bytes()) == tx
+    
+    # Versão 3: cabeçalho e folhas de Merkle binários
+    bc = Blockchain(difficulty=1, block_version=3)
+    bc.add_transaction(Transaction("Alice", "Bob", 10))
+    bc.mine_pending_transactions("Miner1")
+    bloco = bc.get_last_block()
+    assert bloco.version == 3 and bc.is_chain_valid()
+    assert Block.verify_proof(bloco.data[0], bloco.get_proof(0), bloco.merkle_root, version=3)
+    
+    # A ordem das chaves não muda o hash (como na forma JSON das versões 1 e 2)
+    alice = KeyPair.generate()
+    assinada = Transaction(alice.address, "Bob", 3, timestamp=1.0)
+    assinada.sign(alice)
+    dados = [txs[0], assinada.to_dict(), txs[2]]
+    reordenados = json.loads(json.dumps(dados, sort_keys=True))
+    for version in (2, 3):
+        original = Block(5, "01/01/2024 10:00", dados, "cd" * 32, version=version)
+        outro = Block(5, "01/01/2024 10:00", reordenados, "cd" * 32, version=version)
+        assert original.merkle_root == outro.merkle_root and original.hash == outro.hash
+        for i, item in enumerate(reordenados):
+            assert Block.verify_proof(item, original.get_proof(i), original.merkle_root,
+                                      version=version)
+    
+    # BlockStore lê registros JSON antigos e binários no mesmo arquivo
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'chain.dat')
+        with BlockStore(path, binary=False) as store:
+            store.append(bc.chain[0])
+        with BlockStore(path) as store:
+            store.append(bloco)
+        with BlockStore(path) as store:
+            assert [b.hash for b in store] == [bc.chain[0].hash, bloco.hash]
+            assert store.read_dict(1) == bloco.to_dict()
+    
+    # Dicionários com as chaves de transação mas tipos inesperados usam a
+    # codificação genérica (como no caminho JSON)
+    estranha = {'sender': None, 'receiver': 7, 'amount': '1', 'timestamp': None, 'fee': 0}
+    for versao in (1, 3):
+        bloco = Block(1, "01/01/2024 00:00:00", [estranha], "0" * 64, version=versao)
+        assert Block.from_bytes(bloco.to_bytes()).to_dict() == bloco.to_dict()
+    
+    # Registros truncados (por exemplo, vindos da rede) geram ValueError
+    registro = bc.chain[-1].to_bytes()
+    for corte in (124, 80, 40, 1):
+        try:
+            Block.from_bytes(registro[:corte])
+            assert False, "Registro truncado deveria ser recusado"
+        except ValueError:
+            pass
+    tx_registro = Transaction("Alice", "Bob", 1).to_bytes()
+    for corte in range(1, len(tx_registro)):
+        try:
+            Transaction.from_bytes(tx_registro[:corte])
+            assert False, "Transação truncada deveria ser recusada"
+        except ValueError:
+            pass
+    
+    # O nó descarta a mensagem sem derrubar a tarefa de tratamento
+    no = Node(Blockchain(difficulty=1))
+    par = SimpleNamespace(address='teste')
+    asyncio.run(no._handle(par, {'type': 'block', 'block': _pack(registro[:80])}))
+    asyncio.run(no._handle(par, {'type': 'tx', 'tx': _pack(tx_registro[:20])}))
+    assert len(no.blockchain.chain) == 1 and len(no.blockchain.mempool) == 0
+    
+    # Respostas malformadas na sincronização também não derrubam o nó
+    fonte = Blockchain(difficulty=1)
+    for _ in range(2):
+        fonte.mine_pending_transactions("Miner1")
+    cabecalhos = fonte.get_headers(1, 10)
+    
+    def par_falso(headers, blocks):
+        async def request(message):
+            return headers if message['type'] == 'get_headers' else blocks
+        return SimpleNamespace(address='falso', request=request)
+    
+    blocos = {'blocks': [_pack(b.to_bytes()) for b in fonte.chain[1:]]}
+    for resposta in ({'fork_height': 99, 'headers': cabecalhos},
+                     {'fork_height': -1, 'headers': cabecalhos},
+                     {'fork_height': '0', 'headers': cabecalhos},
+                     {'fork_height': 0},
+                     {'fork_height': 0, 'headers': [dict(cabecalhos[0], hash='zz')]},
+                     {'fork_height': 0, 'headers': [{'index': 1}]}):
+        assert not asyncio.run(no.sync(par_falso(resposta, blocos))), resposta
+    for resposta in ({}, {'blocks': None}, {'blocks': ['!']}):
+        par = par_falso({'fork_height': 0, 'headers': cabecalhos}, resposta)
+        assert not asyncio.run(no.sync(par)), resposta
+    assert len(no.blockchain.chain) == 1
+    assert asyncio.run(no.sync(par_falso({'fork_height': 0, 'headers': cabecalhos}, blocos)))
+    assert no.blockchain.get_last_block().hash == fonte.get_last_block().hash
+    print("✅ Formato binário compatível com a forma JSON")
+
+
+def test_difficulty_retarget():
+    """Testa o reajuste de dificuldade por alvo numérico."""
+    print("\n🧪 Testando reajuste de dificuldade...")
+    
+    def minerar(bc, quantidade, intervalo, inicio):
+        # Timestamps em segundos após o gênese ('01/01/2024 00:00:00')
+        for i in range(1, quantidade + 1):
+            segundos = inicio + i * intervalo
+            bc.add_block(Block(len(bc.chain), f"01/01/2024 00:{segundos // 60:02d}:{segundos % 60:02d}",
+                               f"bloco {len(bc.chain)}"))
+    
+    bc = Blockchain(difficulty=1, target_block_time=10, retarget_window=5)
+    inicial = bc.next_target()
+    assert inicial == target_from_difficulty(1)
+    
+    # Blocos 2x mais rápidos que o desejado: o alvo cai pela metade
+    minerar(bc, 4, 5, inicio=0)
+    assert bc.next_target() == inicial // 2, "Alvo deve ser reduzido"
+    minerar(bc, 5, 5, inicio=20)
+    # Blocos muito lentos: aumento limitado a 4x
+    minerar(bc, 5, 100, inicio=45)
+    assert bc.chain[10].target == inicial // 4
+    assert bc.next_target() == inicial
+    
+    # Cada bloco é validado contra o próprio alvo
+    assert bc.is_chain_valid()
+    assert bc.chain_work == sum(bc.block_work(b) for b in bc.chain)
+    assert bc.block_work(bc.chain[10]) == 4 * bc.block_work(bc.chain[1])
+    
+    # Alvo diferente do exigido pela regra é rejeitado
+    falso = Block(len(bc.chain), "01/01/2024 11:00:00", "x", bc.get_last_block().hash,
+                  target=bc.next_target() * 2)
+    falso.mine_block(1)
+    report = bc.accept_block(falso)
+    assert report['reason'] == 'invalid_target'
+    
+    # Sem reajuste, cadeias antigas continuam usando zeros à esquerda
+    legado = Blockchain(difficulty=2)
+    legado.add_block(Block(1, "01/01/2024", "dados"))
+    assert legado.chain[1].target is None and legado.chain[1].hash.startswith('00')
+    assert legado.chain_work == 2 * 16 ** 2
+    print("✅ Alvo reajustado pelo tempo observado dos blocos")
+
+
+def test_retarget_fork():
+    """Testa uma ramificação que cruza uma altura de reajuste."""
+    print("\n🧪 Testando ramificação com reajuste...")
+    
+    opcoes = dict(difficulty=1, target_block_time=60, retarget_window=5)
+    principal = Blockchain(**opcoes)
+    for _ in range(5):
+        principal.mine_pending_transactions("Miner1")
+    
+    # A ramificação diverge na altura 3; a janela do bloco 5 começa
+    # abaixo do ponto de divergência
+    rival = Blockchain(**opcoes)
+    for bloco in principal.chain[1:4]:
+        assert rival.accept_block(bloco)['status'] == 'connected'
+    for _ in range(3):
+        rival.mine_pending_transactions("Miner2")
+    
+    assert principal.accept_block(rival.chain[4])['status'] == 'side_branch'
+    assert principal.accept_block(rival.chain[5])['status'] == 'side_branch'
+    assert principal.accept_block(rival.chain[6])['status'] == 'reorganized'
+    assert principal.get_last_block().hash == rival.get_last_block().hash
+    
+    outra = Blockchain(**opcoes)
+    for bloco in principal.chain[1:4]:
+        outra.accept_block(bloco)
+    assert outra.reorganize(3, rival.chain[4:])['valid']
+    assert outra.validate_chain(incremental=False)['valid']
+    
+    # Cadeias com reajuste recarregam com as mesmas opções
+    assert principal.get_last_block().target != target_from_difficulty(1)
+    hashes = [b.hash for b in principal.chain]
+    with tempfile.TemporaryDirectory() as tmp:
+        arquivo = os.path.join(tmp, 'reajuste.json')
+        principal.save_to_file(arquivo)
+        carregada = Blockchain.load_from_file(arquivo, **opcoes)
+        assert [b.hash for b in carregada.chain] == hashes
+        assert carregada.next_target() == principal.next_target()
+        
+        with BlockStore(os.path.join(tmp, 'reajuste.log')) as store:
+            principal.save_to_store(store)
+            assert Blockchain.from_store(store, **opcoes).validate_chain(incremental=False)['valid']
+        
+        arquivada = Blockchain.open_archive(os.path.join(tmp, 'reajuste'), **opcoes)
+        for bloco in principal.chain[1:]:
+            assert arquivada.accept_block(bloco)['status'] == 'connected'
+        assert arquivada.validate_chain(incremental=False)['valid']
+        arquivada.chain.close()
+    print("✅ Reajuste calculado através do ponto de divergência")
+
+
+def test_p2p_nodes():
+    """Testa propagação e sincronização entre nós em localhost."""
+    print("\n🧪 Testando rede P2P...")
+    
+    async def esperar(condicao):
+        for _ in range(500):
+            if condicao():
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError("Condição não atingida a tempo")
+    
+    async def cenario():
+        # Nó 1 já tem uma cadeia; nó 2 sincroniza ao conectar, com lotes
+        # pequenos para exercitar várias requisições simultâneas
+        no1 = Node(Blockchain(difficulty=1))
+        for i in range(12):
+            no1.blockchain.add_transaction(Transaction("Alice", "Bob", i))
+            no1.blockchain.mine_pending_transactions("Miner1")
+        no2 = Node(Blockchain(difficulty=1), headers_batch=5, blocks_batch=3, pipeline=2)
+        await no1.start()
+        await no2.start()
+        await no2.connect('127.0.0.1', no1.port)
+        
+        assert len(no2.blockchain.chain) == 13
+        assert no2.blockchain.chain_work == no1.blockchain.chain_work
+        assert no2.blockchain.get_balance("Bob") == no1.blockchain.get_balance("Bob")
+        
+        # Transação repassada e bloco propagado sem nova mineração
+        await no2.submit_transaction(Transaction("Bob", "Carol", 5))
+        await esperar(lambda: len(no1.blockchain.mempool) == 1)
+        block = await no1.mine("Miner1")
+        await esperar(lambda: len(no2.blockchain.chain) == 14)
+        recebido = no2.blockchain.get_last_block()
+        assert (recebido.hash, recebido.nonce) == (block.hash, block.nonce)
+        assert len(no2.blockchain.mempool) == 0
+        assert no2.blockchain.get_balance("Carol") == 5
+        
+        # Nó 3 minera sozinho uma ramificação com mais trabalho
+        no3 = Node(Blockchain(difficulty=1))
+        for i in range(20):
+            no3.blockchain.add_transaction(Transaction("Dave", "Eve", i))
+            no3.blockchain.mine_pending_transactions("Miner3")
+        await no3.start()
+        await no2.connect('127.0.0.1', no3.port)
+        
+        assert no2.blockchain.get_last_block().hash == no3.blockchain.get_last_block().hash
+        assert no2.blockchain.get_balance("Carol") == 0
+        assert no2.blockchain.get_balance("Eve") == sum(range(20))
+        assert no2.blockchain.is_chain_valid()
+        # Transações da ramificação descartada voltam para a mempool
+        assert len(no2.blockchain.mempool) == 13
+        
+        for no in (no1, no2, no3):
+            await no.stop()
+    
+    asyncio.run(cenario())
+    print("✅ Nós sincronizados pela cadeia com mais trabalho")
+
+
+def test_transaction_index():
+    """Testa txids em cache e o índice txid -> local na cadeia."""
+    print("\n🧪 Testando índice de transações...")
+    
+    tx = Transaction("Alice", "Bob", 10, timestamp=1.0)
+    assert tx.txid == tx.calculate_hash()
+    tx.amount = 11
+    assert tx.txid == tx.calculate_hash()
+    
+    bc = Blockchain(difficulty=1)
+    bc.add_transaction(tx)
+    bc.mine_pending_transactions("Miner1")
+    
+    info = bc.get_transaction(tx.txid)
+    assert bc.locate_transaction(tx.txid) == (1, 0)
+    assert info['block_hash'] == bc.chain[1].hash and info['confirmations'] == 1
+    assert info['transaction'] == tx.to_dict()
+    assert bc.locate_transaction("0" * 64) is None
+    
+    # Uma reorganização remove do índice as transações desconectadas
+    rival = Blockchain(difficulty=1)
+    for _ in range(2):
+        rival.mine_pending_transactions("Miner2")
+    for block in rival.chain[1:]:
+        bc.accept_block(block)
+    assert bc.locate_transaction(tx.txid) is None
+    assert tx.txid in bc.mempool
+    
+    indice = dict(bc._tx_index)
+    bc.rebuild_indexes()
+    assert bc._tx_index == indice
+    print("✅ Transações localizadas por txid")
+
+
+def test_address_history():
+    """Testa o histórico paginado por endereço."""
+    print("\n🧪 Testando histórico por endereço...")
+    
+    bc = Blockchain(difficulty=1)
+    for i in range(3):
+        bc.add_transaction(Transaction("Alice", "Bob", 1 + i))
+        bc.add_transaction(Transaction("Carol", "Dave", 5))
+        bc.mine_pending_transactions("Miner1")
+    
+    historico = list(bc.get_history("Alice"))
+    assert [h['transaction']['amount'] for h in historico] == [3, 2, 1]
+    assert [h['height'] for h in historico] == [3, 2, 1]
+    assert len(list(bc.get_history("Miner1"))) == 3
+    assert list(bc.get_history("Ninguem")) == []
+    
+    # Paginação: duas páginas cobrem o histórico sem repetição
+    pagina1 = list(bc.get_history("Bob", limit=2))
+    pagina2 = list(bc.get_history("Bob", limit=2, cursor=pagina1[-1]['cursor']))
+    assert [h['height'] for h in pagina1 + pagina2] == [3, 2, 1]
+    
+    # Desconectar blocos remove as entradas; reconstruir dá o mesmo índice
+    bc._disconnect_block()
+    assert [h['height'] for h in bc.get_history("Alice")] == [2, 1]
+    indice = {k: list(v) for k, v in bc._history.items()}
+    bc.rebuild_indexes()
+    assert bc._history == indice
+    print("✅ Histórico consultado pelo índice")
+
+
+def test_signatures():
+    """Testa transações assinadas e a verificação em lote."""
+    print("\n🧪 Testando assinaturas...")
+    
+    # Vetor conhecido (RFC 6979, secp256k1, chave privada 1)
+    chave_um = KeyPair((1).to_bytes(32, 'big'))
+    assert chave_um.sign(b"Satoshi Nakamoto").startswith("934b1ea10a4b3c1757e2b0c0")
+    
+    alice = KeyPair.generate()
+    tx = Transaction(alice.address, "Bob", 10, timestamp=1.0)
+    tx.sign(alice)
+    assert tx.verify_signature()
+    assert Transaction.from_bytes(tx.to_bytes()).verify_signature()
+    
+    adulterada = Transaction.from_dict(dict(tx.to_dict(), amount=1000))
+    assert not adulterada.verify_signature()
+    # Só a grafia canônica (hexadecimal minúsculo) é aceita
+    for campo in ('signature', 'public_key'):
+        for grafia in (str.upper, lambda h: h[:-1] + h[-1].upper(), lambda h: ' ' + h):
+            variante = dict(tx.to_dict(), **{campo: grafia(tx.to_dict()[campo])})
+            if variante[campo] != tx.to_dict()[campo]:
+                assert not Transaction.from_dict(variante).verify_signature(), campo
+    try:
+        Transaction("Bob", "Carol", 1).sign(alice)
+        assert False, "Chave de outro endereço deveria ser recusada"
+    except ValueError:
+        pass
+    
+    bc = Blockchain(difficulty=1, require_signatures=True)
+    assert bc.add_transaction(Transaction("Bob", "Carol", 1)) == -1
+    assert bc.add_transaction(adulterada) == -1
+    assert bc.add_transaction(tx) == 1
+    assert tx.txid in bc.verifier
+    bc.mine_pending_transactions("Miner1")
+    assert bc.is_chain_valid()
+    
+    # Um bloco com assinatura forjada é rejeitado por quem o recebe
+    rival = Blockchain(difficulty=1)
+    rival.mempool.add(adulterada)
+    rival.mine_pending_transactions("Miner2")
+    relatorio = bc.accept_block(rival.chain[1])
+    assert relatorio['reason'] == 'invalid_signature'
+    assert relatorio['actual'] == adulterada.txid
+    
+    # Lote distribuído entre processos; o cache evita verificar de novo
+    verificador = SignatureVerifier(workers=2)
+    lote = []
+    for i in range(8):
+        t = Transaction(alice.address, "Bob", i + 1, timestamp=float(i))
+        t.sign(alice)
+        lote.append((t.txid, t.to_dict()))
+    lote.append((adulterada.txid, adulterada.to_dict()))
+    assert verificador.verify(lote) == [True] * 8 + [False]
+    assert len(verificador) == 8
+    print("✅ Assinaturas verificadas")
+
+
+def test_balance_enforcement():
+    """Testa a rejeição de gastos acima do saldo e de transações repetidas."""
+    print("\n🧪 Testando conferência de saldos...")
+    
+    bc = Blockchain(difficulty=1, enforce_balances=True)
+    bc.mine_pending_transactions("Alice")
+    gasto = Transaction("Alice", "Bob", 80, timestamp=1.0, fee=1)
+    excesso = Transaction("Alice", "Carol", 50, timestamp=2.0)
+    bc.add_transaction(gasto)
+    bc.add_transaction(excesso)
+    bloco = bc.mine_pending_transactions("Miner1")
+    
+    # Só cabe o primeiro gasto; o outro continua pendente
+    assert [tx['receiver'] for tx in bloco.data[:-1]] == ["Bob"]
+    assert excesso in bc.mempool and bc.get_balance("Alice") == 19
+    
+    # Transação já confirmada não entra de novo e sai da mempool
+    bc.mempool.add(gasto)
+    assert gasto not in bc.prepare_block("Miner1")[1]
+    assert gasto not in bc.mempool
+    assert bc.validate_chain(incremental=False)['valid']
+    
+    # Blocos montados sem a conferência são rejeitados na validação
+    # (ramificações só são conferidas quando passam a ter mais trabalho)
+    livre = Blockchain(difficulty=1)
+    livre.add_transaction(Transaction("Eve", "Bob", 500))
+    for _ in range(3):
+        livre.mine_pending_transactions("Miner2")
+    assert bc.accept_block(livre.chain[1])['status'] == 'side_branch'
+    assert bc.accept_block(livre.chain[2])['status'] == 'side_branch'
+    relatorio = bc.accept_block(livre.chain[3])
+    assert relatorio['reason'] == 'insufficient_funds'
+    assert relatorio['first_bad_index'] == 1
+    assert (relatorio['expected'], relatorio['actual']) == (500, 0)
+    assert bc.get_last_block().hash == bloco.hash
+    
+    repetida = Blockchain(difficulty=1)
+    repetida.mine_pending_transactions("Alice")
+    tx = Transaction("Alice", "Bob", 10)
+    for _ in range(2):
+        repetida.mempool.add(tx)
+        repetida.mine_pending_transactions("Alice")
+    assert repetida.validate_chain(incremental=False)['valid']
+    repetida.enforce_balances = True
+    relatorio = repetida.validate_chain(incremental=False)
+    assert relatorio['reason'] == 'duplicate_transaction'
+    assert relatorio['first_bad_index'] == 3 and relatorio['actual'] == tx.txid
+    
+    # Reenviar uma transação confirmada com outra assinatura (ou sem
+    # ela) muda o txid, mas não o conteúdo assinado
+    alice = KeyPair.generate()
+    for exige in (True, False):
+        replay = Blockchain(difficulty=1, require_signatures=exige, enforce_balances=True)
+        replay.mine_pending_transactions(alice.address)
+        original = Transaction(alice.address, "Bob", 10, timestamp=1.0)
+        original.sign(alice)
+        assert replay.add_transaction(original) == 2
+        replay.mine_pending_transactions("Miner1")
+        copias = [Transaction.from_dict(dict(original.to_dict(),
+                                             signature=original.signature.upper()))]
+        if not exige:
+            copias.append(Transaction(alice.address, "Bob", 10, timestamp=1.0))
+        for copia in copias:
+            assert copia.txid != original.txid
+            replay.mempool.add(copia)
+            assert copia not in replay.prepare_block("Miner1")[1], "Repetição fica fora"
+        
+        # Um bloco com a repetição, montado por outro nó, é rejeitado
+        if not exige:
+            livre = Blockchain(difficulty=1)
+            for bloco in replay.chain[1:]:
+                livre.accept_block(bloco)
+            livre.mempool.add(copias[-1])
+            livre.mine_pending_transactions("Miner2")
+            relatorio = replay.accept_block(livre.chain[-1])
+            assert relatorio['reason'] == 'duplicate_transaction'
+            assert relatorio['actual'] == copias[-1].txid
+        assert replay.get_balance("Bob") == 10 and replay.validate_chain(incremental=False)['valid']
+    print("✅ Gastos conferidos em uma única passada")
+
+
+def test_reward_rules():
+    """Testa que transações do SYSTEM não criam moedas fora da recompensa."""
+    print("\n🧪 Testando regras da recompensa...")
+    
+    bc = Blockchain(difficulty=1, enforce_balances=True)
+    emissao = Transaction("SYSTEM", "mallory", 1_000_000)
+    assert bc.add_transaction(emissao) == -1
+    resultado = bc.add_transactions([emissao, Transaction("SYSTEM", "eve", 5)])
+    assert resultado['reasons'] == {'invalid_sender': 2}
+    
+    # Mesmo inserida direto na mempool, ela não entra no bloco
+    bc.mempool.add(emissao)
+    bloco = bc.mine_pending_transactions("Miner1")
+    assert [tx['receiver'] for tx in bloco.data] == ["Miner1"]
+    assert emissao not in bc.mempool and bc.get_balance("mallory") == 0
+    
+    # Blocos montados à mão com emissão extra ou recompensa inflada são
+    # rejeitados na validação
+    livre = Blockchain(difficulty=1)
+    recompensa = Transaction("SYSTEM", "Miner2", 100).to_dict()
+    livre.add_block(Block(1, "01/01/2024 00:00:01", [emissao.to_dict(), recompensa]))
+    livre.enforce_balances = True
+    relatorio = livre.validate_chain(incremental=False)
+    assert relatorio['reason'] == 'invalid_reward'
+    assert (relatorio['first_bad_index'], relatorio['actual']) == (1, emissao.txid)
+    
+    inflada = Blockchain(difficulty=1, enforce_balances=True)
+    inflada.mine_pending_transactions("Alice")
+    inflada.add_block(Block(2, "01/01/2024 00:00:02", [
+        Transaction("Alice", "Bob", 1, fee=2).to_dict(),
+        Transaction("SYSTEM", "mallory", 1002).to_dict()]))
+    relatorio = inflada.validate_chain(incremental=False)
+    assert relatorio['reason'] == 'invalid_reward'
+    assert (relatorio['first_bad_index'], relatorio['expected'], relatorio['actual']) == \
+        (2, 102, 1002)
+    print("✅ Apenas a recompensa do bloco cria moedas")
+
+
+def test_batch_nonce_search():
+    """Testa a busca de nonces em lote contra o laço original."""
+    print("\n🧪 Testando busca de nonces em lote...")
+    
+    bloco = Block(1, "01/01/2024 00:00:00", ["tx"], "0" * 64)
+    midstate = bloco.create_midstate()
+    
+    # Mesmo nonce e hash, inclusive em faixas que cruzam blocos de 10 ** 4
+    for start, end in [(0, 30000), (9990, 20020), (12345, 12346), (5, 5)]:
+        for zeros in (2, 3):
+            alvo = target_from_difficulty(zeros)
+            assert Block.search_nonce_batch(midstate, alvo, start, end) == \
+                Block.search_nonce_range(midstate, '', start, end, alvo)
+            assert Block.search_nonces(midstate, '0' * zeros, start, end) == \
+                Block.search_nonce_range(midstate, '0' * zeros, start, end)
+    
+    assert Block.search_nonce_batch(midstate, 0, 0, 100) == (None, None, 100)
+    assert Block.search_nonce_batch(midstate, target_from_difficulty(0), 7, 9)[0] == 7
+    
+    lote = Block(1, "01/01/2024 00:00:00", ["tx"], "0" * 64)
+    laco = Block(1, "01/01/2024 00:00:00", ["tx"], "0" * 64)
+    lote.mine_block(3)
+    laco.mine_block(3, batch=False)
+    assert (lote.nonce, lote.hash) == (laco.nonce, laco.hash)
+    
+    stats = ConcurrentMiner.mine_with_threads(Block(2, "x", [], "0" * 64), 3, 2,
+                                              chunk_size=5000)
+    assert stats['hash'].startswith("000")
+    print("✅ Busca em lote equivalente ao laço original")
+
+
 def run_all_tests():
     """Executa todos os testes."""
     print("\n" + "="*70)
@@ -109,8 +1214,35 @@ def run_all_tests():
     try:
         test_crypto_utils()
         test_block()
+        test_midstate_hashing()
+        test_process_mining()
+        test_nonce_scheduler()
+        test_compact_representation()
+        test_merkle_tree()
         test_blockchain()
+        test_validation_report()
+        test_block_store()
+        test_load_from_file()
+        test_mapped_archive()
         test_transactions()
+        test_balance_index()
+        test_mempool()
+        test_bulk_ingestion()
+        test_quiet_mining()
+        test_telemetry()
+        test_benchmark_suite()
+        test_async_blockchain()
+        test_fork_handling()
+        test_binary_serialization()
+        test_difficulty_retarget()
+        test_retarget_fork()
+        test_p2p_nodes()
+        test_transaction_index()
+        test_address_history()
+        test_signatures()
+        test_balance_enforcement()
+        test_reward_rules()
+        test_batch_nonce_search()
         
         print("\n" + "="*70)
         print("✅ TODOS OS TESTES PASSARAM!".center(70))
@@ -123,4 +1255,5 @@ def run_all_tests():
 
 
 if __name__ == "__main__":
+    configure_logging()
     run_all_tests()
\ No newline at end of file
@@ -3,27 +3,130 @@ Módulo de Transações
 Define a estrutura de transações na blockchain
 """
 
+import hashlib
+import sys
 import time
 import json
-from dataclasses import dataclass, asdict
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from crypto_utils import KeyPair, address_from_public_key, verify_signature
+from serialization import decode_value, encode_value
 
-@dataclass
+
+# dataclass(slots=True) só existe a partir do Python 3.10
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def transaction_id(data: Dict) -> str:
+    """
+    Calcula o txid de uma transação no formato de dicionário.
+    
+    É o mesmo valor de Transaction.calculate_hash(), útil para as
+    transações armazenadas em Block.data sem criar objetos.
+    
+    Args:
+        data: Dicionário no formato de to_dict()
+        
+    Returns:
+        Hash hexadecimal da forma canônica (JSON ordenado)
+    """
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def signing_payload(data: Dict) -> bytes:
+    """
+    Mensagem assinada de uma transação: a forma canônica sem os campos
+    de assinatura.
+    
+    Args:
+        data: Dicionário no formato de to_dict()
+        
+    Returns:
+        JSON ordenado dos demais campos
+    """
+    unsigned = {k: v for k, v in data.items() if k not in ('signature', 'public_key')}
+    return json.dumps(unsigned, sort_keys=True).encode()
+
+
+def content_id(data: Dict, txid: Optional[str] = None) -> str:
+    """
+    Identifica o conteúdo assinado de uma transação (hash de
+    signing_payload, que inclui o remetente).
+    
+    Diferente do txid, não depende dos campos de assinatura: a mesma
+    transação com a assinatura trocada, reescrita ou removida tem o
+    mesmo identificador. É a chave usada para detectar repetições.
+    
+    Args:
+        data: Dicionário no formato de to_dict()
+        txid: txid já calculado; em transações sem assinatura os dois
+            identificadores coincidem e ele é reaproveitado
+        
+    Returns:
+        Hash hexadecimal do conteúdo assinado
+    """
+    if 'signature' not in data and 'public_key' not in data:
+        return txid if txid is not None else transaction_id(data)
+    return hashlib.sha256(signing_payload(data)).hexdigest()
+
+
+def verify_transaction(data: Dict) -> bool:
+    """
+    Verifica a assinatura de uma transação no formato de dicionário.
+    
+    Função de módulo para poder ser usada pelos processos de
+    verificação.
+    
+    Args:
+        data: Dicionário no formato de to_dict()
+        
+    Returns:
+        True se a transação está assinada, a assinatura é válida e a
+        chave pública corresponde ao endereço do remetente
+    """
+    signature = data.get('signature')
+    public_key = data.get('public_key')
+    if not isinstance(signature, str) or not isinstance(public_key, str):
+        return False
+    try:
+        if address_from_public_key(public_key) != data.get('sender'):
+            return False
+    except ValueError:
+        return False
+    return verify_signature(public_key, signing_payload(data), signature)
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Transaction:
     """
     Representa uma transação na blockchain.
     
+    Em Python 3.10+ a classe usa __slots__, reduzindo o custo por
+    objeto quando há muitas transações em memória.
+    
     Attributes:
         sender: Endereço do remetente
         receiver: Endereço do destinatário
         amount: Quantidade transferida
         timestamp: Momento da transação
+        fee: Taxa paga ao minerador (debitada do remetente)
+        signature: Assinatura do remetente em hexadecimal (None se a
+            transação não foi assinada)
+        public_key: Chave pública cujo endereço é o remetente
+        txid: Identificador (hash da forma canônica), calculado uma vez
+            e guardado junto com os campos de origem; alterar qualquer
+            campo faz o txid ser recalculado
     """
     sender: str
     receiver: str
     amount: float
     timestamp: float = None
+    fee: float = 0
+    signature: Optional[str] = None
+    public_key: Optional[str] = None
+    _txid: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Inicializa timestamp se não fornecido."""
@@ -34,10 +137,69 @@ class Transaction:
         """
         Converte transação para dicionário.
         
+        Montado diretamente (sem dataclasses.asdict, que faz cópia
+        profunda recursiva de cada campo). Os campos de assinatura só
+        aparecem em transações assinadas, então hashes e txids de
+        transações sem assinatura não mudam.
+        
         Returns:
             Dicionário com atributos da transação
         """
-        return asdict(self)
+        data = {
+            'sender': self.sender,
+            'receiver': self.receiver,
+            'amount': self.amount,
+            'timestamp': self.timestamp,
+            'fee': self.fee
+        }
+        if self.signature is not None:
+            data['public_key'] = self.public_key
+            data['signature'] = self.signature
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Transaction':
+        """
+        Reconstrói uma transação a partir do dicionário de to_dict().
+        
+        Args:
+            data: Dicionário com os campos da transação
+            
+        Returns:
+            Transação equivalente
+        """
+        return cls(data['sender'], data['receiver'], data['amount'],
+                   data.get('timestamp'), data.get('fee', 0),
+                   data.get('signature'), data.get('public_key'))
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serializa a transação no formato binário (ver serialization.py).
+        
+        Returns:
+            Bytes da transação
+        """
+        return encode_value(self.to_dict())
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Transaction':
+        """
+        Reconstrói uma transação a partir de to_bytes().
+        
+        Args:
+            data: Bytes gerados por to_bytes()
+            
+        Returns:
+            Transação equivalente
+            
+        Raises:
+            ValueError: Se os bytes não formam uma transação
+        """
+        value = decode_value(data)
+        try:
+            return cls.from_dict(value)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Registro não é uma transação: {e}") from e
     
     def to_string(self) -> str:
         """
@@ -48,6 +210,131 @@ class Transaction:
         """
         return json.dumps(self.to_dict(), sort_keys=True)
     
+    def calculate_hash(self) -> str:
+        """
+        Calcula o hash SHA-256 da forma canônica da transação.
+        
+        Returns:
+            Hash hexadecimal que identifica a transação
+        """
+        return hashlib.sha256(self.to_string().encode()).hexdigest()
+    
+    def sign(self, key_pair: KeyPair) -> None:
+        """
+        Assina a transação com a chave do remetente.
+        
+        Args:
+            key_pair: Par de chaves cujo endereço é self.sender
+            
+        Raises:
+            ValueError: Se a chave não pertence ao remetente
+        """
+        if key_pair.address != self.sender:
+            raise ValueError("A chave não corresponde ao endereço do remetente")
+        self.public_key = key_pair.public_key
+        self.signature = key_pair.sign(signing_payload(self.to_dict()))
+    
+    def verify_signature(self) -> bool:
+        """Verifica a assinatura (ver verify_transaction)."""
+        return verify_transaction(self.to_dict())
+    
+    @property
+    def txid(self) -> str:
+        """Identificador da transação (calculate_hash, com cache)."""
+        fields = (self.sender, self.receiver, self.amount, self.timestamp, self.fee,
+                  self.signature, self.public_key)
+        cached = self._txid
+        if cached is None or cached[0] != fields:
+            cached = self._txid = (fields, self.calculate_hash())
+        return cached[1]
+    
     def __repr__(self) -> str:
         """Representação legível da transação."""
         return f"Transaction({self.sender} -> {self.receiver}: {self.amount})"
+
+
+class SignatureVerifier:
+    """
+    Verificador de assinaturas em lote com cache de txids.
+    
+    Transações já verificadas (por exemplo, ao entrar na mempool) ficam
+    no cache e não são verificadas de novo quando chegam em um bloco.
+    Lotes grandes são distribuídos entre processos, já que cada
+    verificação ECDSA custa milissegundos em Python puro.
+    
+    Attributes:
+        workers: Processos usados em lotes grandes (None ou 1 = serial)
+        cache_size: Máximo de txids guardados no cache
+    """
+    
+    def __init__(self, workers: Optional[int] = None, cache_size: int = 100000):
+        """
+        Inicializa o verificador.
+        
+        Args:
+            workers: Processos para lotes grandes (padrão: serial)
+            cache_size: Máximo de txids no cache; os mais antigos saem
+                primeiro (padrão: 100000)
+        """
+        self.workers = workers
+        self.cache_size = cache_size
+        # Dicionário usado como conjunto ordenado por inserção
+        self._verified: Dict[str, None] = {}
+    
+    def __contains__(self, txid: str) -> bool:
+        """Verifica se um txid já foi verificado."""
+        return txid in self._verified
+    
+    def __len__(self) -> int:
+        """Número de txids no cache."""
+        return len(self._verified)
+    
+    def _remember(self, txid: str) -> None:
+        """Guarda um txid verificado, descartando o mais antigo se cheio."""
+        verified = self._verified
+        verified[txid] = None
+        if len(verified) > self.cache_size:
+            del verified[next(iter(verified))]
+    
+    def verify(self, transactions: Sequence[Tuple[str, Dict]]) -> List[bool]:
+        """
+        Verifica um lote de transações.
+        
+        Args:
+            transactions: Pares (txid, dicionário no formato de to_dict())
+            
+        Returns:
+            Resultado de cada transação, na ordem recebida
+        """
+        results = [True] * len(transactions)
+        pending = [i for i, (txid, _) in enumerate(transactions)
+                   if txid not in self._verified]
+        if not pending:
+            return results
+        
+        items = [transactions[i][1] for i in pending]
+        workers = self.workers
+        if workers and workers > 1 and len(items) >= 4 * workers:
+            chunksize = max(1, len(items) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                checked = list(executor.map(verify_transaction, items, chunksize=chunksize))
+        else:
+            checked = [verify_transaction(item) for item in items]
+        
+        for i, ok in zip(pending, checked):
+            results[i] = ok
+            if ok:
+                self._remember(transactions[i][0])
+        return results
+    
+    def verify_transaction(self, tx: Transaction) -> bool:
+        """
+        Verifica uma única transação (serialmente), usando o cache.
+        
+        Args:
+            tx: Transação assinada
+            
+        Returns:
+            True se a assinatura é válida
+        """
+        return self.verify([(tx.txid, tx.to_dict())])[0]